@@ -3,15 +3,37 @@
 Skill Initializer - Creates a new skill from template
 
 Usage:
-    init_skill.py <skill-name> --path <path>
+    init_skill.py <skill-name> --path <path> [--template <name-or-dir>] [--force]
+    init_skill.py --manifest <manifest.yaml> [--path <default-path>] [--force]
 
 Examples:
     init_skill.py my-new-skill --path skills/public
     init_skill.py my-api-helper --path skills/private
     init_skill.py custom-skill --path /custom/location
+    init_skill.py web-smoke --path skills/public --template webapp-testing
+    init_skill.py --manifest skills.yaml --path skills/public
+
+Templates live in scripts/templates/<name>/. Files ending in .tmpl are rendered
+with {skill_name}/{skill_title} placeholders; other files are copied as-is.
+Existing skills are updated in place: missing files are added, existing files
+are kept unless --force is given.
+
+Manifest format (YAML or JSON):
+    path: skills/public
+    template: default
+    skills:
+      - data-analyzer
+      - name: web-smoke
+        template: webapp-testing
 """
 
+import argparse
+import functools
+import os
+import re
+import string
 import sys
+from collections import namedtuple
 from pathlib import Path
 
 
@@ -186,78 +208,226 @@ Note: This is a text placeholder. Actual assets can be any file type.
 """
 
 
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+TEMPLATE_SUFFIX = '.tmpl'
+
+# Files of the built-in "default" template: (relative path, source, mode)
+DEFAULT_TEMPLATE = (
+    ('SKILL.md', SKILL_TEMPLATE, 0o644),
+    ('scripts/example.py', EXAMPLE_SCRIPT, 0o755),
+    ('references/api_reference.md', EXAMPLE_REFERENCE, 0o644),
+    ('assets/example_asset.txt', EXAMPLE_ASSET, 0o644),
+)
+
+MAX_SKILL_NAME_LENGTH = 40
+TEMPLATE_SKIP_DIRS = {'__pycache__'}
+TEMPLATE_SKIP_SUFFIXES = ('.pyc', '.pyo')
+
+TemplateFile = namedtuple('TemplateFile', ['path', 'source', 'render', 'mode'])
+
+_FORMATTER = string.Formatter()
+
+
+def validate_skill_name(skill_name):
+    """Return an error message if the name is not a valid skill directory name, else None."""
+    if not re.match(r'^[a-z0-9]+(-[a-z0-9]+)*$', skill_name):
+        return f"Invalid skill name '{skill_name}': use hyphen-case (lowercase letters, digits, single hyphens)"
+    if len(skill_name) > MAX_SKILL_NAME_LENGTH:
+        return f"Invalid skill name '{skill_name}': longer than {MAX_SKILL_NAME_LENGTH} characters"
+    return None
+
+
 def title_case_skill_name(skill_name):
     """Convert hyphenated skill name to Title Case for display."""
     return ' '.join(word.capitalize() for word in skill_name.split('-'))
 
 
-def init_skill(skill_name, path):
+@functools.lru_cache(maxsize=None)
+def compile_template(source):
+    """
+    Precompile a template string into (literal, field, format_spec) parts.
+
+    Templates use str.format placeholders ({skill_name}, {skill_title}) and
+    {{ }} for literal braces. Compiled templates are cached, so a template is
+    parsed once no matter how many skills are rendered from it.
+    """
+    parts = []
+    for literal, field, format_spec, conversion in _FORMATTER.parse(source):
+        if conversion:
+            raise ValueError(f"Conversions are not supported in templates: {{{field}!{conversion}}}")
+        parts.append((literal, field, format_spec or ''))
+    return tuple(parts)
+
+
+def render_template(source, context):
+    """Render a template string against a context dict."""
+    chunks = []
+    for literal, field, format_spec in compile_template(source):
+        chunks.append(literal)
+        if field is not None:
+            chunks.append(format(context[field], format_spec))
+    return ''.join(chunks)
+
+
+def resolve_template_dir(template):
+    """Resolve a template name (under scripts/templates/) or a directory path."""
+    template_dir = Path(template)
+    if template_dir.is_dir():
+        return template_dir.resolve()
+    template_dir = TEMPLATES_DIR / template
+    if template_dir.is_dir():
+        return template_dir
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(template='default'):
+    """
+    Load the files of a template, reading its directory only once.
+
+    Files ending in .tmpl are rendered (and the suffix dropped); all other
+    files are copied verbatim, keeping their permission bits.
+
+    Args:
+        template: 'default', a name under scripts/templates/, or a directory path
+
+    Returns:
+        Tuple of TemplateFile entries
+
+    Raises:
+        ValueError: If the template cannot be found
+    """
+    if template == 'default':
+        return tuple(TemplateFile(path, source, True, mode) for path, source, mode in DEFAULT_TEMPLATE)
+
+    template_dir = resolve_template_dir(template)
+    if template_dir is None:
+        raise ValueError(f"Template not found: {template}")
+
+    files = []
+    for file_path in sorted(template_dir.rglob('*')):
+        if not file_path.is_file():
+            continue
+        rel_parts = file_path.relative_to(template_dir).parts
+        # Bytecode caches and dotfiles (.DS_Store, .git) are not part of the template
+        if any(part in TEMPLATE_SKIP_DIRS or part.startswith('.') for part in rel_parts):
+            continue
+        if file_path.suffix in TEMPLATE_SKIP_SUFFIXES:
+            continue
+        rel_path = '/'.join(rel_parts)
+        mode = file_path.stat().st_mode & 0o777
+        if rel_path.endswith(TEMPLATE_SUFFIX):
+            files.append(TemplateFile(rel_path[:-len(TEMPLATE_SUFFIX)], file_path.read_text(), True, mode))
+        else:
+            files.append(TemplateFile(rel_path, file_path.read_bytes(), False, mode))
+    return tuple(files)
+
+
+def list_existing_files(skill_dir):
+    """Return the set of relative file paths already present in a skill directory."""
+    existing = set()
+    for root, _dirs, files in os.walk(skill_dir):
+        rel_root = Path(root).relative_to(skill_dir)
+        for name in files:
+            existing.add((rel_root / name).as_posix())
+    return existing
+
+
+def scaffold_skill(skill_dir, template_files, context, existing_files=None, force=False, verbose=True):
     """
-    Initialize a new skill directory with template SKILL.md.
+    Write template files into a skill directory, updating it in place.
+
+    Missing files are created. Files that already exist are kept as they are,
+    unless force is set, in which case files whose content differs from the
+    rendered template are overwritten.
+
+    Args:
+        skill_dir: Skill directory to write into
+        template_files: Files returned by load_template()
+        context: Values for the template placeholders
+        existing_files: Relative paths already in skill_dir (None for a new skill)
+        force: Overwrite existing files that differ from the template
+        verbose: Print one line per file
+
+    Returns:
+        Dict with 'created', 'updated' and 'kept' counts
+    """
+    existing_files = existing_files or set()
+    counts = {'created': 0, 'updated': 0, 'kept': 0}
+    created_dirs = set()
+
+    for template_file in template_files:
+        target = skill_dir / template_file.path
+        if template_file.render:
+            content = render_template(template_file.source, context).encode()
+        else:
+            content = template_file.source
+
+        if template_file.path in existing_files:
+            if not force or target.read_bytes() == content:
+                counts['kept'] += 1
+                if verbose:
+                    print(f"⏭️  Kept existing {template_file.path}")
+                continue
+            action = 'updated'
+        else:
+            action = 'created'
+
+        if target.parent not in created_dirs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(target.parent)
+        target.write_bytes(content)
+        target.chmod(template_file.mode)
+        counts[action] += 1
+        if verbose:
+            print(f"✅ {action.capitalize()} {template_file.path}")
+
+    return counts
+
+
+def init_skill(skill_name, path, template='default', force=False):
+    """
+    Initialize a skill directory from a template, or update an existing one in place.
 
     Args:
         skill_name: Name of the skill
         path: Path where the skill directory should be created
+        template: Template name or directory (defaults to the built-in template)
+        force: Overwrite existing files that differ from the template
 
     Returns:
-        Path to created skill directory, or None if error
+        Path to the skill directory, or None if error
     """
     # Determine skill directory path
     skill_dir = Path(path).resolve() / skill_name
 
-    # Check if directory already exists
-    if skill_dir.exists():
-        print(f"❌ Error: Skill directory already exists: {skill_dir}")
-        return None
-
-    # Create skill directory
-    try:
-        skill_dir.mkdir(parents=True, exist_ok=False)
-        print(f"✅ Created skill directory: {skill_dir}")
-    except Exception as e:
-        print(f"❌ Error creating directory: {e}")
-        return None
-
-    # Create SKILL.md from template
-    skill_title = title_case_skill_name(skill_name)
-    skill_content = SKILL_TEMPLATE.format(
-        skill_name=skill_name,
-        skill_title=skill_title
-    )
-
-    skill_md_path = skill_dir / 'SKILL.md'
     try:
-        skill_md_path.write_text(skill_content)
-        print("✅ Created SKILL.md")
+        template_files = load_template(template)
     except Exception as e:
-        print(f"❌ Error creating SKILL.md: {e}")
+        print(f"❌ Error loading template: {e}")
         return None
 
-    # Create resource directories with example files
+    # Existing skills are updated in place rather than rejected
+    if skill_dir.exists():
+        if not skill_dir.is_dir():
+            print(f"❌ Error: Path exists and is not a directory: {skill_dir}")
+            return None
+        existing_files = list_existing_files(skill_dir)
+        print(f"🔄 Updating existing skill directory: {skill_dir}")
+    else:
+        existing_files = None
+        try:
+            skill_dir.mkdir(parents=True, exist_ok=False)
+            print(f"✅ Created skill directory: {skill_dir}")
+        except Exception as e:
+            print(f"❌ Error creating directory: {e}")
+            return None
+
+    context = {'skill_name': skill_name, 'skill_title': title_case_skill_name(skill_name)}
     try:
-        # Create scripts/ directory with example script
-        scripts_dir = skill_dir / 'scripts'
-        scripts_dir.mkdir(exist_ok=True)
-        example_script = scripts_dir / 'example.py'
-        example_script.write_text(EXAMPLE_SCRIPT.format(skill_name=skill_name))
-        example_script.chmod(0o755)
-        print("✅ Created scripts/example.py")
-
-        # Create references/ directory with example reference doc
-        references_dir = skill_dir / 'references'
-        references_dir.mkdir(exist_ok=True)
-        example_reference = references_dir / 'api_reference.md'
-        example_reference.write_text(EXAMPLE_REFERENCE.format(skill_title=skill_title))
-        print("✅ Created references/api_reference.md")
-
-        # Create assets/ directory with example asset placeholder
-        assets_dir = skill_dir / 'assets'
-        assets_dir.mkdir(exist_ok=True)
-        example_asset = assets_dir / 'example_asset.txt'
-        example_asset.write_text(EXAMPLE_ASSET)
-        print("✅ Created assets/example_asset.txt")
+        scaffold_skill(skill_dir, template_files, context, existing_files, force=force)
     except Exception as e:
-        print(f"❌ Error creating resource directories: {e}")
+        print(f"❌ Error writing skill files: {e}")
         return None
 
     # Print next steps
@@ -270,28 +440,173 @@ def init_skill(skill_name, path):
     return skill_dir
 
 
+def load_manifest(manifest_path):
+    """
+    Load a bulk manifest (YAML or JSON).
+
+    The manifest is either a list of skills or a mapping with optional
+    'path' and 'template' defaults and a 'skills' list. Each skill is a name
+    string or a mapping with 'name' and optional 'path'/'template'.
+
+    Returns:
+        Tuple of (defaults dict, list of skill dicts)
+
+    Raises:
+        ValueError: If the manifest is malformed
+    """
+    import yaml  # only manifests need PyYAML (JSON is valid YAML)
+
+    data = yaml.safe_load(Path(manifest_path).read_text())
+    if isinstance(data, list):
+        defaults, skills = {}, data
+    elif isinstance(data, dict):
+        defaults = {key: data[key] for key in ('path', 'template') if key in data}
+        skills = data.get('skills')
+    else:
+        raise ValueError("Manifest must be a list of skills or a mapping with a 'skills' list")
+
+    if not isinstance(skills, list):
+        raise ValueError("Manifest 'skills' must be a list")
+
+    entries = []
+    for i, skill in enumerate(skills):
+        if isinstance(skill, str):
+            skill = {'name': skill}
+        if not isinstance(skill, dict) or not isinstance(skill.get('name'), str):
+            raise ValueError(f"Manifest entry {i} must be a skill name or a mapping with a 'name'")
+        entries.append(skill)
+    return defaults, entries
+
+
+def init_skills_from_manifest(manifest_path, path=None, template='default', force=False):
+    """
+    Scaffold every skill listed in a manifest in a single process.
+
+    Each output directory is scanned once up front and each template is loaded
+    once, so scaffolding many skills costs one pass over the filesystem.
+    Relative paths and template directories in the manifest are resolved against
+    the manifest's directory; a relative --path or --template directory is
+    resolved against the current directory.
+
+    Args:
+        manifest_path: Path to the YAML/JSON manifest
+        path: Default output path (overridden by the manifest's 'path')
+        template: Default template (overridden by the manifest's 'template')
+        force: Overwrite existing files that differ from the template
+
+    Returns:
+        List of (skill_name, skill_dir or None) tuples
+    """
+    manifest_path = Path(manifest_path).resolve()
+    defaults, entries = load_manifest(manifest_path)
+    if 'path' in defaults:
+        default_path = manifest_path.parent / defaults['path']
+    else:
+        default_path = Path(path) if path else None
+
+    def manifest_template(value):
+        # A directory next to the manifest wins over a template of the same name
+        template_dir = manifest_path.parent / value
+        return str(template_dir) if template_dir.is_dir() else value
+
+    default_template = manifest_template(defaults['template']) if 'template' in defaults else template
+
+    existing_by_base = {}
+    results = []
+    for entry in entries:
+        skill_name = entry['name']
+        error = validate_skill_name(skill_name)
+        if error:
+            print(f"❌ {error}")
+            results.append((skill_name, None))
+            continue
+        base = manifest_path.parent / entry['path'] if 'path' in entry else default_path
+        if base is None:
+            print(f"❌ {skill_name}: no output path (set 'path' in the manifest or pass --path)")
+            results.append((skill_name, None))
+            continue
+        base = base.resolve()
+
+        # One directory listing per output path, shared by all skills in it
+        if base not in existing_by_base:
+            existing_by_base[base] = {e.name for e in os.scandir(base) if e.is_dir()} if base.is_dir() else set()
+
+        skill_dir = base / skill_name
+        existing_files = list_existing_files(skill_dir) if skill_name in existing_by_base[base] else None
+        context = {'skill_name': skill_name, 'skill_title': title_case_skill_name(skill_name)}
+        try:
+            template_files = load_template(manifest_template(entry['template']) if 'template' in entry
+                                           else default_template)
+            counts = scaffold_skill(skill_dir, template_files, context, existing_files, force=force, verbose=False)
+        except Exception as e:
+            print(f"❌ {skill_name}: {e}")
+            results.append((skill_name, None))
+            continue
+
+        existing_by_base[base].add(skill_name)
+        print(
+            f"✅ {skill_name}: {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['kept']} kept ({skill_dir})"
+        )
+        results.append((skill_name, skill_dir))
+
+    return results
+
+
 def main():
-    if len(sys.argv) < 4 or sys.argv[2] != '--path':
-        print("Usage: init_skill.py <skill-name> --path <path>")
-        print("\nSkill name requirements:")
-        print("  - Hyphen-case identifier (e.g., 'data-analyzer')")
-        print("  - Lowercase letters, digits, and hyphens only")
-        print("  - Max 40 characters")
-        print("  - Must match directory name exactly")
+    parser = argparse.ArgumentParser(
+        description='Create a new skill from a template, or scaffold many skills from a manifest',
+        epilog=(
+            "Skill name requirements: hyphen-case identifier (e.g., 'data-analyzer'), "
+            "lowercase letters, digits, and hyphens only, max 40 characters, "
+            "must match directory name exactly."
+        ),
+    )
+    parser.add_argument('skill_name', nargs='?', help='Name of the skill to create')
+    parser.add_argument('--path', help='Directory to create the skill in (default output path for --manifest)')
+    parser.add_argument('--template', default='default',
+                        help="Template name under scripts/templates/ or a template directory (default: built-in)")
+    parser.add_argument('--manifest', help='YAML/JSON manifest listing skills to scaffold in bulk')
+    parser.add_argument('--force', action='store_true',
+                        help='Overwrite existing files that differ from the template')
+    args = parser.parse_args()
+
+    if args.manifest:
+        if args.skill_name:
+            parser.error('a skill name cannot be combined with --manifest')
+        print(f"🚀 Initializing skills from manifest: {args.manifest}")
+        print()
+        try:
+            results = init_skills_from_manifest(args.manifest, args.path, args.template, args.force)
+        except Exception as e:
+            print(f"❌ Error reading manifest: {e}")
+            sys.exit(1)
+        failed = sum(1 for _name, skill_dir in results if skill_dir is None)
+        print(f"\nInitialized {len(results) - failed}/{len(results)} skill(s)")
+        sys.exit(1 if failed else 0)
+
+    if not args.skill_name or not args.path:
+        parser.print_usage()
         print("\nExamples:")
         print("  init_skill.py my-new-skill --path skills/public")
         print("  init_skill.py my-api-helper --path skills/private")
         print("  init_skill.py custom-skill --path /custom/location")
+        print("  init_skill.py web-smoke --path skills/public --template webapp-testing")
+        print("  init_skill.py --manifest skills.yaml --path skills/public")
         sys.exit(1)
 
-    skill_name = sys.argv[1]
-    path = sys.argv[3]
+    error = validate_skill_name(args.skill_name)
+    if error:
+        print(f"❌ {error}")
+        sys.exit(1)
 
-    print(f"🚀 Initializing skill: {skill_name}")
-    print(f"   Location: {path}")
+    print(f"🚀 Initializing skill: {args.skill_name}")
+    print(f"   Location: {args.path}")
+    if args.template != 'default':
+        print(f"   Template: {args.template}")
     print()
 
-    result = init_skill(skill_name, path)
+    result = init_skill(args.skill_name, args.path, args.template, args.force)
 
     if result:
         sys.exit(0)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Start one or more servers, wait for them to be ready, run a command, then clean up.
+
+Usage:
+    # Single server
+    python scripts/with_server.py --server "npm run dev" --port 5173 -- python automation.py
+    python scripts/with_server.py --server "npm start" --port 3000 -- python test.py
+
+    # Multiple servers
+    python scripts/with_server.py \
+      --server "cd backend && python server.py" --port 3000 \
+      --server "cd frontend && npm run dev" --port 5173 \
+      -- python test.py
+"""
+
+import os
+import signal
+import subprocess
+import socket
+import time
+import sys
+import argparse
+from contextlib import contextmanager
+
+def is_server_ready(port, timeout=30):
+    """Wait for server to be ready by polling the port."""
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        try:
+            with socket.create_connection(('localhost', port), timeout=1):
+                return True
+        except (socket.error, ConnectionRefusedError):
+            time.sleep(0.5)
+    return False
+
+
+def start_servers(servers, timeout=30, output=subprocess.PIPE):
+    """
+    Start servers in order, waiting for each port before starting the next.
+
+    Args:
+        servers: list of {'cmd': str, 'port': int}, optionally with 'env': {name: value} overrides
+                 and 'cwd' to run the command in
+        output: where server stdout/stderr go (PIPE, DEVNULL or an open file)
+
+    Returns:
+        list of Popen processes (already stopped again if one failed to start)
+    """
+    server_processes = []
+    try:
+        for i, server in enumerate(servers):
+            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
+
+            # Use shell=True to support commands with cd and &&. The server gets its own
+            # process group so stop_servers() also stops what the shell spawned (npm -> node).
+            process = subprocess.Popen(
+                server['cmd'],
+                shell=True,
+                stdout=output,
+                stderr=output,
+                env={**os.environ, **server['env']} if server.get('env') else None,
+                cwd=server.get('cwd'),
+                start_new_session=os.name == 'posix'
+            )
+            server_processes.append(process)
+
+            # Wait for this server to be ready
+            print(f"Waiting for server on port {server['port']}...")
+            if not is_server_ready(server['port'], timeout=timeout):
+                raise RuntimeError(f"Server failed to start on port {server['port']} within {timeout}s")
+
+            print(f"Server ready on port {server['port']}")
+    except BaseException:
+        stop_servers(server_processes)
+        raise
+
+    print(f"\nAll {len(servers)} server(s) ready")
+    return server_processes
+
+
+def _signal_server(process, sig):
+    """Signal the server's whole process group (just the shell on Windows)."""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def stop_servers(server_processes):
+    """Terminate servers, killing any that do not exit within 5 seconds."""
+    print(f"\nStopping {len(server_processes)} server(s)...")
+    for i, process in enumerate(server_processes):
+        try:
+            _signal_server(process, signal.SIGTERM)
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _signal_server(process, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            process.wait()
+        print(f"Server {i+1} stopped")
+    print("All servers stopped")
+
+
+@contextmanager
+def servers_running(servers, timeout=30, output=subprocess.PIPE):
+    """Context manager form of start_servers/stop_servers, for test fixtures."""
+    server_processes = start_servers(servers, timeout, output)
+    try:
+        yield server_processes
+    finally:
+        stop_servers(server_processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run command with one or more servers')
+    parser.add_argument('--server', action='append', dest='servers', required=True, help='Server command (can be repeated)')
+    parser.add_argument('--port', action='append', dest='ports', type=int, required=True, help='Port for each server (must match --server count)')
+    parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds per server (default: 30)')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run after server(s) ready')
+
+    args = parser.parse_args()
+
+    # Remove the '--' separator if present
+    if args.command and args.command[0] == '--':
+        args.command = args.command[1:]
+
+    if not args.command:
+        print("Error: No command specified to run")
+        sys.exit(1)
+
+    # Parse server configurations
+    if len(args.servers) != len(args.ports):
+        print("Error: Number of --server and --port arguments must match")
+        sys.exit(1)
+
+    servers = []
+    for cmd, port in zip(args.servers, args.ports):
+        servers.append({'cmd': cmd, 'port': port})
+
+    with servers_running(servers, timeout=args.timeout):
+        # Run the command
+        print(f"Running: {' '.join(args.command)}\n")
+        result = subprocess.run(args.command)
+    sys.exit(result.returncode)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+FitConnect Auth Hot-Path Benchmark
+Measures how much login/register traffic one server instance sustains.
+Every login and register hashes or compares with bcrypt (SALT_ROUNDS in
+src/lib/auth.ts), and every authenticated request verifies a JWT with jose.
+
+For each mode (login, register) and concurrency level, closed-loop workers
+hammer the endpoint for a fixed duration while a probe session polls other
+routes (by default /api/auth/me and /api/coaches). The benchmark records:
+- throughput (successful requests/s), error and 429 counts, latency percentiles
+- server CPU (100% = one core) and RSS, summed over the process tree on the port
+- probe latency relative to an idle baseline; a level whose probe p95 grows
+  beyond --max-degradation times the baseline is "degraded"
+
+The sustainable rate is the best throughput of a level that is not degraded
+and has under 1% errors. Each request uses its own X-Forwarded-For address so
+the per-IP auth rate limit does not throttle the run. Register mode creates a
+bench_auth_* user per request.
+
+Usage:
+    python bench_auth.py
+    python bench_auth.py --modes login --levels 1,2,4,8,16,32 --duration 15
+    python bench_auth.py --probe /api/auth/me --max-degradation 2
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, LatencyStats, SEEDED_CLIENTS, SEEDED_COACHES, DEMO_PASSWORD, format_summary, virtual_ip
+from proc_stats import CpuMeter, find_listening_pid
+
+BASE_URL = 'http://localhost:3000'
+AUTH_SOURCE = os.path.join(os.path.dirname(__file__), '..', 'src', 'lib', 'auth.ts')
+DEFAULT_PROBES = ['/api/auth/me', '/api/coaches?limit=1']
+MODES = ['login', 'register']
+
+
+def bcrypt_cost():
+    """SALT_ROUNDS as configured in src/lib/auth.ts (None if it cannot be read)"""
+    try:
+        with open(AUTH_SOURCE) as f:
+            match = re.search(r'SALT_ROUNDS\s*=\s*(\d+)', f.read())
+        return int(match.group(1)) if match else None
+    except OSError:
+        return None
+
+
+class Prober:
+    """Polls the probe routes from one logged-in session on a background thread."""
+
+    def __init__(self, client, paths, interval):
+        self.client = client
+        self.paths = paths
+        self.interval = interval
+        self.stats = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.stats = LatencyStats()
+        self.errors = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for path in self.paths:
+                try:
+                    response = self.client.get(path)
+                    self.stats.add(path, response.elapsed)
+                    if response.status != 200:
+                        self.errors += 1
+                except Exception:
+                    self.errors += 1
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return {path: self.stats.summary(path) for path in self.paths}
+
+
+def run_level(base_url, mode, concurrency, duration, ip_counter, run_id, seq):
+    """Closed-loop load: `concurrency` workers send auth requests until the deadline"""
+    stats = LatencyStats()
+    counts = {'ok': 0, 'rate_limited': 0, 'errors': 0, 'server_errors': 0}
+    lock = threading.Lock()
+    accounts = SEEDED_CLIENTS + SEEDED_COACHES
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        client = ApiClient(base_url)
+        try:
+            for n in itertools.count():
+                if time.perf_counter() >= deadline:
+                    break
+                client.client_ip = virtual_ip(next(ip_counter))
+                client.cookies.clear()
+                if mode == 'login':
+                    body = {'email': accounts[(index + n) % len(accounts)], 'password': DEMO_PASSWORD}
+                else:
+                    body = {'email': f"bench_auth_{run_id}_{next(seq)}@example.com", 'password': DEMO_PASSWORD,
+                            'role': 'CLIENT', 'displayName': 'Auth Bench'}
+                try:
+                    response = client.post(f'/api/auth/{mode}', json_body=body)
+                except Exception:
+                    with lock:
+                        counts['errors'] += 1
+                    continue
+                stats.add(mode, response.elapsed)
+                with lock:
+                    if response.status in (200, 201):
+                        counts['ok'] += 1
+                    elif response.status == 429:
+                        counts['rate_limited'] += 1
+                    else:
+                        counts['errors'] += 1
+                        if response.status >= 500:
+                            counts['server_errors'] += 1
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return counts, stats.summary(mode), wall
+
+
+def run_auth_benchmark(base_url=BASE_URL, modes=None, levels=None, duration=10, probes=None,
+                       probe_interval=0.1, max_degradation=3.0, server_pid=None):
+    """Run the benchmark and return the report dict"""
+    modes = modes or MODES
+    levels = levels or [1, 2, 4, 8, 16]
+    probes = probes or DEFAULT_PROBES
+    print("=" * 60)
+    print("FITCONNECT AUTH HOT-PATH BENCHMARK")
+    print("=" * 60)
+
+    cost = bcrypt_cost()
+    pid = server_pid or find_listening_pid(urlsplit(base_url).port or 80)
+    meter = CpuMeter(pid) if pid else None
+    print(f"\nbcrypt SALT_ROUNDS: {cost if cost is not None else 'unknown'} | "
+          f"server pid: {pid or 'not found (CPU not measured)'}")
+
+    ip_counter = itertools.count(1000)
+    seq = itertools.count()
+    run_id = int(time.time())
+    probe_client = ApiClient(base_url, client_ip=virtual_ip(999))
+    if not probe_client.login(SEEDED_CLIENTS[0]):
+        print(f"❌ Could not log in {SEEDED_CLIENTS[0]} for the probe session - is the database seeded?")
+        return None
+    prober = Prober(probe_client, probes, probe_interval)
+
+    print(f"\n=== Idle baseline ({duration}s) ===")
+    if meter:
+        meter.read()
+    prober.start()
+    time.sleep(duration)
+    baseline = prober.stop()
+    idle = meter.read() if meter else {}
+    for path, summary in baseline.items():
+        print(f"    {format_summary(path, summary)}")
+
+    results = []
+    for mode in modes:
+        print(f"\n=== {mode}: {duration}s per level ===")
+        print(f"  {'conc':>5} {'ok/s':>8} {'p50':>8} {'p95':>8} {'errors':>7} {'429':>5} {'cpu%':>7} {'probe p95 x':>12}")
+        for concurrency in levels:
+            if meter:
+                meter.read()
+            prober.start()
+            counts, latency, wall = run_level(base_url, mode, concurrency, duration, ip_counter, run_id, seq)
+            probe = prober.stop()
+            usage = meter.read() if meter else {}
+            ratios = {path: round(probe[path]['p95_ms'] / baseline[path]['p95_ms'], 2)
+                      if baseline[path]['p95_ms'] else None for path in probes}
+            worst = max((r for r in ratios.values() if r is not None), default=None)
+            total = counts['ok'] + counts['errors'] + counts['rate_limited']
+            row = {
+                'mode': mode,
+                'concurrency': concurrency,
+                'throughput_per_s': round(counts['ok'] / wall, 2) if wall else 0.0,
+                'requests': total,
+                **counts,
+                'latency': latency,
+                'cpu_pct': usage.get('cpu_pct'),
+                'rss_mb': usage.get('rss_mb'),
+                'probe': probe,
+                'probe_p95_ratio': ratios,
+                'probe_errors': prober.errors,
+                'degraded': worst is not None and worst > max_degradation,
+            }
+            row['error_rate'] = round((counts['errors'] + counts['rate_limited']) / total, 4) if total else 0.0
+            results.append(row)
+            mark = '⚠️ ' if row['degraded'] else '  '
+            print(f"{mark}{concurrency:>5} {row['throughput_per_s']:>8} {latency['p50_ms']:>7}ms {latency['p95_ms']:>7}ms "
+                  f"{counts['errors']:>7} {counts['rate_limited']:>5} {str(row['cpu_pct'] or '-'):>7} "
+                  f"{str(worst or '-'):>12}")
+
+    probe_client.close()
+
+    sustainable = {}
+    for mode in modes:
+        healthy = [r for r in results if r['mode'] == mode and not r['degraded'] and r['error_rate'] < 0.01]
+        best = max(healthy, key=lambda r: r['throughput_per_s'], default=None)
+        sustainable[mode] = {'throughput_per_s': best['throughput_per_s'], 'concurrency': best['concurrency'],
+                             'cpu_pct': best['cpu_pct']} if best else None
+
+    print("\n" + "=" * 60)
+    print("AUTH BENCHMARK SUMMARY")
+    print("=" * 60)
+    print(f"\nJWT verification (GET /api/auth/me, idle): p50 {baseline.get('/api/auth/me', {}).get('p50_ms', '-')}ms")
+    for mode, best in sustainable.items():
+        if best:
+            print(f"Sustainable {mode}: {best['throughput_per_s']}/s at concurrency {best['concurrency']} "
+                  f"(probe p95 within {max_degradation}x of idle)")
+        else:
+            print(f"Sustainable {mode}: none - every level degraded the probes or failed")
+    server_errors = sum(r['server_errors'] for r in results)
+
+    report = {
+        'config': {'base_url': base_url, 'modes': modes, 'levels': levels, 'duration_s': duration,
+                   'probes': probes, 'probe_interval_s': probe_interval, 'max_degradation': max_degradation,
+                   'bcrypt_salt_rounds': cost, 'server_pid': pid},
+        'baseline': {'probe': baseline, 'cpu_pct': idle.get('cpu_pct'), 'rss_mb': idle.get('rss_mb')},
+        'levels': results,
+        'sustainable': sustainable,
+        'server_errors': server_errors,
+    }
+    results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, 'auth_benchmark.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Login/register throughput vs JWT and route latency')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated modes (default: {','.join(MODES)})")
+    parser.add_argument('--levels', default='1,2,4,8,16', help='Comma-separated concurrency levels (default: 1,2,4,8,16)')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per level and for the baseline (default: 10)')
+    parser.add_argument('--probe', help=f"Comma-separated probe paths (default: {','.join(DEFAULT_PROBES)})")
+    parser.add_argument('--probe-interval', type=float, default=0.1, help='Seconds between probe rounds (default: 0.1)')
+    parser.add_argument('--max-degradation', type=float, default=3.0,
+                        help='Probe p95 multiple of idle that counts as degraded (default: 3.0)')
+    parser.add_argument('--server-pid', type=int, help='Server pid for CPU sampling (default: owner of the port)')
+    args = parser.parse_args()
+    modes = [m for m in args.modes.split(',') if m]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    report = run_auth_benchmark(args.base_url, modes, [int(n) for n in args.levels.split(',')], args.duration,
+                                args.probe.split(',') if args.probe else None, args.probe_interval,
+                                args.max_degradation, args.server_pid)
+    sys.exit(0 if report and not report['server_errors'] else 1)
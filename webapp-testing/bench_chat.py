@@ -0,0 +1,205 @@
+"""
+FitConnect Chat Messaging Benchmark
+Creates chat threads between the seeded clients and coaches, then has every
+participant send and page through messages concurrently via
+/api/chat/threads/[id]/messages.
+
+Measures:
+- send latency (POST until 201)
+- send-to-visible latency (POST start until broadcastMessage reaches the
+  realtime stand-in, i.e. when subscribed browsers would render it)
+- pagination cost of the first and last page as threads grow
+
+The server must broadcast to the embedded realtime stand-in:
+    NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local npm run dev
+    python bench_chat.py --messages 200 --concurrency 16
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import (ApiClient, LatencyStats, SEEDED_CLIENTS, SEEDED_COACHES, format_summary,
+                       linear_slope, parse_json, run_concurrently, virtual_ip)
+from realtime_standin import DEFAULT_PORT, start_standin
+
+BASE_URL = 'http://localhost:3000'
+PAGE_SIZE = 50
+
+def login_participants(base_url, emails, first_ip=1):
+    """Log in each account with its own session; returns {user_id: (email, client)}"""
+    participants = {}
+    for i, email in enumerate(emails):
+        client = ApiClient(base_url, client_ip=virtual_ip(first_ip + i))
+        user = client.login(email)
+        if user and user.get('id'):
+            participants[user['id']] = (email, client)
+        else:
+            print(f"    ⚠️  Could not log in {email}")
+    return participants
+
+def create_threads(clients, coaches_by_profile):
+    """Create (or reuse) a thread for every client/coach pair"""
+    threads = []
+    for client_id, (_email, client) in clients.items():
+        for profile_id, coach_user_id in coaches_by_profile.items():
+            response = client.post('/api/chat/threads', json_body={'coachId': profile_id})
+            data = parse_json(response) or {}
+            if response.status in (200, 201) and data.get('id'):
+                threads.append({'id': data['id'], 'participants': [client_id, coach_user_id]})
+    return threads
+
+def run_chat_benchmark(base_url=BASE_URL, messages=100, checkpoints=5, concurrency=8,
+                       sample_threads=4, standin_port=DEFAULT_PORT, seed=7):
+    """Run the benchmark and return the report dict"""
+    print("=" * 60)
+    print("FITCONNECT CHAT MESSAGING BENCHMARK")
+    print("=" * 60)
+
+    rng = random.Random(seed)
+    hub = None
+    server = None
+    if standin_port:
+        server, hub = start_standin(standin_port)
+        print(f"\n📡 Realtime stand-in on ws://127.0.0.1:{standin_port}/realtime/v1/websocket")
+
+    print("\n=== Setting Up Participants ===")
+    clients = login_participants(base_url, SEEDED_CLIENTS)
+    coaches = login_participants(base_url, SEEDED_COACHES, first_ip=len(SEEDED_CLIENTS) + 1)
+    listing = parse_json(ApiClient(base_url).get('/api/coaches?limit=100')) or {}
+    coaches_by_profile = {c['id']: c['userId'] for c in listing.get('data', []) if c['userId'] in coaches}
+    participants = {**clients, **coaches}
+    threads = create_threads(clients, coaches_by_profile)
+    print(f"    {len(clients)} clients, {len(coaches)} coaches, {len(threads)} threads")
+    if not threads:
+        print("❌ No threads could be created - is the database seeded?")
+        if server:
+            server.shutdown()
+        return None
+
+    send_stats = LatencyStats()
+    visible_stats = LatencyStats()
+    page_stats = LatencyStats()
+    sent = []
+    failures = 0
+    checkpoints = max(1, min(checkpoints, messages))
+    round_sizes = [messages // checkpoints + (1 if r < messages % checkpoints else 0) for r in range(checkpoints)]
+    sampled = rng.sample(threads, min(sample_threads, len(threads)))
+    growth = []
+
+    def send(work):
+        thread, sender_id, seq = work
+        client = participants[sender_id][1]
+        start = time.perf_counter()
+        response = client.post(f"/api/chat/threads/{thread['id']}/messages",
+                               json_body={'content': f"bench message {seq} from {sender_id[-6:]}"})
+        send_stats.add('send', response.elapsed)
+        data = parse_json(response) or {}
+        return response.status, data.get('id'), start
+
+    def page(work):
+        thread, page_number, label = work
+        reader = participants[thread['participants'][0]][1]
+        response = reader.get(f"/api/chat/threads/{thread['id']}/messages?page={page_number}&limit={PAGE_SIZE}")
+        page_stats.add(label, response.elapsed)
+        return response.status
+
+    print(f"\n=== Sending {messages} messages per thread in {checkpoints} rounds (concurrency {concurrency}) ===")
+    length = 0
+    for round_number, per_round in enumerate(round_sizes):
+        work = []
+        for thread in threads:
+            for i in range(per_round):
+                work.append((thread, rng.choice(thread['participants']), length + i))
+        rng.shuffle(work)
+
+        round_start = time.perf_counter()
+        for (_work, outcome, exc) in run_concurrently(send, work, concurrency):
+            if exc is not None or outcome[0] != 201:
+                failures += 1
+            else:
+                sent.append((outcome[1], outcome[2]))
+        round_wall = time.perf_counter() - round_start
+        length += per_round
+
+        # Pagination cost at this thread length: newest page and oldest page
+        last_page = max(1, -(-length // PAGE_SIZE))
+        page_work = [(t, 1, f"first@{length}") for t in sampled] + [(t, last_page, f"last@{length}") for t in sampled]
+        run_concurrently(page, page_work, concurrency)
+        first = page_stats.summary(f"first@{length}")
+        last = page_stats.summary(f"last@{length}")
+        growth.append({'length': length, 'first_page_p50_ms': first['p50_ms'], 'last_page_p50_ms': last['p50_ms'],
+                       'first_page_p95_ms': first['p95_ms'], 'last_page_p95_ms': last['p95_ms']})
+        print(f"    round {round_number + 1}: {len(work)} sends in {round_wall:.2f}s "
+              f"({len(work) / round_wall:.1f}/s), thread length {length}, "
+              f"page 1 p50 {first['p50_ms']}ms, page {last_page} p50 {last['p50_ms']}ms")
+
+    missing = 0
+    if hub is not None:
+        # One shared deadline: lost broadcasts must not cost the wait once each
+        arrivals = hub.arrival_times([message_id for message_id, _start in sent], timeout=2)
+        for message_id, start in sent:
+            if message_id in arrivals:
+                visible_stats.add('send_to_visible', arrivals[message_id] - start)
+            else:
+                missing += 1
+
+    print("\n" + "=" * 60)
+    print("CHAT BENCHMARK SUMMARY")
+    print("=" * 60)
+    print(f"\nSent: {len(sent)} | Failed sends: {failures} | Not broadcast: {missing if hub else 'n/a'}")
+    print(format_summary('send', send_stats.summary('send')))
+    if hub is not None:
+        print(format_summary('send-to-visible', visible_stats.summary('send_to_visible')))
+        print(f"Realtime fan-out: {hub.stats()}")
+    print("\nPagination cost vs thread length (p50 ms):")
+    print(f"  {'length':>8} {'page 1':>10} {'last page':>10}")
+    for row in growth:
+        print(f"  {row['length']:>8} {row['first_page_p50_ms']:>10} {row['last_page_p50_ms']:>10}")
+    first_slope = linear_slope([(r['length'], r['first_page_p50_ms']) for r in growth]) * 1000
+    last_slope = linear_slope([(r['length'], r['last_page_p50_ms']) for r in growth]) * 1000
+    print(f"  growth: page 1 {first_slope:+.1f}ms, last page {last_slope:+.1f}ms per 1000 messages")
+
+    report = {
+        'config': {'messages_per_thread': messages, 'threads': len(threads), 'concurrency': concurrency,
+                   'checkpoints': checkpoints, 'seed': seed, 'page_size': PAGE_SIZE},
+        'sent': len(sent),
+        'failed_sends': failures,
+        'not_broadcast': missing if hub else None,
+        'send': send_stats.summary('send'),
+        'send_to_visible': visible_stats.summary('send_to_visible') if hub else None,
+        'fanout': hub.stats() if hub else None,
+        'pagination_growth': growth,
+        'pagination_slope_ms_per_1000': {'first_page': round(first_slope, 2), 'last_page': round(last_slope, 2)},
+    }
+
+    results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, 'chat_benchmark.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+
+    for _email, client in participants.values():
+        client.close()
+    if server:
+        server.shutdown()
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Chat send/fan-out/pagination benchmark')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--messages', type=int, default=100, help='Messages sent per thread (default: 100)')
+    parser.add_argument('--checkpoints', type=int, default=5, help='Rounds between pagination measurements (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent requests (default: 8)')
+    parser.add_argument('--sample-threads', type=int, default=4, help='Threads paged at each checkpoint (default: 4)')
+    parser.add_argument('--standin-port', type=int, default=DEFAULT_PORT,
+                        help=f'Port for the embedded realtime stand-in, 0 to disable (default: {DEFAULT_PORT})')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed (default: 7)')
+    args = parser.parse_args()
+    report = run_chat_benchmark(args.base_url, args.messages, args.checkpoints, args.concurrency,
+                                args.sample_threads, args.standin_port, args.seed)
+    sys.exit(0 if report and not report['failed_sends'] else 1)
@@ -0,0 +1,256 @@
+"""
+FitConnect User-Journey Load Test
+Drives virtual users through the Markov journey model in
+journeys/fitconnect.yaml (scripts/journey_model.py) instead of hammering one
+endpoint. Visitors browse coaches and reviews. Clients log in, book,
+message coaches and check their bookings. Coaches read and answer threads
+and check their schedule. Each step waits a think time drawn from the model.
+
+Each virtual user runs journeys back to back until --duration ends. A
+journey picks a role by the mix, a seeded account for that role, a fresh
+session and its own X-Forwarded-For address (so logins stay under the
+auth rate limit). It then walks the chain until `exit`. The report has:
+- per-step latency percentiles and status counts
+- per-role journeys started/completed and end-to-end journey time
+  (with think time) and service time (requests only)
+- the transitions actually taken
+
+A journey completes when every step got an expected status. Journeys still
+running at the deadline are counted as cut off, not failed. Booking intents
+created along the way are cancelled after their journey. Chat threads and
+messages cannot be deleted through the API, so point the app at a database
+clone for these runs (see journeys/fitconnect.yaml and scripts/db_snapshot.py).
+In that clone, mark the coaches stripeOnboarded: the seed leaves them
+unonboarded, and create-intent then rejects every booking with a 400.
+
+Usage:
+    python bench_journeys.py
+    python bench_journeys.py --users 50 --duration 300 --mix visitor=5,client=4,coach=1
+    python bench_journeys.py --think-scale 0.1 --seed 7    # denser traffic, reproducible walks
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, BASE_URL, LatencyStats, format_summary, parse_json, virtual_ip
+from journey_model import ACCOUNTS, Journey, MissingState, leaves_data, load_model, validate
+
+DEFAULT_MODEL = os.path.join(os.path.dirname(__file__), 'journeys', 'fitconnect.yaml')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+
+
+def parse_mix(text):
+    """'visitor=5,client=4' -> {'visitor': 5.0, 'client': 4.0}"""
+    mix = {}
+    for part in (text or '').split(','):
+        if part:
+            role, _, weight = part.partition('=')
+            mix[role.strip()] = float(weight or 1)
+    return mix
+
+
+class JourneyRecorder:
+    """Thread-safe counters for journeys, statuses and transitions."""
+
+    def __init__(self):
+        self.steps = LatencyStats()
+        self.journeys = LatencyStats()
+        self.service = LatencyStats()
+        self.outcomes = {}
+        self.statuses = {}
+        self.transitions = {}
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def step(self, name, status):
+        with self._lock:
+            counts = self.statuses.setdefault(name, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def finish(self, journey, outcome, wall, service, failure=None):
+        with self._lock:
+            counts = self.outcomes.setdefault(journey.role, {'completed': 0, 'failed': 0, 'cut_off': 0})
+            counts[outcome] += 1
+            previous = 'start'
+            for name in journey.path:
+                key = f"{journey.role}: {previous} -> {name}"
+                self.transitions[key] = self.transitions.get(key, 0) + 1
+                previous = name
+            if failure and len(self.failures) < 50:
+                self.failures.append({'role': journey.role, 'path': journey.path, **failure})
+        if outcome == 'completed':
+            self.journeys.add(journey.role, wall)
+            self.service.add(journey.role, service)
+
+
+def run_journey(base_url, model, role, rng, ip_index, recorder, stop, think_scale):
+    accounts = ACCOUNTS[model['roles'][role].get('accounts', 'none')]
+    journey = Journey(model, role, rng, account=rng.choice(accounts) if accounts else None)
+    client = ApiClient(base_url, client_ip=virtual_ip(ip_index))
+    started = time.perf_counter()
+    service = 0.0
+    outcome, failure = 'completed', None
+    try:
+        for name, step in journey:
+            if stop.is_set():
+                outcome = 'cut_off'
+                break
+            try:
+                method, path, body = journey.fill(step)
+            except MissingState as e:
+                outcome, failure = 'failed', {'step': name, 'error': f"no {e} in session state"}
+                break
+            try:
+                response = client.request(method, path, json_body=body)
+            except Exception as e:
+                recorder.step(name, type(e).__name__)
+                outcome, failure = 'failed', {'step': name, 'error': type(e).__name__}
+                break
+            service += response.elapsed
+            recorder.steps.add(name, response.elapsed)
+            recorder.step(name, response.status)
+            if not journey.accepted(step, response.status):
+                outcome, failure = 'failed', {'step': name, 'path': path, 'status': response.status}
+                data = parse_json(response)
+                if isinstance(data, dict) and data.get('error'):
+                    failure['error'] = data['error']
+                break
+            journey.record(step, parse_json(response))
+            if stop.wait(journey.think(step, think_scale)):
+                outcome = 'cut_off'
+                break
+    finally:
+        for method, path, body in journey.cleanups:
+            try:
+                client.request(method, path, json_body=body)
+            except Exception:
+                pass
+        client.close()
+    recorder.finish(journey, outcome, time.perf_counter() - started, service, failure)
+
+
+def run_journeys(base_url=BASE_URL, model_path=DEFAULT_MODEL, users=20, duration=120, mix=None, think_scale=1.0,
+                 seed=None):
+    """Run virtual users for `duration` seconds and return the report dict"""
+    print("=" * 60)
+    print("FITCONNECT USER-JOURNEY LOAD TEST")
+    print("=" * 60)
+    model = load_model(model_path)
+    problems = validate(model)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return None
+    weights = {role: spec.get('weight', 1) for role, spec in model['roles'].items()}
+    unknown = set(mix or {}) - set(weights)
+    if unknown:
+        print(f"❌ Unknown role(s) in mix: {', '.join(sorted(unknown))}")
+        return None
+    weights.update(mix or {})
+    roles = [r for r in weights if weights[r] > 0]
+    persistent = [name for name in leaves_data(model) if any(
+        name in targets for role in roles for targets in
+        [model['roles'][role].get('start', {}), *model['roles'][role].get('transitions', {}).values()])]
+    if persistent:
+        print(f"⚠️  Steps {', '.join(persistent)} leave data the API cannot remove - "
+              f"run the app against a clone (scripts/db_snapshot.py clone), not the shared database")
+    print(f"{users} virtual users for {duration}s, mix "
+          + ", ".join(f"{r}={weights[r]:g}" for r in roles) + f", think x{think_scale:g}")
+
+    recorder = JourneyRecorder()
+    stop = threading.Event()
+    ip_counter = iter(range(3000, 10 ** 7))
+    ip_lock = threading.Lock()
+    master = random.Random(seed)
+
+    def user(rng):
+        # Stagger arrivals over the first couple of (scaled) seconds
+        if stop.wait(rng.uniform(0, 2 * think_scale)):
+            return
+        while not stop.is_set():
+            role = rng.choices(roles, [weights[r] for r in roles])[0]
+            with ip_lock:
+                ip_index = next(ip_counter)
+            run_journey(base_url, model, role, rng, ip_index, recorder, stop, think_scale)
+
+    threads = [threading.Thread(target=user, args=(random.Random(master.random()),), daemon=True)
+               for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    start = time.time()
+    while time.time() - start < duration:
+        time.sleep(max(0, min(10, duration - (time.time() - start))))
+        done = sum(c['completed'] for c in recorder.outcomes.values())
+        failed = sum(c['failed'] for c in recorder.outcomes.values())
+        print(f"  {time.time() - start:>6.0f}s  journeys completed {done}, failed {failed}, "
+              f"steps {recorder.steps.summary()['count']}")
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    print("\n" + "=" * 60)
+    print("JOURNEY SUMMARY")
+    print("=" * 60)
+    print("\nPer step:")
+    for name in recorder.steps.labels():
+        statuses = ', '.join(f"{s}x{n}" for s, n in sorted(recorder.statuses.get(name, {}).items()))
+        print(f"  {format_summary(name, recorder.steps.summary(name))}  [{statuses}]")
+    roles_report = {}
+    print("\nPer role:")
+    for role in roles:
+        counts = recorder.outcomes.get(role, {'completed': 0, 'failed': 0, 'cut_off': 0})
+        finished = counts['completed'] + counts['failed']
+        rate = counts['completed'] / finished if finished else None
+        roles_report[role] = {**counts, 'completion_rate': round(rate, 3) if rate is not None else None,
+                              'journey_time': recorder.journeys.summary(role),
+                              'service_time': recorder.service.summary(role)}
+        journey_time = roles_report[role]['journey_time']
+        print(f"  {role:<8} completed {counts['completed']}, failed {counts['failed']}, cut off {counts['cut_off']}"
+              + (f" ({rate:.0%})" if rate is not None else '')
+              + (f"; journey p50 {journey_time['p50_ms'] / 1000:.1f}s p95 {journey_time['p95_ms'] / 1000:.1f}s, "
+                 f"service p95 {roles_report[role]['service_time']['p95_ms']}ms" if journey_time['count'] else ''))
+    for failure in recorder.failures[:5]:
+        reason = ' '.join(str(failure[key]) for key in ('status', 'error') if key in failure)
+        print(f"  ❌ {failure['role']} failed at {failure['step']}: {reason}")
+
+    report = {
+        'config': {'base_url': base_url, 'model': os.path.relpath(model_path, os.path.dirname(__file__)),
+                   'users': users, 'duration_s': duration, 'mix': {r: weights[r] for r in roles},
+                   'think_scale': think_scale, 'seed': seed, 'leaves_data': persistent},
+        'steps': {name: {**recorder.steps.summary(name), 'statuses': recorder.statuses.get(name, {})}
+                  for name in recorder.steps.labels()},
+        'roles': roles_report,
+        'transitions': dict(sorted(recorder.transitions.items())),
+        'failures': recorder.failures,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, 'journeys.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Virtual users walking a Markov model of FitConnect journeys')
+    parser.add_argument('--url', default=BASE_URL, help=f'App base URL (default: {BASE_URL})')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Journey model file (default: journeys/fitconnect.yaml)')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users (default: 20)')
+    parser.add_argument('--duration', type=int, default=120, help='Seconds to run (default: 120)')
+    parser.add_argument('--mix', help='Role weights overriding the model, e.g. visitor=5,client=4,coach=1')
+    parser.add_argument('--think-scale', type=float, default=1.0, help='Multiply think times (default: 1; 0 = none)')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible walks')
+    parser.add_argument('--min-completion', type=float, default=0.95,
+                        help='Fail if a role completes fewer of its finished journeys (default: 0.95)')
+    args = parser.parse_args()
+    report = run_journeys(args.url, args.model, args.users, args.duration, parse_mix(args.mix), args.think_scale,
+                          args.seed)
+    if not report:
+        sys.exit(1)
+    rates = [r['completion_rate'] for r in report['roles'].values() if r['completion_rate'] is not None]
+    sys.exit(0 if rates and min(rates) >= args.min_completion else 1)
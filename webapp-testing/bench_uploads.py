@@ -0,0 +1,318 @@
+"""
+FitConnect Upload Pipeline Harness
+Uploads files across a size distribution at increasing concurrency and
+measures what whole-file buffering costs the server.
+
+Flows:
+- avatar:  multipart POST /api/user/avatar; the route reads the whole file
+           into memory (formData + arrayBuffer + Buffer copy) before pushing
+           it to Supabase Storage
+- gallery: the browser path - PUT the file straight to storage, then
+           POST /api/coach/gallery with its public URL (the route never sees
+           the bytes) and DELETE it again to stay under the 10-image limit
+
+For each flow x size x concurrency cell it records latency percentiles,
+server RSS (baseline, sampled peak, and after a settle period), the peak
+growth per in-flight megabyte (how many copies of each upload the server
+holds), and failures by kind (HTTP status or connection error). An embedded
+storage stand-in counts the bytes that actually reached storage, so a 200
+without a stored object is reported too. It can also be slowed down or made
+to fail, to see how the app copes with slow or failing storage.
+
+The server must upload to the stand-in:
+    NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local npm run dev
+    python bench_uploads.py --sizes 10KB,1MB,5MB,20MB --levels 1,4,8
+
+Avatars of the seeded accounts are restored when the run ends.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import (ApiClient, LatencyStats, SEEDED_CLIENTS, SEEDED_COACHES, format_summary, parse_json,
+                       run_concurrently, virtual_ip)
+from proc_stats import RssSampler, find_listening_pid
+from storage_standin import DEFAULT_PORT, start_standin
+
+BASE_URL = 'http://localhost:3000'
+FLOWS = ['avatar', 'gallery']
+DEFAULT_SIZES = '10KB,100KB,1MB,5MB,20MB'
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+UNITS = {'': 1, 'B': 1, 'KB': 2 ** 10, 'MB': 2 ** 20, 'GB': 2 ** 30}
+
+
+def parse_size(text):
+    """'10KB' -> 10240"""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMG]?B?)\s*', text.upper())
+    if not match:
+        raise ValueError(f"invalid size: {text}")
+    return int(float(match.group(1)) * UNITS[match.group(2)])
+
+
+def format_size(size):
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+_payloads = {}
+
+
+def payload(size):
+    """Deterministic PNG-looking bytes of the given size, built once per size"""
+    if size not in _payloads:
+        body = random.Random(size).randbytes(max(0, size - len(PNG_SIGNATURE)))
+        _payloads[size] = (PNG_SIGNATURE + body)[:size]
+    return _payloads[size]
+
+
+def multipart(field, filename, content_type, data):
+    """Encode a single-file multipart/form-data body; returns (body, content type header)"""
+    boundary = f"----fitconnect{uuid.uuid4().hex}"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n").encode()
+    return head + data + f"\r\n--{boundary}--\r\n".encode(), f"multipart/form-data; boundary={boundary}"
+
+
+def failure_kind(status=None, exc=None):
+    if exc is not None:
+        return type(exc).__name__
+    return f"HTTP {status}"
+
+
+def login_sessions(base_url, emails, first_ip, timeout):
+    sessions = []
+    for i, email in enumerate(emails):
+        client = ApiClient(base_url, timeout=timeout, client_ip=virtual_ip(first_ip + i))
+        user = client.login(email)
+        if user:
+            sessions.append((email, user, client))
+        else:
+            print(f"    ⚠️  Could not log in {email}")
+    return sessions
+
+
+def run_cell(flow, size, concurrency, uploads, sessions, storage, storage_url, hub, sampler, settle, run_id):
+    """Upload `uploads` files of `size` bytes with `concurrency` in flight; returns the cell dict"""
+    stats = LatencyStats()
+    data = payload(size)
+    mark = hub.mark() if hub else 0
+
+    def avatar(i):
+        _email, _user, client = sessions[i % len(sessions)]
+        body, content_type = multipart('file', f"bench-{i}.png", 'image/png', data)
+        response = client.post('/api/user/avatar', body=body, headers={'Content-Type': content_type})
+        stats.add('upload', response.elapsed)
+        return None if response.status == 200 else failure_kind(response.status)
+
+    def gallery(i):
+        _email, user, client = sessions[i % len(sessions)]
+        key = f"gallery/{user.get('id', 'coach')}/bench-{run_id}-{size}-{i}.png"
+        stored = storage.request('PUT', f"/storage/v1/object/{key}", body=data,
+                                 headers={'Content-Type': 'image/png', 'x-upsert': 'true'})
+        stats.add('storage', stored.elapsed)
+        if stored.status != 200:
+            return f"storage {failure_kind(stored.status)}"
+        registered = client.post('/api/coach/gallery',
+                                 json_body={'url': f"{storage_url}/storage/v1/object/public/{key}"})
+        stats.add('register', registered.elapsed)
+        stats.add('upload', stored.elapsed + registered.elapsed)
+        if registered.status != 201:
+            return failure_kind(registered.status)
+        image_id = (parse_json(registered) or {}).get('id')
+        if image_id:
+            client.request('DELETE', f"/api/coach/gallery/{image_id}")
+        return None
+
+    work = avatar if flow == 'avatar' else gallery
+
+    def attempt(i):
+        try:
+            return work(i)
+        except Exception as e:
+            return failure_kind(exc=e)
+
+    if sampler:
+        sampler.start()
+    start = time.perf_counter()
+    outcomes = [result for _i, result, _exc in run_concurrently(attempt, range(uploads), concurrency)]
+    wall = time.perf_counter() - start
+    if settle:
+        time.sleep(settle)
+    memory = sampler.stop() if sampler else {}
+
+    failures = {}
+    for outcome in outcomes:
+        if outcome:
+            failures[outcome] = failures.get(outcome, 0) + 1
+    ok = uploads - sum(failures.values())
+    cell = {
+        'flow': flow,
+        'size': format_size(size),
+        'size_bytes': size,
+        'concurrency': concurrency,
+        'uploads': uploads,
+        'ok': ok,
+        'failures': failures,
+        'wall_s': round(wall, 2),
+        'throughput_mb_s': round(ok * size / 2 ** 20 / wall, 2) if wall else 0.0,
+        'latency': {label: stats.summary(label) for label in stats.labels()},
+        'memory': memory,
+    }
+    in_flight_mb = size * min(concurrency, uploads) / 2 ** 20
+    if memory and in_flight_mb:
+        cell['copies_per_inflight_upload'] = round(memory['peak_growth_mb'] / in_flight_mb, 2)
+    if hub:
+        stored = [u for u in hub.since(mark) if u['bucket'] == ('avatars' if flow == 'avatar' else 'gallery')]
+        cell['stored'] = len(stored)
+        cell['stored_wrong_size'] = sum(1 for u in stored if u['bytes'] != size)
+        cell['ok_without_object'] = max(0, ok - len(stored))
+    return cell
+
+
+def run_upload_benchmark(base_url=BASE_URL, flows=None, sizes=None, levels=None, uploads=8, settle=1.0,
+                         storage_port=DEFAULT_PORT, storage_delay_ms=0, storage_max_mb=None, storage_fail_every=0,
+                         server_pid=None, timeout=120):
+    """Run every flow x size x concurrency cell and return the report dict"""
+    flows = flows or FLOWS
+    sizes = sizes or [parse_size(s) for s in DEFAULT_SIZES.split(',')]
+    levels = levels or [1, 4, 8]
+    print("=" * 60)
+    print("FITCONNECT UPLOAD PIPELINE HARNESS")
+    print("=" * 60)
+
+    server = hub = None
+    storage_url = None
+    if storage_port:
+        max_bytes = int(storage_max_mb * 2 ** 20) if storage_max_mb else None
+        server, hub = start_standin(storage_port, delay_ms=storage_delay_ms, max_bytes=max_bytes,
+                                    fail_every=storage_fail_every)
+        storage_url = f"http://localhost:{storage_port}"
+        print(f"\n🗄️  Storage stand-in on {storage_url}/storage/v1/object "
+              f"(delay {storage_delay_ms}ms, limit {storage_max_mb or '-'}MB, fail every {storage_fail_every or '-'})")
+    elif 'gallery' in flows:
+        print("\n⚠️  Gallery flow needs the storage stand-in - skipping it")
+        flows = [f for f in flows if f != 'gallery']
+
+    pid = server_pid or find_listening_pid(urlsplit(base_url).port or 80)
+    sampler = RssSampler(pid) if pid else None
+    print(f"Server pid: {pid or 'not found (RSS not measured)'}")
+
+    print("\n=== Logging In ===")
+    clients = login_sessions(base_url, SEEDED_CLIENTS, 500, timeout)
+    coaches = login_sessions(base_url, SEEDED_COACHES, 500 + len(SEEDED_CLIENTS), timeout)
+    print(f"    {len(clients)} clients, {len(coaches)} coaches")
+    everyone = clients + coaches
+    if not everyone:
+        print("❌ No sessions - is the database seeded?")
+        if server:
+            server.shutdown()
+        return None
+    original_avatars = {}
+    for email, _user, client in everyone:
+        profile = parse_json(client.get('/api/user/profile')) or {}
+        original_avatars[email] = profile.get('avatar')
+    storage = ApiClient(storage_url, timeout=timeout) if storage_url else None
+
+    run_id = int(time.time())
+    cells = []
+    for flow in flows:
+        sessions = everyone if flow == 'avatar' else coaches
+        if not sessions:
+            continue
+        print(f"\n=== {flow} ===")
+        print(f"  {'size':>6} {'conc':>5} {'ok':>5} {'p50':>9} {'p95':>9} {'MB/s':>7} {'peak +MB':>9} "
+              f"{'copies':>7}  failures")
+        for size in sizes:
+            for concurrency in levels:
+                cell = run_cell(flow, size, concurrency, max(uploads, concurrency), sessions, storage,
+                                storage_url, hub, sampler, settle, run_id)
+                cells.append(cell)
+                latency = cell['latency'].get('upload', {})
+                failures = ', '.join(f"{kind} x{n}" for kind, n in cell['failures'].items())
+                if cell.get('ok_without_object'):
+                    failures += f"{', ' if failures else ''}no object x{cell['ok_without_object']}"
+                mark = '❌' if cell['failures'] or cell.get('ok_without_object') else '✅'
+                print(f"{mark} {cell['size']:>6} {concurrency:>5} {cell['ok']:>5} {latency.get('p50_ms', '-'):>7}ms "
+                      f"{latency.get('p95_ms', '-'):>7}ms {cell['throughput_mb_s']:>7} "
+                      f"{str(cell['memory'].get('peak_growth_mb', '-')):>9} "
+                      f"{str(cell.get('copies_per_inflight_upload', '-')):>7}  {failures}")
+
+    restored = 0
+    for email, _user, client in everyone:
+        response = client.request('PATCH', '/api/user/profile', json_body={'avatar': original_avatars.get(email) or ''})
+        restored += response.status == 200
+        client.close()
+    if storage:
+        storage.close()
+
+    print("\n" + "=" * 60)
+    print("UPLOAD HARNESS SUMMARY")
+    print("=" * 60)
+    failed_cells = [c for c in cells if c['failures'] or c.get('ok_without_object')]
+    print(f"\nCells: {len(cells)} | With failures: {len(failed_cells)} | Avatars restored: {restored}/{len(everyone)}")
+    buffered = [c for c in cells if c['flow'] == 'avatar' and c.get('copies_per_inflight_upload') is not None]
+    if buffered:
+        worst = max(buffered, key=lambda c: c['memory']['peak_growth_mb'])
+        print(f"Worst avatar RSS peak: +{worst['memory']['peak_growth_mb']}MB at {worst['size']} x {worst['concurrency']} "
+              f"({worst['copies_per_inflight_upload']} copies per in-flight upload)")
+        for cell in buffered:
+            if cell['size_bytes'] == max(sizes):
+                print(format_summary(f"avatar {cell['size']} x{cell['concurrency']}", cell['latency'].get('upload', {})))
+    if hub:
+        print(f"Storage: {hub.stats()}")
+
+    report = {
+        'config': {'base_url': base_url, 'flows': flows, 'sizes': [format_size(s) for s in sizes], 'levels': levels,
+                   'uploads_per_cell': uploads, 'settle_s': settle, 'server_pid': pid,
+                   'storage': {'port': storage_port, 'delay_ms': storage_delay_ms, 'max_mb': storage_max_mb,
+                               'fail_every': storage_fail_every}},
+        'cells': cells,
+        'storage': hub.stats() if hub else None,
+        'avatars_restored': restored,
+    }
+    results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, 'upload_benchmark.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+
+    if server:
+        server.shutdown()
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Avatar/gallery upload latency, RSS growth and failure modes')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--flows', default=','.join(FLOWS), help=f"Comma-separated flows (default: {','.join(FLOWS)})")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'Comma-separated file sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--levels', default='1,4,8', help='Comma-separated concurrency levels (default: 1,4,8)')
+    parser.add_argument('--uploads', type=int, default=8, help='Uploads per cell, at least the concurrency (default: 8)')
+    parser.add_argument('--settle', type=float, default=1.0, help='Seconds to wait before the final RSS sample (default: 1)')
+    parser.add_argument('--storage-port', type=int, default=DEFAULT_PORT,
+                        help=f'Port for the embedded storage stand-in, 0 to disable (default: {DEFAULT_PORT})')
+    parser.add_argument('--storage-delay-ms', type=int, default=0, help='Slow every storage upload by this much')
+    parser.add_argument('--storage-max-mb', type=float, help='Stand-in rejects larger uploads with 413')
+    parser.add_argument('--storage-fail-every', type=int, default=0, help='Stand-in fails every Nth upload with 500')
+    parser.add_argument('--server-pid', type=int, help='Server pid for RSS sampling (default: owner of the port)')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds (default: 120)')
+    args = parser.parse_args()
+    flows = [f for f in args.flows.split(',') if f]
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown flow(s): {', '.join(sorted(unknown))}")
+    report = run_upload_benchmark(args.base_url, flows, [parse_size(s) for s in args.sizes.split(',')],
+                                  [int(n) for n in args.levels.split(',')], args.uploads, args.settle,
+                                  args.storage_port, args.storage_delay_ms, args.storage_max_mb,
+                                  args.storage_fail_every, args.server_pid, args.timeout)
+    sys.exit(0 if report and not any(c['failures'] or c.get('ok_without_object') for c in report['cells']) else 1)
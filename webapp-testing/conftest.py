@@ -0,0 +1,374 @@
+"""
+pytest integration for the FitConnect suites (test_fitconnect.py, test_api.py).
+
+The suites' test functions run unchanged: each gets a fresh `page` from a
+session-wide browser, and the log_result() checks it records are collected
+per test; any failed check fails the test. The session also:
+- starts/stops the app around the run with the with_server.py lifecycle (--server-cmd)
+- optionally points that app at a fresh clone of the seeded database template
+  (--db-clone, see scripts/db_snapshot.py), dropped when the session ends
+- optionally records the SQL each test runs (--query-profile, pg_stat_statements
+  via scripts/query_profile.py): query count, DB time and slowest statements per test
+- optionally retries failed tests in a fresh context (--retries N); a test that
+  passes on retry is reported as flaky
+- appends every run to the flakiness history and updates the quarantine list
+  (scripts/flaky_tests.py); quarantined tests run in a non-blocking lane whose
+  failures are reported as xfail (--quarantine run|skip|only|off)
+- writes screenshots/pytest_results.json (same shape as the script-mode results, plus per-test timings)
+- works with pytest-xdist (-n): the server is managed once by the controller,
+  each worker launches one browser, and results are merged on the controller
+
+Usage:
+    cd webapp-testing
+    pytest                                              # app already running on :3000
+    pytest --server-cmd "cd .. && npm run dev" --server-timeout 120
+    pytest --server-cmd "cd .. && npm run dev" --db-clone    # after `scripts/db_snapshot.py snapshot`
+    pytest -n 4 --junitxml screenshots/junit.xml        # needs pytest-xdist
+    pytest test_api.py -k coaches
+    pytest --record-impact                              # refresh screenshots/impact_map.json
+    pytest test_api.py --query-profile                  # per-test SQL in pytest_results.json (no -n)
+    pytest --retries 2                                  # rerun only failed tests, up to twice each
+    pytest --quarantine only                            # the quarantined lane on its own
+"""
+import json
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from browser_server import launch_browser
+from db_snapshot import PsqlError, SnapshotError, TemplateDB
+from flaky_tests import load_history, load_quarantine, record_run, run_outcomes, score_tests, update_quarantine
+from impact_map import DEFAULT_MAP, build_static_map, load_map, merge_recorded, save_map
+from query_profile import QueryCapture
+from suite_runner import ResultLog, activate
+from with_server import is_server_ready, start_servers, stop_servers
+
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+_TESTS = []   # per-test outcomes, merged from every worker on the controller
+_IMPACT = {}  # node id -> URL paths requested, for --record-impact
+_RERUNS = {}  # node id -> failed attempts that were retried
+RETRY_PENDING = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('fitconnect')
+    group.addoption('--server-cmd', help='Start the app with this command for the session (default: expect it running)')
+    group.addoption('--server-port', type=int, default=3000, help='App port (default: 3000)')
+    group.addoption('--server-timeout', type=int, default=120, help='Seconds to wait for the app (default: 120)')
+    group.addoption('--results-json', default=os.path.join(SCREENSHOTS_DIR, 'pytest_results.json'),
+                    help='Where to write the JSON report')
+    group.addoption('--headed', action='store_true', help='Show the browser')
+    group.addoption('--record-impact', nargs='?', const=DEFAULT_MAP, metavar='PATH',
+                    help=f'Record the paths each test requests into the impact map (default: {DEFAULT_MAP})')
+    group.addoption('--db-clone', nargs='?', const='pytest', metavar='NAME',
+                    help='Run the --server-cmd app against a fresh clone of the database template (default name: pytest)')
+    group.addoption('--query-profile', action='store_true',
+                    help='Record query count, DB time and slowest statements per test (needs pg_stat_statements)')
+    group.addoption('--retries', type=int, default=0, metavar='N',
+                    help='Rerun a failed test up to N times in a fresh context; passing on retry marks it flaky')
+    group.addoption('--quarantine', choices=['run', 'skip', 'only', 'off'], default='run',
+                    help='Quarantined flaky tests: run without failing the session (default), skip them, '
+                         'run only them, or treat them like any other test')
+    group.addoption('--no-history', action='store_true',
+                    help='Do not record this run in the flakiness history or update the quarantine list')
+
+
+def _is_worker(config):
+    return hasattr(config, 'workerinput')
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    config._fitconnect = {'started': time.time(), 'servers': [],
+                          'quarantine': {} if config.getoption('quarantine') == 'off' else load_quarantine()}
+    command = config.getoption('server_cmd')
+    clone = config.getoption('db_clone')
+    if clone and not command:
+        raise pytest.UsageError('--db-clone needs --server-cmd: the clone is only used by a server the session starts')
+    if config.getoption('query_profile') and config.getoption('numprocesses', None):
+        raise pytest.UsageError('--query-profile attributes every statement to the running test, so it cannot run with -n')
+    if config.option.collectonly:
+        return  # nothing runs, so no server, clone or profiler
+    if command and not _is_worker(config):
+        server = {'cmd': command, 'port': config.getoption('server_port')}
+        if clone:
+            try:
+                db = TemplateDB()
+                clone_url, seconds = db.clone(clone)
+            except SnapshotError as e:
+                raise pytest.UsageError(f"--db-clone: {e}")
+            config._fitconnect['db_clone'] = (db, clone)
+            config._fitconnect['database_url'] = clone_url
+            server['env'] = {'DATABASE_URL': clone_url}
+            print(f"\nDatabase clone {db.clone_name(clone)} ready in {seconds * 1000:.0f}ms")
+        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+        log_file = open(os.path.join(SCREENSHOTS_DIR, 'server.log'), 'ab')
+        config._fitconnect['server_log'] = log_file
+        config._fitconnect['servers'] = start_servers([server], timeout=config.getoption('server_timeout'),
+                                                      output=log_file)
+    if config.getoption('query_profile'):
+        try:
+            capture = QueryCapture(config._fitconnect.get('database_url'))
+            capture.ensure()
+        except PsqlError as e:
+            raise pytest.UsageError(f"--query-profile: {e}")
+        config._fitconnect['queries'] = capture
+
+
+def pytest_collection_modifyitems(config, items):
+    """--quarantine skip/only: split the quarantined lane off the blocking one."""
+    lane = config.getoption('quarantine')
+    quarantine = config._fitconnect['quarantine']
+    if lane not in ('skip', 'only'):
+        return
+    keep, dropped = [], []
+    for item in items:
+        (keep if (item.nodeid in quarantine) == (lane == 'only') else dropped).append(item)
+    if dropped:
+        config.hook.pytest_deselected(items=dropped)
+        items[:] = keep
+
+
+@pytest.fixture(scope='session')
+def base_url(pytestconfig):
+    port = pytestconfig.getoption('server_port')
+    if not is_server_ready(port, timeout=5):
+        pytest.exit(f"Nothing is listening on port {port} - start the app or pass --server-cmd", returncode=3)
+    return f'http://localhost:{port}'
+
+
+@pytest.fixture(scope='session')
+def playwright_instance():
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        yield p
+
+
+@pytest.fixture(scope='session')
+def browser(playwright_instance, pytestconfig, base_url):
+    browser = launch_browser(playwright_instance, headless=not pytestconfig.getoption('headed'))
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def context(browser, request, base_url):
+    # The suites use relative URLs, so --server-port reaches every goto() and page.request call
+    context = browser.new_context(base_url=base_url)
+    paths = set()
+    if request.config.getoption('record_impact'):
+        origin = urlparse(base_url).netloc
+        context.on('request', lambda r: paths.add(urlparse(r.url).path)
+                   if urlparse(r.url).netloc == origin else None)
+    yield context
+    context.close()
+    if paths:
+        request.node.user_properties.append(('impact_paths', json.dumps(sorted(paths))))
+
+
+@pytest.fixture
+def page(context):
+    return context.new_page()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Collect the test's log_result() checks and fail it if any check failed."""
+    log = ResultLog(item.nodeid)
+    capture = item.config._fitconnect.get('queries')
+    if capture:
+        capture.reset()
+    try:
+        with activate(log), log.test(item.name):
+            result = yield
+    finally:
+        # Checks logged before an exception still go into the results
+        item.user_properties.append(('checks', json.dumps(log.results)))
+        if capture:
+            item.user_properties.append(('queries', json.dumps(capture.read().summary(3))))
+    failures = log.failures()
+    if failures:
+        raise AssertionError(f"{len(failures)} check(s) failed: " +
+                             "; ".join(f"{r['test']}: {r['details']}" for r in failures))
+    return result
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """--retries: rerun a failed test in a fresh context instead of the whole suite.
+
+    Same pattern as pytest-rerunfailures: each attempt is a full runtestprotocol()
+    pass, which requests the fixtures afresh, and the reports of a failed attempt
+    are logged with outcome 'rerun'.
+    """
+    retries = item.config.getoption('retries')
+    if not retries:
+        return None
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for attempt in range(retries + 1):
+        item.stash[RETRY_PENDING] = attempt < retries
+        reports = runtestprotocol(item, nextitem=nextitem, log=False)
+        retry = (attempt < retries and any(r.when == 'call' and r.failed for r in reports)
+                 and not (item.session.shouldfail or item.session.shouldstop))
+        for report in reports:
+            if retry and report.when == 'call':
+                report.outcome = 'rerun'
+            item.ihook.pytest_runtest_logreport(report=report)
+        if not retry:
+            break
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    """A quarantined test's final failure is reported as xfail, so it does not fail the session."""
+    report = yield
+    entry = item.config._fitconnect['quarantine'].get(item.nodeid)
+    if entry and report.when == 'call' and report.failed and not item.stash.get(RETRY_PENDING, False):
+        report.outcome = 'skipped'
+        report.wasxfail = f"quarantined as flaky (score {entry['score']:.2f})"
+    return report
+
+
+def pytest_report_teststatus(report, config):
+    if report.outcome == 'rerun':
+        return 'rerun', 'R', ('RERUN', {'yellow': True})
+    return None
+
+
+def pytest_runtest_logreport(report):
+    """Runs on the controller for every worker's reports too, so this is where results merge."""
+    if report.when == 'teardown':
+        for name, value in report.user_properties:
+            if name == 'impact_paths':
+                _IMPACT.setdefault(report.nodeid, set()).update(json.loads(value))
+        return
+    if report.outcome == 'rerun':
+        _RERUNS[report.nodeid] = _RERUNS.get(report.nodeid, 0) + 1
+        return
+    if report.when != 'call' and not (report.when == 'setup' and not report.passed):
+        return
+    checks = []
+    queries = None
+    for name, value in report.user_properties:
+        if name == 'checks':
+            checks = json.loads(value)
+        elif name == 'queries':
+            queries = json.loads(value)
+    # Under xdist, report.node is the controller's handle on the worker that ran the test
+    worker = getattr(getattr(report, 'node', None), 'workerinput', {}).get('workerid')
+    outcome = report.outcome if report.when == 'call' else 'error'
+    if getattr(report, 'wasxfail', '').startswith('quarantined'):
+        outcome = 'quarantined'
+    test = {
+        'nodeid': report.nodeid,
+        'outcome': outcome,
+        'duration_s': round(report.duration, 3),
+        'worker': worker,
+        'attempts': _RERUNS.get(report.nodeid, 0) + 1,
+        'checks': checks,
+    }
+    if queries:
+        test['queries'] = queries
+    crash = getattr(report.longrepr, 'reprcrash', None)
+    if report.failed and crash is not None:
+        test['error'] = crash.message.splitlines()[0] if crash.message else ''
+    _TESTS.append(test)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    state = getattr(config, '_fitconnect', None)
+    if state is None or _is_worker(config):
+        return
+    stop_servers(state['servers'])
+    if state.get('server_log'):
+        state['server_log'].close()
+    if state.get('db_clone'):
+        db, clone = state['db_clone']
+        try:
+            db.drop(clone)
+        except SnapshotError as e:
+            print(f"\n⚠️  Could not drop database clone {db.clone_name(clone)}: {e}")
+    if config.option.collectonly:
+        return  # no results: keep the previous report, impact map and quarantine list
+
+    impact_path = config.getoption('record_impact')
+    if impact_path and exitstatus != pytest.ExitCode.INTERRUPTED:
+        impact_map = build_static_map()
+        previous = load_map(impact_path)
+        if previous:
+            merge_recorded(impact_map, {k: v.get('recorded', []) for k, v in previous['tests'].items()})
+        save_map(merge_recorded(impact_map, _IMPACT), impact_path)
+
+    tests = _TESTS
+    results = []
+    for test in tests:
+        for check in test['checks']:
+            results.append({**check, 'group': test['nodeid']})
+        # A test without checks, or one that raised after its checks passed, still needs its outcome
+        if not test['checks'] or (test['outcome'] != 'passed' and all(c['passed'] for c in test['checks'])):
+            details = '' if test['outcome'] == 'passed' else test.get('error') or test['outcome']
+            results.append({'test': test['nodeid'], 'passed': test['outcome'] == 'passed',
+                            'details': details, 'group': test['nodeid']})
+    passed = sum(1 for r in results if r['passed'])
+    report = {
+        'summary': {'total': len(results), 'passed': passed, 'failed': len(results) - passed,
+                    'tests': len(tests), 'tests_failed': sum(1 for t in tests if t['outcome'] not in ('passed', 'quarantined')),
+                    'tests_flaky': sum(1 for t in tests if t['outcome'] == 'passed' and t['attempts'] > 1),
+                    'tests_quarantined': sum(1 for t in tests if t['outcome'] == 'quarantined')},
+        'started': state['started'],
+        'wall_s': round(time.time() - state['started'], 2),
+        'timings': {t['nodeid']: t['duration_s'] for t in tests},
+        'tests': [{k: v for k, v in t.items() if k != 'checks'} for t in tests],
+        'results': results,
+    }
+    path = config.getoption('results_json')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    state['report'] = report
+    state['report_path'] = path
+
+    if not config.getoption('no_history') and exitstatus != pytest.ExitCode.INTERRUPTED:
+        record_run(run_outcomes(report), 'pytest', started=state['started'])
+        _, state['quarantined'], state['released'] = update_quarantine(score_tests(load_history()))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    state = getattr(config, '_fitconnect', None)
+    if not state or 'report' not in state:
+        return
+    report = state['report']
+    summary = report['summary']
+    busy = sum(report['timings'].values())
+    terminalreporter.write_sep('=', 'FitConnect checks')
+    terminalreporter.write_line(f"Checks: {summary['total']} | Passed: {summary['passed']} | Failed: {summary['failed']}")
+    slowest = sorted(report['timings'].items(), key=lambda item: -item[1])[:5]
+    if slowest:
+        terminalreporter.write_line("Slowest: " + ", ".join(f"{nodeid.split('::')[-1]} {s:.1f}s" for nodeid, s in slowest))
+    if report['wall_s']:
+        terminalreporter.write_line(f"Test time {busy:.1f}s over {report['wall_s']:.1f}s wall "
+                                    f"({busy / report['wall_s']:.1f}x parallelism)")
+    profiled = sorted((t for t in report['tests'] if 'queries' in t), key=lambda t: -t['queries']['queries'])[:5]
+    if profiled:
+        terminalreporter.write_line("Most queries: " + ", ".join(
+            f"{t['nodeid'].split('::')[-1]} {t['queries']['queries']} ({t['queries']['db_ms']}ms)" for t in profiled))
+    flaky = [t['nodeid'] for t in report['tests'] if t['outcome'] == 'passed' and t['attempts'] > 1]
+    if flaky:
+        terminalreporter.write_line("Passed on retry (flaky): " + ", ".join(flaky))
+    quarantined = [t['nodeid'] for t in report['tests'] if t['outcome'] == 'quarantined']
+    if quarantined:
+        terminalreporter.write_line("Failed in quarantine (not blocking): " + ", ".join(quarantined))
+    for nodeid in state.get('quarantined', []):
+        terminalreporter.write_line(f"Quarantined as chronically flaky: {nodeid}", yellow=True)
+    for nodeid in state.get('released', []):
+        terminalreporter.write_line(f"Released from quarantine: {nodeid}", green=True)
+    terminalreporter.write_line(f"Results saved to: {state['report_path']}")
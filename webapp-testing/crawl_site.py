@@ -0,0 +1,270 @@
+"""
+FitConnect Site Crawler
+Crawls the app once per role (anonymous, client, coach), starting from every
+static page under src/app and following internal links. Each route pattern
+(e.g. /coaches/[id]) is visited once per role, by a bounded pool of browser
+pages, and records:
+- HTTP status and final URL (redirects to /login are flagged)
+- load time (navigation to load event) and time to network idle
+- transferred payload: bytes and request count, split by resource type
+- console errors and uncaught page errors
+
+Routes under src/app that no role reached are reported as uncovered, and
+links that match no route are reported as broken.
+
+Usage:
+    python crawl_site.py
+    python crawl_site.py --roles anonymous,coach --workers 6 --max-pages 60
+    python crawl_site.py --fail-on-console
+    python crawl_site.py --capture screenshots/crawl_events.jsonl.gz   # stream console/network events
+"""
+from playwright.async_api import async_playwright
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from app_routes import discover_routes, match_route
+from browser_server import launch_browser_async
+from event_capture import EventCapture
+from http_load import DEMO_PASSWORD, virtual_ip
+
+BASE_URL = 'http://localhost:3000'
+ROLE_ACCOUNTS = {'client': 'alex@example.com', 'coach': 'sarah@example.com'}
+ROLES = ['anonymous', 'client', 'coach']
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+
+LINKS_JS = "() => Array.from(document.querySelectorAll('a[href]'), a => a.href)"
+
+
+class RoleCrawl:
+    """Frontier and per-route results for one role."""
+
+    def __init__(self, role, base_url, routes, max_pages, capture=None):
+        self.role = role
+        self.capture = capture
+        self.base_url = base_url
+        self.origin = urlparse(base_url).netloc
+        self.routes = routes
+        self.max_pages = max_pages
+        self.queue = asyncio.Queue()
+        self.claimed = set()     # route patterns (or raw paths for unmatched links) already queued
+        self.results = []
+        self.broken = {}         # path -> page it was linked from
+
+    def offer(self, url, source):
+        """Queue a URL if it is internal and its route has not been claimed yet."""
+        parsed = urlparse(url)
+        if parsed.netloc != self.origin or parsed.scheme not in ('http', 'https'):
+            return
+        path = parsed.path or '/'
+        if path.startswith(('/api/', '/_next/')):
+            return
+        route = match_route(path, self.routes)
+        if route is None:
+            self.broken.setdefault(path, source)
+            return
+        if route.pattern in self.claimed or len(self.claimed) >= self.max_pages:
+            return
+        self.claimed.add(route.pattern)
+        self.queue.put_nowait((route.pattern, path + (f"?{parsed.query}" if parsed.query else '')))
+
+
+async def login_state(browser, base_url, role, ip_index):
+    context = await browser.new_context()
+    try:
+        response = await context.request.post(
+            f"{base_url}/api/auth/login",
+            data={'email': ROLE_ACCOUNTS[role], 'password': DEMO_PASSWORD},
+            headers={'X-Forwarded-For': virtual_ip(ip_index)},
+        )
+        return await context.storage_state() if response.ok else None
+    finally:
+        await context.close()
+
+
+async def visit(context, crawl, pattern, path):
+    """Load one route and record its metrics; returns the links found on it. Never raises."""
+    requests = []
+    console_errors = []
+    result = {'route': pattern, 'path': path, 'status': None, 'problems': []}
+    links = []
+    page = None
+    try:
+        # Opening the page is inside the try too: a worker that raises stops draining the queue
+        page = await context.new_page()
+        page.on('requestfinished', lambda request: requests.append(request))
+        page.on('console', lambda msg: console_errors.append(msg.text) if msg.type == 'error' else None)
+        page.on('pageerror', lambda error: console_errors.append(f"uncaught: {error}"))
+        if crawl.capture:
+            crawl.capture.attach(page, label=f"{crawl.role} {pattern}", failed_only=True)
+
+        start = time.perf_counter()
+        response = await page.goto(urljoin(crawl.base_url, path), wait_until='load')
+        result['load_ms'] = round((time.perf_counter() - start) * 1000)
+        await page.wait_for_load_state('networkidle')
+        result['network_idle_ms'] = round((time.perf_counter() - start) * 1000)
+        result['status'] = response.status if response else None
+        result['final_url'] = page.url
+        links = await page.evaluate(LINKS_JS)
+
+        sizes = await asyncio.gather(*(r.sizes() for r in requests), return_exceptions=True)
+        by_type = {}
+        total = 0
+        for request, size in zip(requests, sizes):
+            if isinstance(size, Exception):
+                continue
+            transferred = size['responseBodySize'] + size['responseHeadersSize']
+            total += transferred
+            bucket = by_type.setdefault(request.resource_type, {'requests': 0, 'bytes': 0})
+            bucket['requests'] += 1
+            bucket['bytes'] += transferred
+        result.update({'requests': len(requests), 'bytes': total, 'by_type': by_type})
+    except Exception as e:
+        result['problems'].append(str(e).splitlines()[0])
+    finally:
+        if page is not None:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    result['console_errors'] = console_errors
+    if result['status'] is not None and result['status'] >= 400:
+        result['problems'].append(f"HTTP {result['status']}")
+    if '/login' in result.get('final_url', '') and not path.startswith('/login'):
+        result['redirected_to_login'] = True
+    return result, links
+
+
+async def crawl_role(browser, crawl, workers, storage_state):
+    context = await browser.new_context(storage_state=storage_state)
+
+    async def worker():
+        while True:
+            pattern, path = await crawl.queue.get()
+            try:
+                result, links = await visit(context, crawl, pattern, path)
+                crawl.results.append(result)
+                for link in links:
+                    crawl.offer(link, path)
+            finally:
+                crawl.queue.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    await crawl.queue.join()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await context.close()
+
+
+def print_role(crawl):
+    print(f"\n--- {crawl.role}: {len(crawl.results)} route(s) ---")
+    print(f"  {'route':<42} {'status':>6} {'load':>7} {'idle':>7} {'KB':>8} {'reqs':>5} {'errors':>6}")
+    for r in sorted(crawl.results, key=lambda r: r['route']):
+        mark = '❌' if r['problems'] or r['console_errors'] else '↪️ ' if r.get('redirected_to_login') else '✅'
+        print(f"{mark} {r['route']:<42} {str(r['status']):>6} {r.get('load_ms', '-'):>6}ms "
+              f"{r.get('network_idle_ms', '-'):>6}ms {r.get('bytes', 0) / 1024:>8.0f} {r.get('requests', 0):>5} "
+              f"{len(r['console_errors']):>6}")
+        for problem in r['problems']:
+            print(f"      {problem}")
+        for error in r['console_errors'][:3]:
+            print(f"      console: {error[:160]}")
+
+
+async def run_crawl(base_url=BASE_URL, roles=None, workers=4, max_pages=100, capture_path=None):
+    """Crawl every role and return the report dict
+
+    capture_path: stream console, page-error and failed network events to this JSONL(.gz) file
+    """
+    roles = roles or ROLES
+    routes = discover_routes(kind='page')
+    print("=" * 60)
+    print("FITCONNECT SITE CRAWL")
+    print("=" * 60)
+    print(f"\n{len(routes)} page route(s) under src/app, roles: {', '.join(roles)}, {workers} worker(s) per role")
+
+    crawls = []
+    capture = EventCapture(capture_path) if capture_path else None
+    start = time.perf_counter()
+    async with async_playwright() as p:
+        browser = await launch_browser_async(p)
+        for i, role in enumerate(roles):
+            state = None
+            if role != 'anonymous':
+                state = await login_state(browser, base_url, role, 300 + i)
+                if state is None:
+                    print(f"⚠️  Could not log in as {role} - skipping")
+                    continue
+            crawl = RoleCrawl(role, base_url, routes, max_pages, capture)
+            # Seed with every static page so unlinked routes are still visited
+            for route in routes:
+                if '[' not in route.pattern:
+                    crawl.offer(urljoin(base_url, route.pattern), 'src/app')
+            await crawl_role(browser, crawl, workers, state)
+            crawls.append(crawl)
+            print_role(crawl)
+        await browser.close()
+    wall = time.perf_counter() - start
+    if capture:
+        capture.close()
+
+    reached = {r['route'] for c in crawls for r in c.results if r['status'] and r['status'] < 400}
+    uncovered = [r.pattern for r in routes if r.pattern not in reached]
+    broken = {path: source for c in crawls for path, source in c.broken.items()}
+    failing = [(c.role, r) for c in crawls for r in c.results if r['problems']]
+    noisy = [(c.role, r) for c in crawls for r in c.results if r['console_errors']]
+
+    print("\n" + "=" * 60)
+    print("CRAWL SUMMARY")
+    print("=" * 60)
+    visited = sum(len(c.results) for c in crawls)
+    print(f"\nVisited: {visited} | Failing: {len(failing)} | With console errors: {len(noisy)} | Wall: {wall:.1f}s")
+    if uncovered:
+        print(f"Uncovered routes (no link reached them): {', '.join(uncovered)}")
+    if broken:
+        print("Broken links:")
+        for path, source in sorted(broken.items()):
+            print(f"  - {path} (linked from {source})")
+    if capture:
+        stats = capture.stats()
+        print(f"Captured {stats['events']} event(s) to {capture_path} ({stats['dropped']} dropped)")
+
+    report = {
+        'config': {'base_url': base_url, 'roles': roles, 'workers': workers, 'max_pages': max_pages},
+        'summary': {'visited': visited, 'failing': len(failing), 'console_errors': len(noisy),
+                    'uncovered': uncovered, 'broken_links': broken, 'wall_s': round(wall, 2)},
+        'events': capture.stats() if capture else None,
+        'roles': {c.role: sorted(c.results, key=lambda r: r['route']) for c in crawls},
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, 'crawl_report.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per-role crawl of every FitConnect page route')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--roles', help=f"Comma-separated roles (default: {','.join(ROLES)})")
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent pages per role (default: 4)')
+    parser.add_argument('--max-pages', type=int, default=100, help='Route cap per role (default: 100)')
+    parser.add_argument('--capture', metavar='PATH', help='Stream console/network events to a .jsonl.gz file')
+    parser.add_argument('--fail-on-console', action='store_true', help='Exit non-zero when pages log console errors')
+    args = parser.parse_args()
+    roles = args.roles.split(',') if args.roles else None
+    unknown = sorted(set(roles or []) - set(ROLES))
+    if unknown:
+        parser.error(f"unknown role(s) {', '.join(unknown)} (choose from {', '.join(ROLES)})")
+    report = asyncio.run(run_crawl(args.base_url, roles,
+                                   args.workers, args.max_pages, args.capture))
+    summary = report['summary']
+    failed = summary['failing'] or summary['broken_links'] or (args.fail_on_console and summary['console_errors'])
+    sys.exit(1 if failed else 0)
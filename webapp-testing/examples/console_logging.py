@@ -1,21 +1,26 @@
+import os
+import sys
+import tempfile
+
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from browser_server import launch_browser
+from event_capture import EventCapture
+
 # Example: Capturing console logs during browser automation
+# Events stream to a compressed JSONL file through a bounded queue, so memory stays flat
 
 url = 'http://localhost:5173'  # Replace with your URL
+output_path = os.path.join(tempfile.gettempdir(), 'console.jsonl.gz')
 
-console_logs = []
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
+with sync_playwright() as p, EventCapture(output_path) as capture:
+    browser = launch_browser(p)
     page = browser.new_page(viewport={'width': 1920, 'height': 1080})
 
-    # Set up console log capture
-    def handle_console_message(msg):
-        console_logs.append(f"[{msg.type}] {msg.text}")
-        print(f"Console: [{msg.type}] {msg.text}")
-
-    page.on("console", handle_console_message)
+    # Set up console log capture (all console levels, page errors and failed requests)
+    capture.attach(page, label='main', failed_only=True)
+    page.on("console", lambda msg: print(f"Console: [{msg.type}] {msg.text}"))
 
     # Navigate to page
     page.goto(url)
@@ -27,9 +32,7 @@ with sync_playwright() as p:
 
     browser.close()
 
-# Save console logs to file
-with open('/mnt/user-data/outputs/console.log', 'w') as f:
-    f.write('\n'.join(console_logs))
-
-print(f"\nCaptured {len(console_logs)} console messages")
-print(f"Logs saved to: /mnt/user-data/outputs/console.log")
\ No newline at end of file
+stats = capture.stats()
+print(f"\nCaptured {capture.count('console')} console messages ({stats['dropped']} dropped)")
+print(f"Logs saved to: {output_path}")
+print(f"Read them with: python scripts/event_capture.py summarize {output_path}")
@@ -1,40 +1,55 @@
+import os
+import sys
+
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+from browser_server import launch_browser
+from dom_inventory import by_kind, diff_inventories, discover, save_inventory, load_inventory
+
 # Example: Discovering buttons and other elements on a page
+# One evaluate() call returns the whole inventory instead of a round trip per element
 
 with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
+    browser = launch_browser(p)
     page = browser.new_page()
 
     # Navigate to page and wait for it to fully load
     page.goto('http://localhost:5173')
     page.wait_for_load_state('networkidle')
 
+    elements = discover(page)
+
     # Discover all buttons on the page
-    buttons = page.locator('button').all()
+    buttons = by_kind(elements, 'button')
     print(f"Found {len(buttons)} buttons:")
     for i, button in enumerate(buttons):
-        text = button.inner_text() if button.is_visible() else "[hidden]"
+        text = button.text if button.visible else "[hidden]"
         print(f"  [{i}] {text}")
 
     # Discover links
-    links = page.locator('a[href]').all()
+    links = by_kind(elements, 'link')
     print(f"\nFound {len(links)} links:")
     for link in links[:5]:  # Show first 5
-        text = link.inner_text().strip()
-        href = link.get_attribute('href')
-        print(f"  - {text} -> {href}")
+        print(f"  - {link.text} -> {link.href}")
 
     # Discover input fields
-    inputs = page.locator('input, textarea, select').all()
+    inputs = [e for e in elements if e.kind in ('input', 'textarea', 'select')]
     print(f"\nFound {len(inputs)} input fields:")
     for input_elem in inputs:
-        name = input_elem.get_attribute('name') or input_elem.get_attribute('id') or "[unnamed]"
-        input_type = input_elem.get_attribute('type') or 'text'
-        print(f"  - {name} ({input_type})")
+        name = input_elem.name or input_elem.id or "[unnamed]"
+        print(f"  - {name} ({input_elem.input_type or 'text'})")
+
+    # Compare with the previous run's inventory, then save this one
+    inventory_path = '/tmp/page_inventory.json'
+    if os.path.exists(inventory_path):
+        diff = diff_inventories(load_inventory(inventory_path), elements)
+        print(f"\nSince last run: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+              f"{len(diff['changed'])} changed")
+    save_inventory(inventory_path, elements, page.url)
 
     # Take screenshot for visual reference
     page.screenshot(path='/tmp/page_discovery.png', full_page=True)
     print("\nScreenshot saved to /tmp/page_discovery.png")
 
-    browser.close()
\ No newline at end of file
+    browser.close()
@@ -0,0 +1,343 @@
+"""
+FitConnect Multi-Process Load Generator
+A coordinator spawns --workers processes. Each runs its own asyncio event
+loop with --connections keep-alive connections (http_load.AsyncConnection)
+against a weighted mix of read API routes. A single Python process runs out
+of CPU long before a production-mode Next.js server does, so the load is
+spread over as many processes as there are cores.
+
+Every --interval seconds each worker ships its per-route latency histograms
+(scripts/latency_histogram.py) and status/error counts for that interval to
+the coordinator over a multiprocessing queue, then starts fresh ones. The
+coordinator merges the buckets, so the aggregated percentiles are those of
+every request, not an average of per-worker percentiles. It also prints a
+live per-interval line.
+
+Closed loop by default: every connection sends its next request as soon as
+the previous one completes. With --rate, requests are paced to a fixed
+total rate and latency is measured from the scheduled send time, so a
+stalled server shows up in the percentiles instead of just slowing the
+generator down (coordinated omission).
+
+Each worker's CPU use is reported. A worker near 100% of a core means the
+generator, not the server, is the bottleneck; add workers or machines.
+Sessions are logged in once, one per seeded client account, and shared by
+the workers.
+
+Usage:
+    python load_generator.py                                  # one worker per core, 30s
+    python load_generator.py --workers 8 --connections 64 --duration 60
+    python load_generator.py --rate 5000 --routes /api/coaches,/api/auth/me
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, AsyncConnection, BASE_URL, SEEDED_CLIENTS, format_summary, parse_json, virtual_ip
+from latency_histogram import LatencyHistogram
+from proc_stats import CpuMeter, find_listening_pid
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+CLIENT_BOUND_PCT = 90
+
+# Route template -> weight; {coach_id} is filled with a real coach
+ROUTE_MIX = {
+    '/api/coaches': 4,
+    '/api/coaches/{coach_id}': 2,
+    '/api/coaches/{coach_id}/reviews': 1,
+    '/api/auth/me': 2,
+    '/api/bookings': 1,
+    '/api/chat/threads': 1,
+}
+
+
+class IntervalStats:
+    """One worker's histograms and counts since the last flush."""
+
+    def __init__(self):
+        self.hists = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, label, seconds, status):
+        self.hists.setdefault(label, LatencyHistogram()).record(seconds)
+        counts = self.statuses.setdefault(label, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def error(self, label, exc):
+        counts = self.errors.setdefault(label, {})
+        name = type(exc).__name__
+        counts[name] = counts.get(name, 0) + 1
+
+    def to_dict(self):
+        return {'hists': {label: h.to_dict() for label, h in self.hists.items()},
+                'statuses': self.statuses, 'errors': self.errors}
+
+
+async def _connection_loop(conn, routes, weights, deadline, pace, stats_ref):
+    next_send = time.perf_counter() + random.random() * pace if pace else None
+    while True:
+        if pace:
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = next_send
+            next_send += pace
+        else:
+            start = time.perf_counter()
+        if start >= deadline:
+            break
+        label, path = random.choices(routes, weights)[0]
+        try:
+            status, _size = await conn.request('GET', path)
+            stats_ref[0].record(label, time.perf_counter() - start, status)
+        except Exception as e:
+            stats_ref[0].error(label, e)
+    conn.close()
+
+
+async def _worker(worker_id, base_url, cookies, routes, weights, connections, duration, pace, interval, out):
+    deadline = time.perf_counter() + duration
+    stats_ref = [IntervalStats()]
+    headers = {'Cookie': cookies, 'X-Forwarded-For': virtual_ip(2000 + worker_id)}
+    tasks = [asyncio.ensure_future(_connection_loop(AsyncConnection(base_url, headers), routes, weights,
+                                                    deadline, pace, stats_ref))
+             for _ in range(connections)]
+    started, cpu_start = time.perf_counter(), time.process_time()
+
+    def flush(final=False):
+        stats, stats_ref[0] = stats_ref[0], IntervalStats()
+        out.put({'worker': worker_id, 'elapsed': round(time.perf_counter() - started, 3),
+                 'cpu_s': time.process_time() - cpu_start, 'final': final, **stats.to_dict()})
+
+    while not all(t.done() for t in tasks):
+        await asyncio.wait(tasks, timeout=interval)
+        flush()
+    flush(final=True)
+
+
+def worker_main(worker_id, base_url, cookies, routes, weights, connections, duration, pace, interval, out):
+    """Entry point of one load worker process."""
+    asyncio.run(_worker(worker_id, base_url, cookies, routes, weights, connections, duration, pace, interval, out))
+
+
+def prepare_sessions(base_url, accounts):
+    """Log in once per account; returns Cookie header values"""
+    cookies = []
+    for i, email in enumerate(accounts):
+        client = ApiClient(base_url, client_ip=virtual_ip(1900 + i))
+        if client.login(email):
+            cookies.append('; '.join(f"{k}={v}" for k, v in client.cookies.items()))
+        else:
+            print(f"⚠️  Could not log in as {email}")
+        client.close()
+    return cookies
+
+
+def resolve_routes(base_url, mix):
+    """Fill {coach_id} from /api/coaches; routes that cannot be filled are dropped"""
+    client = ApiClient(base_url)
+    data = parse_json(client.get('/api/coaches?limit=1')) or {}
+    client.close()
+    listing = data.get('data') if isinstance(data, dict) else data
+    coach_id = listing[0].get('id') if listing else None
+    routes, weights = [], []
+    for template, weight in mix.items():
+        if '{coach_id}' in template and not coach_id:
+            print(f"⚠️  Skipping {template}: no coach found")
+            continue
+        routes.append((template, template.format(coach_id=coach_id)))
+        weights.append(weight)
+    return routes, weights
+
+
+class Aggregator:
+    """Merges worker interval messages into totals and a per-interval timeline."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.totals = {}
+        self.statuses = {}
+        self.errors = {}
+        self.slots = {}
+        self.cpu = {}
+
+    def add(self, message):
+        # Workers flush just after each interval boundary
+        slot = self.slots.setdefault(max(0, round(message['elapsed'] / self.interval) - 1),
+                                     {'hist': LatencyHistogram(), 'errors': 0, 'non_2xx': 0})
+        for label, data in message['hists'].items():
+            hist = LatencyHistogram.from_dict(data)
+            self.totals.setdefault(label, LatencyHistogram()).merge(hist)
+            slot['hist'].merge(hist)
+        for label, counts in message['statuses'].items():
+            merged = self.statuses.setdefault(label, {})
+            for status, n in counts.items():
+                merged[status] = merged.get(status, 0) + n
+                if not status.startswith('2'):
+                    slot['non_2xx'] += n
+        for label, counts in message['errors'].items():
+            merged = self.errors.setdefault(label, {})
+            for name, n in counts.items():
+                merged[name] = merged.get(name, 0) + n
+                slot['errors'] += n
+        self.cpu[message['worker']] = (message['elapsed'], message['cpu_s'])
+
+    def overall(self):
+        total = LatencyHistogram()
+        for hist in self.totals.values():
+            total.merge(hist)
+        return total
+
+    def timeline(self):
+        rows = []
+        for index in sorted(self.slots):
+            slot = self.slots[index]
+            summary = slot['hist'].summary()
+            rows.append({'t': round((index + 1) * self.interval, 1),
+                         'rps': round(summary['count'] / self.interval, 1),
+                         'p50_ms': summary['p50_ms'], 'p99_ms': summary['p99_ms'],
+                         'non_2xx': slot['non_2xx'], 'errors': slot['errors']})
+        return rows
+
+    def worker_cpu(self):
+        return {worker: round(cpu_s / elapsed * 100, 1) if elapsed else 0.0
+                for worker, (elapsed, cpu_s) in sorted(self.cpu.items())}
+
+
+def run_load(base_url=BASE_URL, workers=None, connections=32, duration=30, rate=0, routes=None, interval=1.0):
+    """Run the load test and return the report dict"""
+    workers = workers or os.cpu_count() or 1
+    mix = {r: ROUTE_MIX.get(r, 1) for r in routes} if routes else ROUTE_MIX
+    print("=" * 60)
+    print("FITCONNECT MULTI-PROCESS LOAD GENERATOR")
+    print("=" * 60)
+    print(f"{workers} worker(s) x {connections} connection(s), {duration}s, "
+          + (f"{rate} req/s paced" if rate else "closed loop"))
+
+    cookies = prepare_sessions(base_url, SEEDED_CLIENTS)
+    if not cookies:
+        print("❌ No session could log in")
+        return None
+    resolved, weights = resolve_routes(base_url, mix)
+    if not resolved:
+        print("❌ No routes to request")
+        return None
+    # Seconds between sends on one connection for the requested total rate
+    pace = workers * connections / rate if rate else 0
+
+    pid = find_listening_pid(urlsplit(base_url).port or 80)
+    meter = CpuMeter(pid) if pid else None
+    server_cpu = []
+
+    ctx = multiprocessing.get_context('spawn')
+    out = ctx.Queue()
+    processes = [ctx.Process(target=worker_main, daemon=True,
+                             args=(i, base_url, cookies[i % len(cookies)], resolved, weights, connections,
+                                   duration, pace, interval, out))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    agg = Aggregator(interval)
+    finished = set()
+    printed = 0
+    print(f"\n  {'t':>6} {'req/s':>9} {'p50':>8} {'p99':>8} {'non-2xx':>8} {'errors':>7} {'server cpu':>11}")
+    try:
+        deadline = time.time() + duration + 60
+        while len(finished) < workers and time.time() < deadline:
+            try:
+                message = out.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+                continue
+            agg.add(message)
+            if message['final']:
+                finished.add(message['worker'])
+            timeline = agg.timeline()
+            # A slot is complete once the next one has started
+            while printed < len(timeline) - 1:
+                row = timeline[printed]
+                cpu = meter.read()['cpu_pct'] if meter else None
+                if cpu is not None:
+                    server_cpu.append(cpu)
+                print(f"  {row['t']:>5}s {row['rps']:>9} {row['p50_ms']:>6}ms {row['p99_ms']:>6}ms "
+                      f"{row['non_2xx']:>8} {row['errors']:>7} {str(cpu) + '%' if cpu is not None else '-':>11}")
+                printed += 1
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    overall = agg.overall().summary()
+    worker_cpu = agg.worker_cpu()
+    client_bound = [w for w, pct in worker_cpu.items() if pct >= CLIENT_BOUND_PCT]
+    requests = overall['count'] + sum(n for counts in agg.errors.values() for n in counts.values())
+    errors = sum(n for counts in agg.errors.values() for n in counts.values())
+    non_2xx = sum(n for counts in agg.statuses.values() for status, n in counts.items() if not status.startswith('2'))
+
+    print("\n" + "=" * 60)
+    print("LOAD SUMMARY")
+    print("=" * 60)
+    for label in sorted(agg.totals):
+        print("  " + format_summary(label, agg.totals[label].summary()))
+    print("  " + format_summary('all', overall) + f" p99.9={overall['p999_ms']}ms")
+    print(f"\nThroughput: {overall['count'] / duration:.0f} req/s over {duration}s "
+          f"({non_2xx} non-2xx, {errors} connection errors)")
+    if server_cpu:
+        print(f"Server CPU: mean {sum(server_cpu) / len(server_cpu):.0f}%, peak {max(server_cpu):.0f}% (100% = one core)")
+    print("Worker CPU: " + ", ".join(f"#{w} {pct}%" for w, pct in worker_cpu.items()))
+    if client_bound:
+        print(f"⚠️  {len(client_bound)} worker(s) at >= {CLIENT_BOUND_PCT}% CPU: the generator is the bottleneck, "
+              "add --workers or run on more machines")
+
+    report = {
+        'config': {'base_url': base_url, 'workers': workers, 'connections': connections, 'duration_s': duration,
+                   'rate': rate, 'interval_s': interval, 'routes': dict(zip([t for t, _ in resolved], weights))},
+        'requests': requests,
+        'throughput_rps': round(overall['count'] / duration, 1),
+        'latency': {**{label: h.summary() for label, h in sorted(agg.totals.items())}, 'all': overall},
+        'statuses': agg.statuses,
+        'errors': agg.errors,
+        'timeline': agg.timeline(),
+        'worker_cpu_pct': worker_cpu,
+        'client_bound': bool(client_bound),
+        'server_cpu_pct': server_cpu,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, 'load_generator.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Multi-process asyncio load generator with merged latency histograms')
+    parser.add_argument('--url', default=BASE_URL, help=f'App base URL (default: {BASE_URL})')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: one per core)')
+    parser.add_argument('--connections', type=int, default=32, help='Connections per worker (default: 32)')
+    parser.add_argument('--duration', type=int, default=30, help='Seconds of load (default: 30)')
+    parser.add_argument('--rate', type=float, default=0, help='Total requests/s to pace to (default: closed loop)')
+    parser.add_argument('--routes', help=f"Comma-separated routes (default: {','.join(ROUTE_MIX)})")
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds per reported interval (default: 1)')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='Fail if more than this fraction of requests error or are non-2xx (default: 0.01)')
+    args = parser.parse_args()
+    report = run_load(args.url, args.workers, args.connections, args.duration, args.rate,
+                      [r for r in (args.routes or '').split(',') if r], args.interval)
+    if not report:
+        sys.exit(1)
+    failed = sum(n for counts in report['errors'].values() for n in counts.values()) + \
+        sum(n for counts in report['statuses'].values() for status, n in counts.items() if not status.startswith('2'))
+    sys.exit(0 if report['requests'] and failed / report['requests'] <= args.max_error_rate else 1)
@@ -0,0 +1,235 @@
+"""
+FitConnect Route Cold-Start Profiler
+Boots a fresh server per mode with the with_server.py lifecycle and hits
+every page under src/app and every /api/* route once, in order, then again
+--warm times. Reports first-hit vs warm-hit latency per route:
+- dev  (`npm run dev`): the first hit includes on-demand compilation
+- prod (`npm run build` then `npm run start`): the first hit includes module
+  loading and Prisma connection setup
+
+Order: server boot (spawn until the port accepts), login (POST /api/auth/login,
+so later routes run authenticated), static pages, static API routes, then
+dynamic routes. Dynamic segments are filled with a real coach id taken from
+/api/coaches where the segment names a coach. Other segments get a
+placeholder, which still compiles and loads the route but usually answers 404.
+API routes are probed with GET; a route without a GET handler answers 405
+after being loaded, which still measures its cold start.
+
+Pages are fetched as HTML without running client JS, so this is server time.
+The port must be free: the profiler needs a server it started itself.
+
+Usage:
+    python profile_cold_start.py                       # dev and prod
+    python profile_cold_start.py --modes dev --clean   # remove .next first, so dev compiles from scratch
+    python profile_cold_start.py --modes prod --skip-build --warm 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from app_routes import discover_routes
+from http_load import ApiClient, DEMO_PASSWORD, SEEDED_CLIENTS, parse_json, virtual_ip
+from with_server import is_server_ready, start_servers, stop_servers
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+MODES = ['dev', 'prod']
+COACH_SEGMENTS = ('[coachId]',)
+COACH_ROUTE_PREFIXES = ('/coaches/[id]', '/api/coaches/[id]')
+PLACEHOLDER = 'cold-start-probe'
+
+
+def concrete_path(pattern, coach_id):
+    """Fill a route pattern's dynamic segments"""
+    segments = []
+    for segment in pattern.strip('/').split('/'):
+        if not segment.startswith('['):
+            segments.append(segment)
+        elif coach_id and (segment in COACH_SEGMENTS or
+                           (segment == '[id]' and pattern.startswith(COACH_ROUTE_PREFIXES))):
+            segments.append(coach_id)
+        else:
+            segments.append(PLACEHOLDER)
+    return '/' + '/'.join(segments)
+
+
+def ordered_routes():
+    """Static pages, static API routes, then dynamic routes (pages before API)"""
+    routes = discover_routes()
+    static = [r for r in routes if '[' not in r.pattern]
+    dynamic = [r for r in routes if '[' in r.pattern]
+
+    def pages_first(group):
+        return [r for r in group if r.kind == 'page'] + [r for r in group if r.kind == 'api']
+
+    return pages_first(static) + pages_first(dynamic)
+
+
+def hit(client, method, path, body=None):
+    """One timed request; returns (status or error text, milliseconds)"""
+    try:
+        response = client.request(method, path, json_body=body)
+        return response.status, round(response.elapsed * 1000, 1)
+    except Exception as e:
+        return type(e).__name__, None
+
+
+def profile_server(port, warm, account):
+    """Hit every route once cold, then `warm` more times; returns (rows, login row)"""
+    client = ApiClient(f'http://localhost:{port}', timeout=300, client_ip=virtual_ip(800))
+    login_status, login_ms = hit(client, 'POST', '/api/auth/login', {'email': account, 'password': DEMO_PASSWORD})
+    login = {'route': '/api/auth/login', 'kind': 'api', 'method': 'POST', 'status': login_status, 'first_ms': login_ms}
+    print(f"    {'POST /api/auth/login':<48} {str(login_status):>5} {login_ms or '-':>9}ms")
+
+    rows = []
+    coach_id = None
+    for route in ordered_routes():
+        path = concrete_path(route.pattern, coach_id)
+        status, first = hit(client, 'GET', path)
+        rows.append({'route': route.pattern, 'kind': route.kind, 'path': path, 'status': status, 'first_ms': first})
+        if route.pattern == '/api/coaches' and status == 200:
+            # Fill coach segments of the dynamic routes that follow
+            data = parse_json(client.get('/api/coaches?limit=1')) or {}
+            listing = data.get('data', data) if isinstance(data, dict) else data
+            coach_id = listing[0].get('id') if listing else None
+        print(f"    {'GET ' + path:<48} {str(status):>5} {first or '-':>9}ms")
+
+    for row in rows:
+        timings = [ms for _status, ms in (hit(client, 'GET', row['path']) for _ in range(warm)) if ms is not None]
+        row['warm_ms'] = round(statistics.median(timings), 1) if timings else None
+        row['penalty_ms'] = round(row['first_ms'] - row['warm_ms'], 1) \
+            if row['first_ms'] is not None and row['warm_ms'] is not None else None
+    client.close()
+    return rows, login
+
+
+def run_mode(mode, port, warm, account, commands, server_timeout, skip_build, log_file):
+    """Build if needed, boot a fresh server, profile it, stop it; returns the mode dict"""
+    result = {'mode': mode}
+    if mode == 'prod' and not skip_build:
+        print(f"\n🔨 {commands['build']}")
+        start = time.perf_counter()
+        build = subprocess.run(commands['build'], shell=True, cwd=REPO_ROOT, stdout=log_file, stderr=log_file)
+        result['build_s'] = round(time.perf_counter() - start, 1)
+        if build.returncode != 0:
+            print(f"❌ Build failed after {result['build_s']}s (see {log_file.name})")
+            result['error'] = f"build exited {build.returncode}"
+            return result
+        print(f"    built in {result['build_s']}s")
+
+    cmd = commands['dev' if mode == 'dev' else 'start']
+    env = {'PORT': str(port)}
+    start = time.perf_counter()
+    try:
+        processes = start_servers([{'cmd': cmd, 'port': port, 'cwd': REPO_ROOT, 'env': env}],
+                                  timeout=server_timeout, output=log_file)
+    except RuntimeError as e:
+        print(f"❌ {e} (see {log_file.name})")
+        result['error'] = str(e)
+        return result
+    result['boot_s'] = round(time.perf_counter() - start, 2)
+    print(f"    booted in {result['boot_s']}s\n")
+    try:
+        result['routes'], result['login'] = profile_server(port, warm, account)
+    finally:
+        stop_servers(processes)
+    # Let the old server release the port before the next mode boots
+    deadline = time.time() + 15
+    while is_server_ready(port, timeout=0.5) and time.time() < deadline:
+        time.sleep(0.5)
+
+    measured = [r for r in result['routes'] if r['first_ms'] is not None]
+    result['total_first_s'] = round(sum(r['first_ms'] for r in measured) / 1000, 2)
+    result['total_warm_s'] = round(sum(r['warm_ms'] or 0 for r in measured) / 1000, 2)
+    return result
+
+
+def print_comparison(results):
+    modes = [r for r in results if 'routes' in r]
+    if not modes:
+        return
+    print("\n" + "=" * 60)
+    print("COLD-START SUMMARY (first / warm ms)")
+    print("=" * 60)
+    header = f"\n  {'route':<46}" + ''.join(f" {r['mode'] + ' first':>11} {r['mode'] + ' warm':>10}" for r in modes)
+    print(header)
+    by_mode = [{row['route']: row for row in r['routes']} for r in modes]
+    for row in modes[0]['routes']:
+        cells = ''
+        for rows in by_mode:
+            other = rows.get(row['route'], {})
+            cells += f" {str(other.get('first_ms', '-')):>11} {str(other.get('warm_ms', '-')):>10}"
+        print(f"  {row['route']:<46}{cells}")
+    for r in modes:
+        worst = sorted((row for row in r['routes'] if row['penalty_ms'] is not None),
+                       key=lambda row: -row['penalty_ms'])[:3]
+        print(f"\n{r['mode']}: boot {r['boot_s']}s"
+              + (f", build {r['build_s']}s" if 'build_s' in r else '')
+              + f", first pass {r['total_first_s']}s vs warm pass {r['total_warm_s']}s")
+        for row in worst:
+            print(f"    slowest cold start: {row['route']} +{row['penalty_ms']}ms")
+
+
+def run_profiler(modes=None, port=3000, warm=3, account=SEEDED_CLIENTS[0], commands=None, server_timeout=180,
+                 skip_build=False, clean=False):
+    """Profile every mode and return the report dict"""
+    modes = modes or MODES
+    commands = {'dev': 'npm run dev', 'build': 'npm run build', 'start': 'npm run start', **(commands or {})}
+    print("=" * 60)
+    print("FITCONNECT ROUTE COLD-START PROFILER")
+    print("=" * 60)
+    if is_server_ready(port, timeout=0.5):
+        print(f"❌ Port {port} is already in use - stop the running server so a fresh one can be profiled")
+        return None
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    log_path = os.path.join(RESULTS_DIR, 'cold_start_server.log')
+    results = []
+    with open(log_path, 'ab') as log_file:
+        for mode in modes:
+            if mode == 'dev' and clean:
+                shutil.rmtree(os.path.join(REPO_ROOT, '.next'), ignore_errors=True)
+                print("\n🧹 Removed .next")
+            print(f"\n=== {mode} ===")
+            results.append(run_mode(mode, port, warm, account, commands, server_timeout, skip_build, log_file))
+
+    print_comparison(results)
+    report = {
+        'config': {'modes': modes, 'port': port, 'warm_hits': warm, 'account': account, 'commands': commands,
+                   'clean': clean, 'skip_build': skip_build},
+        'modes': results,
+    }
+    results_file = os.path.join(RESULTS_DIR, 'cold_start.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file} (server output: {log_path})")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='First-hit vs warm-hit latency per route, dev vs production build')
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated modes (default: {','.join(MODES)})")
+    parser.add_argument('--port', type=int, default=3000, help='Port the server listens on (default: 3000)')
+    parser.add_argument('--warm', type=int, default=3, help='Warm hits per route, median reported (default: 3)')
+    parser.add_argument('--account', default=SEEDED_CLIENTS[0], help=f'Account to log in as (default: {SEEDED_CLIENTS[0]})')
+    parser.add_argument('--dev-cmd', default='npm run dev', help='Dev server command (default: npm run dev)')
+    parser.add_argument('--build-cmd', default='npm run build', help='Build command (default: npm run build)')
+    parser.add_argument('--start-cmd', default='npm run start', help='Production server command (default: npm run start)')
+    parser.add_argument('--server-timeout', type=int, default=180, help='Seconds to wait for boot (default: 180)')
+    parser.add_argument('--skip-build', action='store_true', help='Reuse the existing production build')
+    parser.add_argument('--clean', action='store_true', help='Remove .next before the dev boot')
+    args = parser.parse_args()
+    modes = [m for m in args.modes.split(',') if m]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+    report = run_profiler(modes, args.port, args.warm, args.account,
+                          {'dev': args.dev_cmd, 'build': args.build_cmd, 'start': args.start_cmd},
+                          args.server_timeout, args.skip_build, args.clean)
+    sys.exit(0 if report and all('error' not in m for m in report['modes']) else 1)
@@ -0,0 +1,214 @@
+"""
+FitConnect Per-Endpoint SQL Query Profiler
+Calls each GET API route one request at a time with pg_stat_statements reset
+before and read after (scripts/query_profile.py), so every statement the
+database ran is attributed to that request. Per endpoint it reports:
+- queries per request and total DB time
+- the slowest normalized statements and the most-called ones
+- whether the query count scales with the result size (N+1)
+
+Scaling is measured two ways: list routes with a `limit` parameter are swept
+over --limits, and every route is called as each seeded account of its role,
+whose data differ in size (threads, bookings). An endpoint is flagged when
+it runs SCALING_THRESHOLD or more extra queries per extra row returned.
+
+The server must be otherwise idle, and Postgres needs pg_stat_statements in
+shared_preload_libraries (`python scripts/query_profile.py` checks it).
+Each endpoint gets one unmeasured warm-up call first, so dev-mode compilation
+and connection setup are not counted.
+
+Usage:
+    python profile_queries.py
+    python profile_queries.py --limits 1,5,20 --only /api/coaches,/api/bookings
+    python profile_queries.py --top 5
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, BASE_URL, SEEDED_CLIENTS, SEEDED_COACHES, parse_json, virtual_ip
+from db_snapshot import PsqlError
+from query_profile import QueryCapture, QueryProfile, SCALING_THRESHOLD, scaling
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+DEFAULT_LIMITS = (1, 3, 6, 12)
+
+# (role, path, pagination parameter or None); {coach_id} and {thread_id} are filled in
+ENDPOINTS = [
+    ('client', '/api/auth/me', None),
+    ('client', '/api/user/profile', None),
+    ('client', '/api/coaches', 'limit'),
+    ('client', '/api/coaches/{coach_id}', None),
+    ('client', '/api/coaches/{coach_id}/reviews', 'limit'),
+    ('client', '/api/bookings', 'limit'),
+    ('client', '/api/chat/threads', None),
+    ('client', '/api/chat/threads/{thread_id}/messages', 'limit'),
+    ('client', '/api/messages', None),
+    ('coach', '/api/coach/bookings', 'limit'),
+    ('coach', '/api/coach/packages', None),
+    ('coach', '/api/coach/gallery', None),
+    ('coach', '/api/coach/profile', None),
+    ('coach', '/api/stripe/connect/status', None),
+]
+
+
+def result_rows(data):
+    """Number of records in a JSON response: a top-level list or the first list value"""
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        for key in ('data', 'conversations', 'messages', 'reviews', 'bookings', 'packages', 'images'):
+            if isinstance(data.get(key), list):
+                return len(data[key])
+        for value in data.values():
+            if isinstance(value, list):
+                return len(value)
+    return None
+
+
+def login_all(base_url, accounts):
+    clients = {}
+    for i, email in enumerate(accounts):
+        client = ApiClient(base_url, client_ip=virtual_ip(900 + i))
+        if client.login(email):
+            clients[email] = client
+        else:
+            print(f"  ⚠️  Could not log in as {email}")
+    return clients
+
+
+def discover_ids(clients):
+    """A coach id and a chat thread id to fill dynamic segments"""
+    ids = {'coach_id': None, 'thread_id': None}
+    for client in clients.values():
+        data = parse_json(client.get('/api/coaches?limit=1')) or {}
+        listing = data.get('data') if isinstance(data, dict) else data
+        if listing:
+            ids['coach_id'] = listing[0].get('id')
+        threads = parse_json(client.get('/api/chat/threads'))
+        if isinstance(threads, list) and threads:
+            ids['thread_id'] = threads[0].get('id')
+            break
+    return ids
+
+
+def profile_endpoint(capture, clients, path, param, limits, top):
+    """Measure one endpoint for every account and limit; returns the endpoint dict"""
+    samples = []
+    merged = QueryProfile()
+    page_sizes = limits if param else [None]
+    clients[next(iter(clients))].get(path)  # warm-up
+    for email, client in clients.items():
+        for limit in page_sizes:
+            url = f"{path}?{param}={limit}" if limit else path
+            response, profile = capture.measure(client.get, url)
+            rows = result_rows(parse_json(response))
+            samples.append({'account': email, 'path': url, 'status': response.status, 'rows': rows,
+                            'queries': profile.count, 'db_ms': profile.total_ms,
+                            'http_ms': round(response.elapsed * 1000, 1)})
+            merged.merge(profile)
+
+    ok = [s for s in samples if s['status'] == 200]
+    points = [(s['rows'], s['queries']) for s in ok if s['rows'] is not None]
+    slope, flagged = scaling(points)
+    return {
+        'samples': samples,
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'queries_median': statistics.median(s['queries'] for s in ok) if ok else None,
+        'queries_max': max((s['queries'] for s in ok), default=None),
+        'db_ms_median': round(statistics.median(s['db_ms'] for s in ok), 2) if ok else None,
+        'queries_per_row': slope,
+        'scales_with_rows': flagged,
+        'slowest': merged.slowest(top),
+        'most_called': merged.most_called(top),
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 60)
+    print("QUERY PROFILE SUMMARY")
+    print("=" * 60)
+    print(f"\n  {'endpoint':<42} {'queries':>8} {'max':>5} {'db ms':>8} {'q/row':>6}")
+    for path, r in results.items():
+        if 'error' in r:
+            print(f"  {path:<42} {r['error']}")
+            continue
+        marker = '  ❌ scales with rows' if r['scales_with_rows'] else ''
+        print(f"  {path:<42} {str(r['queries_median']):>8} {str(r['queries_max']):>5} "
+              f"{str(r['db_ms_median']):>8} {str(r['queries_per_row'] if r['queries_per_row'] is not None else '-'):>6}"
+              f"{marker}")
+    for path, r in results.items():
+        if r.get('scales_with_rows'):
+            print(f"\n{path} - most-called statements:")
+            for s in r['most_called'][:3]:
+                print(f"    {s['calls']:>4}x {s['total_ms']:>8}ms  {s['query']}")
+
+
+def run_profile(base_url=BASE_URL, limits=DEFAULT_LIMITS, only=None, top=5, url=None):
+    """Profile every endpoint and return the report dict (None if capture is unavailable)"""
+    print("=" * 60)
+    print("FITCONNECT SQL QUERY PROFILER")
+    print("=" * 60)
+    try:
+        capture = QueryCapture(url)
+        capture.ensure()
+    except PsqlError as e:
+        print(f"❌ {e}")
+        return None
+
+    sessions = {'client': login_all(base_url, SEEDED_CLIENTS), 'coach': login_all(base_url, SEEDED_COACHES)}
+    ids = discover_ids(sessions['client'])
+    results = {}
+    for role, template, param in ENDPOINTS:
+        if only and not any(template.startswith(o) for o in only):
+            continue
+        if not sessions[role]:
+            results[template] = {'error': f'no {role} session'}
+            continue
+        missing = [k for k, v in ids.items() if f'{{{k}}}' in template and not v]
+        if missing:
+            results[template] = {'error': f"no {', '.join(missing)} to fill the route with"}
+            print(f"  ⚠️  {template}: skipped (no {', '.join(missing)})")
+            continue
+        path = template.format(**ids)
+        print(f"  {template}")
+        try:
+            results[template] = profile_endpoint(capture, sessions[role], path, param, limits, top)
+        except PsqlError as e:
+            results[template] = {'error': str(e)}
+    for clients in sessions.values():
+        for client in clients.values():
+            client.close()
+
+    print_report(results)
+    flagged = [path for path, r in results.items() if r.get('scales_with_rows')]
+    report = {
+        'config': {'base_url': base_url, 'limits': list(limits), 'scaling_threshold': SCALING_THRESHOLD},
+        'endpoints': results,
+        'flagged': flagged,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, 'query_profile.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n{'❌' if flagged else '✅'} {len(flagged)} endpoint(s) with query count scaling with rows")
+    print(f"📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Per-endpoint SQL query count, DB time and N+1 detection')
+    parser.add_argument('--url', default=BASE_URL, help=f'App base URL (default: {BASE_URL})')
+    parser.add_argument('--database-url', help='DATABASE_URL the app uses (default: environment or .env)')
+    parser.add_argument('--limits', default=','.join(str(n) for n in DEFAULT_LIMITS),
+                        help=f"Page sizes for routes with a limit parameter (default: {','.join(str(n) for n in DEFAULT_LIMITS)})")
+    parser.add_argument('--only', help='Comma-separated endpoint paths or prefixes to profile')
+    parser.add_argument('--top', type=int, default=5, help='Statements to keep per endpoint (default: 5)')
+    args = parser.parse_args()
+    report = run_profile(args.url, [int(n) for n in args.limits.split(',') if n],
+                         [o for o in (args.only or '').split(',') if o], args.top, args.database_url)
+    sys.exit(0 if report and not report['flagged'] else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Discover the pages and API routes of the Next.js app router tree (src/app).
+
+Usage:
+    python scripts/app_routes.py                 # list every route
+    python scripts/app_routes.py --kind api      # only /api/* handlers
+    python scripts/app_routes.py --match /api/coaches/abc123
+
+Route patterns keep the Next.js segment syntax, e.g. /api/coaches/[id].
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'app'))
+
+PAGE_FILES = ('page.tsx', 'page.ts', 'page.jsx', 'page.js')
+ROUTE_FILES = ('route.ts', 'route.js')
+
+Route = namedtuple('Route', ['pattern', 'kind', 'file', 'regex'])
+
+
+def route_regex(pattern):
+    """Compile a route pattern ([id], [...slug], [[...slug]]) into a path regex."""
+    parts = []
+    for segment in pattern.strip('/').split('/'):
+        if not segment:
+            continue
+        if segment.startswith('[[...'):
+            parts.append(r'(?:/.*)?')
+        elif segment.startswith('[...'):
+            parts.append(r'/.+')
+        elif segment.startswith('['):
+            parts.append(r'/[^/]+')
+        else:
+            parts.append('/' + re.escape(segment))
+    return re.compile('^' + (''.join(parts) or '/') + '/?$')
+
+
+def _dynamic_segments(pattern):
+    return pattern.count('[')
+
+
+def discover_routes(app_dir=APP_DIR, kind=None):
+    """
+    Walk the app directory and return its routes.
+
+    Route groups like (marketing) are dropped from the pattern, as Next.js does.
+    Static routes sort before dynamic ones so match_route() prefers them.
+
+    Args:
+        app_dir: Path to src/app
+        kind: 'page', 'api', or None for both
+
+    Returns:
+        List of Route tuples
+    """
+    routes = []
+    for root, dirs, files in os.walk(app_dir):
+        dirs.sort()
+        rel = os.path.relpath(root, app_dir)
+        segments = [] if rel == '.' else rel.split(os.sep)
+        # Private folders (_components) are not routable
+        if any(segment.startswith('_') for segment in segments):
+            continue
+        pattern = '/' + '/'.join(s for s in segments if not (s.startswith('(') and s.endswith(')')))
+
+        for name in PAGE_FILES:
+            if name in files and kind in (None, 'page'):
+                routes.append(Route(pattern, 'page', os.path.join(root, name), route_regex(pattern)))
+                break
+        for name in ROUTE_FILES:
+            if name in files and kind in (None, 'api'):
+                routes.append(Route(pattern, 'api', os.path.join(root, name), route_regex(pattern)))
+                break
+
+    routes.sort(key=lambda r: (_dynamic_segments(r.pattern), r.pattern, r.kind))
+    return routes
+
+
+def match_route(path, routes):
+    """Return the first route whose pattern matches a URL path, or None."""
+    path = path.split('?', 1)[0].split('#', 1)[0] or '/'
+    for route in routes:
+        if route.regex.match(path):
+            return route
+    return None
+
+
+def route_fingerprints(routes):
+    """Return {pattern: sha1 of the handler file} for change detection."""
+    fingerprints = {}
+    for route in routes:
+        with open(route.file, 'rb') as f:
+            fingerprints[route.pattern] = hashlib.sha1(f.read()).hexdigest()
+    return fingerprints
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List Next.js pages and API routes under src/app')
+    parser.add_argument('--app-dir', default=APP_DIR, help=f'App router directory (default: {APP_DIR})')
+    parser.add_argument('--kind', choices=['page', 'api'], help='Only list pages or API routes')
+    parser.add_argument('--match', metavar='PATH', help='Print the route a URL path resolves to')
+    args = parser.parse_args()
+
+    routes = discover_routes(args.app_dir, args.kind)
+
+    if args.match:
+        route = match_route(args.match, routes)
+        print(f"{args.match} -> {route.pattern} ({route.kind})" if route else f"{args.match} -> no route")
+        return
+
+    for route in routes:
+        print(f"{route.kind:5} {route.pattern}")
+    print(f"\n{len(routes)} route(s)")
+
+
+if __name__ == '__main__':
+    main()
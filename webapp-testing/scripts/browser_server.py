@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Keep one warm Chromium running and let every test run connect to it.
+
+Playwright's browser server (`launchServer`, run through the Node driver the
+Python package ships with, so client and server versions always match)
+listens on a websocket. Scripts call launch_browser(p) instead of
+p.chromium.launch(headless=True): if a browser server is running they get
+chromium.connect() to it in a few milliseconds, otherwise they launch a local
+browser as before. Each connection still gets fresh contexts and pages, and
+closing the connected browser only disconnects.
+
+The server is managed like with_server.py manages app servers: run a command
+with it (`run`), or start it once for a whole working session (`start`) and
+stop it at the end. The endpoint is found through $PW_BROWSER_WS, set by
+`run`, or through screenshots/browser_server.json, written by `start`. The
+server binds to 127.0.0.1 only, and its websocket path is random per start,
+so only local processes that can read that file can connect.
+
+Usage:
+    python scripts/browser_server.py run -- python test_fitconnect.py
+    python scripts/browser_server.py start      # stays up in the background
+    python test_api.py && pytest                # both reuse the warm browser
+    python scripts/browser_server.py status
+    python scripts/browser_server.py stop
+
+    from browser_server import launch_browser
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+"""
+
+import argparse
+import json
+import os
+import secrets
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from with_server import is_server_ready, start_servers, stop_servers
+
+DEFAULT_PORT = 9333
+ENV_VAR = 'PW_BROWSER_WS'
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots')
+STATE_FILE = os.path.join(RESULTS_DIR, 'browser_server.json')
+LOG_FILE = os.path.join(RESULTS_DIR, 'browser_server.log')
+
+
+def driver_command():
+    """The Playwright Node driver bundled with the Python package, as an argv prefix."""
+    from playwright._impl._driver import compute_driver_executable
+
+    driver = compute_driver_executable()
+    # Newer releases return (node, cli.js); older ones a single launcher script
+    return [str(part) for part in driver] if isinstance(driver, tuple) else [str(driver)]
+
+
+def driver_env():
+    try:
+        from playwright._impl._driver import get_driver_env
+        return get_driver_env()
+    except ImportError:
+        return dict(os.environ)
+
+
+def _port_of(endpoint):
+    return int(endpoint.split('://', 1)[1].split('/', 1)[0].rsplit(':', 1)[1])
+
+
+def start_browser_server(port=DEFAULT_PORT, headless=True, timeout=60, output=subprocess.DEVNULL):
+    """
+    Start a Chromium browser server and wait until its port accepts connections.
+
+    Returns:
+        (list of Popen processes for stop_servers, websocket endpoint)
+    """
+    ws_path = '/' + secrets.token_hex(12)
+    config = tempfile.NamedTemporaryFile('w', suffix='.json', prefix='browser-server-', delete=False)
+    with config:
+        json.dump({'headless': headless, 'host': '127.0.0.1', 'port': port, 'wsPath': ws_path}, config)
+    command = shlex.join(driver_command() + ['launch-server', '--browser', 'chromium', '--config', config.name])
+    try:
+        processes = start_servers([{'cmd': command, 'port': port, 'env': driver_env()}], timeout=timeout,
+                                  output=output)
+    finally:
+        os.remove(config.name)
+    return processes, f'ws://127.0.0.1:{port}{ws_path}'
+
+
+def read_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def running_endpoint():
+    """Websocket endpoint of a browser server that is up, or None."""
+    endpoint = os.environ.get(ENV_VAR)
+    if not endpoint:
+        state = read_state()
+        endpoint = state and state.get('ws_endpoint')
+    if endpoint and is_server_ready(_port_of(endpoint), timeout=0.5):
+        return endpoint
+    return None
+
+
+def launch_browser(playwright, headless=True, **launch_options):
+    """Connect to the running browser server, or launch a local Chromium if there is none (or headed)."""
+    endpoint = running_endpoint() if headless and not launch_options else None
+    if endpoint:
+        try:
+            return playwright.chromium.connect(endpoint)
+        except Exception as e:
+            print(f"⚠️  Browser server at {endpoint} refused the connection ({e}); launching a local browser")
+    return playwright.chromium.launch(headless=headless, **launch_options)
+
+
+async def launch_browser_async(playwright, headless=True, **launch_options):
+    """launch_browser() for playwright.async_api."""
+    endpoint = running_endpoint() if headless and not launch_options else None
+    if endpoint:
+        try:
+            return await playwright.chromium.connect(endpoint)
+        except Exception as e:
+            print(f"⚠️  Browser server at {endpoint} refused the connection ({e}); launching a local browser")
+    return await playwright.chromium.launch(headless=headless, **launch_options)
+
+
+@contextmanager
+def browser_server_running(port=DEFAULT_PORT, headless=True, timeout=60, output=subprocess.DEVNULL):
+    """Run a browser server for the duration of the block, with $PW_BROWSER_WS pointing at it."""
+    processes, endpoint = start_browser_server(port, headless, timeout, output)
+    previous = os.environ.get(ENV_VAR)
+    os.environ[ENV_VAR] = endpoint
+    try:
+        yield endpoint
+    finally:
+        if previous is None:
+            os.environ.pop(ENV_VAR, None)
+        else:
+            os.environ[ENV_VAR] = previous
+        stop_servers(processes)
+
+
+def stop_detached(timeout=5):
+    """Stop the server recorded by `start`; returns False if none was running."""
+    state = read_state()
+    if not state:
+        return False
+    try:
+        os.killpg(state['pid'], signal.SIGTERM)
+        deadline = time.time() + timeout
+        while is_server_ready(state['port'], timeout=0.2) and time.time() < deadline:
+            time.sleep(0.2)
+        if is_server_ready(state['port'], timeout=0.2):
+            os.killpg(state['pid'], signal.SIGKILL)
+        stopped = True
+    except ProcessLookupError:
+        stopped = False
+    os.remove(STATE_FILE)
+    return stopped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared long-lived Chromium for test runs')
+    parser.add_argument('action', choices=['start', 'stop', 'status', 'run'])
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Websocket port (default: {DEFAULT_PORT})')
+    parser.add_argument('--headed', action='store_true', help='Show the browser')
+    parser.add_argument('--timeout', type=int, default=60, help='Seconds to wait for the browser (default: 60)')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run (run only)')
+    args = parser.parse_args()
+
+    if args.action == 'status':
+        endpoint = running_endpoint()
+        print(f"✅ Browser server up at {endpoint}" if endpoint else "No browser server running")
+        sys.exit(0 if endpoint else 1)
+
+    if args.action == 'stop':
+        print("✅ Browser server stopped" if stop_detached() else "No browser server running")
+        return
+
+    if args.action == 'start':
+        if running_endpoint():
+            print(f"✅ Already running at {running_endpoint()}")
+            return
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(LOG_FILE, 'ab') as log:
+            processes, endpoint = start_browser_server(args.port, not args.headed, args.timeout, output=log)
+        with open(STATE_FILE, 'w') as f:
+            json.dump({'pid': processes[0].pid, 'port': args.port, 'ws_endpoint': endpoint,
+                       'started': time.time()}, f, indent=2)
+        print(f"✅ Browser server up at {endpoint} (stop with: python scripts/browser_server.py stop)")
+        return
+
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        parser.error('run needs a command after --')
+    with browser_server_running(args.port, not args.headed, args.timeout):
+        print(f"Running: {' '.join(command)}\n")
+        result = subprocess.run(command)
+    sys.exit(result.returncode)
+
+
+if __name__ == '__main__':
+    main()
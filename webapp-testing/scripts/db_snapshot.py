@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Snapshot a seeded local Postgres as a template database and clone it per run
+or per worker, instead of re-running migrations and prisma/seed.ts.
+
+`CREATE DATABASE ... TEMPLATE` copies the template at the file level, so a
+clone of the seeded FitConnect database takes milliseconds and every clone
+starts from identical data. The template is tagged with a fingerprint of
+prisma/schema.prisma, prisma/seed.ts and migration.sql; `status` reports it
+as stale when they change, and `snapshot` then has to be re-run.
+
+Talks to Postgres through the psql CLI (no Python driver needed). The
+connection comes from DATABASE_URL, read from the environment or the
+repository's .env file. Creating the template briefly disconnects other
+sessions on the source database, such as a running dev server's Prisma
+pool; Prisma reconnects on its own.
+
+Usage:
+    npm run db:migrate && npm run db:seed        # once
+    python scripts/db_snapshot.py snapshot       # seeded DB -> <db>_template
+    python scripts/db_snapshot.py clone run1     # prints the clone's DATABASE_URL
+    DATABASE_URL=$(python scripts/db_snapshot.py clone run1) npm run dev
+    python scripts/db_snapshot.py drop run1
+    python scripts/db_snapshot.py list
+    python scripts/db_snapshot.py prune          # drop every clone
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+FINGERPRINT_FILES = ('prisma/schema.prisma', 'prisma/seed.ts', 'migration.sql')
+COMMENT_PREFIX = 'fitconnect-template '
+# Query parameters Prisma understands but libpq (psql) rejects
+PRISMA_PARAMS = {'schema', 'connection_limit', 'pool_timeout', 'pgbouncer', 'socket_timeout',
+                 'connect_timeout', 'statement_cache_size', 'sslaccept', 'sslidentity', 'sslpassword'}
+NAME_RE = re.compile(r'^[a-z0-9_]{1,63}$')
+
+
+class PsqlError(Exception):
+    pass
+
+
+class SnapshotError(PsqlError):
+    pass
+
+
+def database_url():
+    """DATABASE_URL from the environment, else from the repository's .env."""
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        return url
+    env_path = os.path.join(REPO_ROOT, '.env')
+    if os.path.exists(env_path):
+        with open(env_path) as f:
+            for line in f:
+                match = re.match(r'\s*(?:export\s+)?DATABASE_URL\s*=\s*(.*?)\s*$', line)
+                if match:
+                    return match.group(1).strip('\'"')
+    raise SnapshotError('DATABASE_URL is not set (environment or .env)')
+
+
+def with_database(url, name):
+    """The same connection URL pointing at another database."""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path='/' + name))
+
+
+def libpq_url(url):
+    """Strip Prisma-only query parameters so psql accepts the URL."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in PRISMA_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def psql(url, sql):
+    """
+    Run one SQL command with the psql CLI.
+
+    Returns:
+        Non-empty output lines (unaligned, tuples only)
+    """
+    try:
+        result = subprocess.run(['psql', libpq_url(url), '-v', 'ON_ERROR_STOP=1', '-X', '-q', '-A', '-t', '-c', sql],
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        raise PsqlError('psql not found - install the PostgreSQL client tools')
+    if result.returncode != 0:
+        raise PsqlError(result.stderr.strip() or f'psql exited {result.returncode}')
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def sql_literal(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+def fingerprint(root=REPO_ROOT):
+    """Hash of the files that determine the seeded data."""
+    digest = hashlib.sha256()
+    for rel in FINGERPRINT_FILES:
+        path = os.path.join(root, rel)
+        if os.path.exists(path):
+            digest.update(rel.encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _ident(name):
+    if not NAME_RE.match(name):
+        raise SnapshotError(f"invalid database name: {name!r} (lowercase letters, digits and _ only)")
+    return f'"{name}"'
+
+
+class TemplateDB:
+    """Template snapshot of one source database, and the clones made from it."""
+
+    def __init__(self, url=None, template=None):
+        self.url = url or database_url()
+        self.source = urlsplit(self.url).path.lstrip('/')
+        if not self.source:
+            raise SnapshotError('DATABASE_URL has no database name')
+        self.template = template or f'{self.source}_template'
+        self.clone_prefix = f'{self.source}_clone_'
+        self._admin = with_database(self.url, 'postgres')
+
+    def _psql(self, sql):
+        try:
+            return psql(self._admin, sql)
+        except PsqlError as e:
+            raise SnapshotError(str(e))
+
+    def exists(self, name):
+        return bool(self._psql(f"SELECT 1 FROM pg_database WHERE datname = {sql_literal(name)}"))
+
+    def template_fingerprint(self):
+        rows = self._psql(f"SELECT shobj_description(oid, 'pg_database') FROM pg_database "
+                          f"WHERE datname = {sql_literal(self.template)}")
+        comment = rows[0] if rows else ''
+        return comment[len(COMMENT_PREFIX):] if comment.startswith(COMMENT_PREFIX) else None
+
+    def status(self):
+        """Dict describing the template and whether it matches the current schema/seed."""
+        current = fingerprint()
+        exists = self.exists(self.template)
+        stored = self.template_fingerprint() if exists else None
+        return {'source': self.source, 'template': self.template, 'exists': exists,
+                'fingerprint': stored, 'current_fingerprint': current, 'stale': exists and stored != current,
+                'clones': self.clones()}
+
+    def _disconnect(self, name):
+        self._psql(f"SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                   f"WHERE datname = {sql_literal(name)} AND pid <> pg_backend_pid()")
+
+    def snapshot(self, force=False):
+        """
+        Copy the seeded source database into the template.
+
+        Returns:
+            Seconds taken
+        """
+        if self.exists(self.template):
+            if not force and self.template_fingerprint() == fingerprint():
+                return 0.0
+            self._psql(f"ALTER DATABASE {_ident(self.template)} WITH IS_TEMPLATE false")
+            self._psql(f"DROP DATABASE {_ident(self.template)} WITH (FORCE)")
+        start = time.perf_counter()
+        # CREATE DATABASE ... TEMPLATE needs the source to have no other sessions
+        self._disconnect(self.source)
+        self._psql(f"CREATE DATABASE {_ident(self.template)} TEMPLATE {_ident(self.source)}")
+        self._psql(f"ALTER DATABASE {_ident(self.template)} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false")
+        self._psql(f"COMMENT ON DATABASE {_ident(self.template)} IS {sql_literal(COMMENT_PREFIX + fingerprint())}")
+        return time.perf_counter() - start
+
+    def clone_name(self, name):
+        return name if name.startswith(self.clone_prefix) else self.clone_prefix + name
+
+    def clone(self, name, replace=True):
+        """
+        Create (or re-create) a clone of the template.
+
+        Returns:
+            (DATABASE_URL for the clone, seconds taken)
+        """
+        if not self.exists(self.template):
+            raise SnapshotError(f"template {self.template} does not exist - run `db_snapshot.py snapshot` first")
+        target = self.clone_name(name)
+        if replace:
+            self.drop(target)
+        start = time.perf_counter()
+        self._psql(f"CREATE DATABASE {_ident(target)} TEMPLATE {_ident(self.template)}")
+        return with_database(self.url, target), time.perf_counter() - start
+
+    def drop(self, name):
+        self._psql(f"DROP DATABASE IF EXISTS {_ident(self.clone_name(name))} WITH (FORCE)")
+
+    def clones(self):
+        return self._psql(f"SELECT datname FROM pg_database WHERE datname LIKE "
+                          f"{sql_literal(self.clone_prefix.replace('_', chr(92) + '_') + '%')} ORDER BY datname")
+
+    def prune(self):
+        names = self.clones()
+        for name in names:
+            self.drop(name)
+        return names
+
+
+@contextmanager
+def cloned_database(name, url=None, keep=False):
+    """Yield the DATABASE_URL of a fresh clone, dropping it afterwards unless keep is set."""
+    db = TemplateDB(url)
+    clone_url, _seconds = db.clone(name)
+    try:
+        yield clone_url
+    finally:
+        if not keep:
+            db.drop(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Template snapshot and fast clones of the seeded database')
+    parser.add_argument('action', choices=['snapshot', 'clone', 'drop', 'list', 'prune', 'status'])
+    parser.add_argument('name', nargs='?', help='Clone name for clone/drop')
+    parser.add_argument('--force', action='store_true', help='Re-create the template even if it is up to date')
+    parser.add_argument('--url', help='Source DATABASE_URL (default: environment or .env)')
+    args = parser.parse_args()
+
+    try:
+        db = TemplateDB(args.url)
+        if args.action == 'snapshot':
+            seconds = db.snapshot(args.force)
+            if seconds:
+                print(f"✅ {db.source} -> {db.template} in {seconds * 1000:.0f}ms", file=sys.stderr)
+            else:
+                print(f"✅ {db.template} is up to date (use --force to re-create)", file=sys.stderr)
+        elif args.action in ('clone', 'drop'):
+            if not args.name:
+                parser.error(f"{args.action} needs a name")
+            if args.action == 'clone':
+                clone_url, seconds = db.clone(args.name)
+                print(f"✅ {db.clone_name(args.name)} cloned in {seconds * 1000:.0f}ms", file=sys.stderr)
+                print(clone_url)
+            else:
+                db.drop(args.name)
+                print(f"🗑️  dropped {db.clone_name(args.name)}", file=sys.stderr)
+        elif args.action == 'list':
+            for name in db.clones():
+                print(name)
+        elif args.action == 'prune':
+            names = db.prune()
+            print(f"🗑️  dropped {len(names)} clone(s)", file=sys.stderr)
+        else:
+            status = db.status()
+            state = 'missing' if not status['exists'] else 'stale' if status['stale'] else 'up to date'
+            print(f"Template {status['template']} ({state}) from {status['source']}, {len(status['clones'])} clone(s)")
+            for name in status['clones']:
+                print(f"  {name}")
+    except SnapshotError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Interactive-element inventory in a single round trip.
+
+discover() runs one page.evaluate() that walks buttons, links, form fields
+and ARIA widgets and returns everything the per-element locator calls used to
+fetch (text, visibility, enabled state, href, name/id/type, bounding box and
+a CSS selector), so a dashboard with hundreds of controls costs one IPC call
+instead of several per element. Inventories can be saved as JSON and diffed
+between runs.
+
+Usage:
+    python scripts/dom_inventory.py http://localhost:3000/coaches
+    python scripts/dom_inventory.py http://localhost:3000/ --save /tmp/landing.json
+    python scripts/dom_inventory.py http://localhost:3000/ --diff /tmp/landing.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import namedtuple
+
+FIELDS = ['kind', 'key', 'tag', 'text', 'visible', 'enabled', 'selector', 'href', 'name', 'id',
+          'input_type', 'role', 'label', 'rect']
+Element = namedtuple('Element', FIELDS)
+
+# Fields compared when the same element (by key) exists in both inventories
+DIFF_FIELDS = ('text', 'visible', 'enabled', 'href', 'input_type', 'label')
+
+INVENTORY_JS = """() => {
+    const QUERY = 'button, a[href], input, textarea, select, [role="button"], [role="link"], ' +
+        '[role="tab"], [role="menuitem"], [role="checkbox"], [role="switch"], [contenteditable="true"]';
+    const kindOf = el => {
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'a') return 'link';
+        if (tag === 'button') return 'button';
+        if (tag === 'input' || tag === 'textarea' || tag === 'select') return tag;
+        return el.getAttribute('role') || 'editable';
+    };
+    const selectorOf = el => {
+        const parts = [];
+        for (let node = el; node && node.nodeType === 1 && parts.length < 5; node = node.parentElement) {
+            if (node.id) { parts.unshift('#' + CSS.escape(node.id)); break; }
+            let part = node.tagName.toLowerCase();
+            const parent = node.parentElement;
+            if (parent) {
+                const same = Array.from(parent.children).filter(c => c.tagName === node.tagName);
+                if (same.length > 1) part += ':nth-of-type(' + (same.indexOf(node) + 1) + ')';
+            }
+            parts.unshift(part);
+        }
+        return parts.join(' > ');
+    };
+    const labelOf = el => {
+        const aria = el.getAttribute('aria-label');
+        if (aria) return aria;
+        if (el.labels && el.labels.length) return el.labels[0].innerText.trim();
+        return el.getAttribute('placeholder') || el.getAttribute('title') || null;
+    };
+    const seen = new Map();
+    return Array.from(document.querySelectorAll(QUERY)).map(el => {
+        const rect = el.getBoundingClientRect();
+        const style = getComputedStyle(el);
+        const visible = rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+        const kind = kindOf(el);
+        const text = (el.innerText || el.value || '').trim().replace(/\\s+/g, ' ').slice(0, 120);
+        const href = el.getAttribute('href');
+        const name = el.getAttribute('name');
+        const label = labelOf(el);
+        // Stable identity across runs: id, then name, then href/text/label, numbered when repeated
+        const isField = ['input', 'textarea', 'select'].includes(kind);
+        let key = kind + ':' + (el.id ? '#' + el.id : name ? 'name=' + name :
+            href || (isField ? label : text) || label || selectorOf(el));
+        const n = (seen.get(key) || 0) + 1;
+        seen.set(key, n);
+        if (n > 1) key += '[' + n + ']';
+        return [kind, key, el.tagName.toLowerCase(), text, visible, !el.disabled && el.getAttribute('aria-disabled') !== 'true',
+            selectorOf(el), href, name, el.id || null, el.getAttribute('type'), el.getAttribute('role'), label,
+            [Math.round(rect.x), Math.round(rect.y), Math.round(rect.width), Math.round(rect.height)]];
+    });
+}"""
+
+
+def discover(page, visible_only=False):
+    """
+    Inventory every interactive element on the page with one evaluate() call.
+
+    Returns:
+        list of Element records in document order
+    """
+    elements = [Element(*row) for row in page.evaluate(INVENTORY_JS)]
+    return [e for e in elements if e.visible] if visible_only else elements
+
+
+def by_kind(elements, kind):
+    return [e for e in elements if e.kind == kind]
+
+
+def save_inventory(path, elements, url=None):
+    with open(path, 'w') as f:
+        json.dump({'url': url, 'captured': time.time(), 'elements': [e._asdict() for e in elements]}, f, indent=2)
+
+
+def load_inventory(path):
+    with open(path) as f:
+        data = json.load(f)
+    return [Element(**{k: row.get(k) for k in FIELDS}) for row in data['elements']]
+
+
+def diff_inventories(old, new):
+    """
+    Compare two inventories by element key.
+
+    Returns:
+        dict with 'added' and 'removed' Element lists and 'changed' as
+        (old, new, {field: (before, after)}) tuples
+    """
+    old_by_key = {e.key: e for e in old}
+    new_by_key = {e.key: e for e in new}
+    changed = []
+    for key in old_by_key.keys() & new_by_key.keys():
+        before, after = old_by_key[key], new_by_key[key]
+        fields = {f: (getattr(before, f), getattr(after, f)) for f in DIFF_FIELDS
+                  if getattr(before, f) != getattr(after, f)}
+        if fields:
+            changed.append((before, after, fields))
+    return {
+        'added': [e for e in new if e.key not in old_by_key],
+        'removed': [e for e in old if e.key not in new_by_key],
+        'changed': sorted(changed, key=lambda c: c[1].key),
+    }
+
+
+def format_element(element):
+    text = element.text or element.label or element.name or element.id or '[unnamed]'
+    extra = f" -> {element.href}" if element.href else f" ({element.input_type})" if element.input_type else ''
+    hidden = '' if element.visible else ' [hidden]'
+    disabled = '' if element.enabled else ' [disabled]'
+    return f"{element.kind:<9} {text}{extra}{hidden}{disabled}"
+
+
+def print_diff(diff):
+    for element in diff['added']:
+        print(f"  + {format_element(element)}")
+    for element in diff['removed']:
+        print(f"  - {format_element(element)}")
+    for _before, after, fields in diff['changed']:
+        changes = ', '.join(f"{f}: {b!r} -> {a!r}" for f, (b, a) in fields.items())
+        print(f"  ~ {after.key}: {changes}")
+
+
+def main():
+    from playwright.sync_api import sync_playwright
+    from browser_server import launch_browser
+
+    parser = argparse.ArgumentParser(description='Single-call interactive element inventory')
+    parser.add_argument('url')
+    parser.add_argument('--save', metavar='PATH', help='Write the inventory as JSON')
+    parser.add_argument('--diff', metavar='PATH', help='Compare against a saved inventory')
+    parser.add_argument('--visible-only', action='store_true', help='Skip hidden elements')
+    args = parser.parse_args()
+
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        page = browser.new_page()
+        page.goto(args.url)
+        page.wait_for_load_state('networkidle')
+        start = time.perf_counter()
+        elements = discover(page, args.visible_only)
+        elapsed = (time.perf_counter() - start) * 1000
+        browser.close()
+
+    kinds = {}
+    for element in elements:
+        kinds[element.kind] = kinds.get(element.kind, 0) + 1
+    print(f"{len(elements)} interactive elements in {elapsed:.0f}ms: "
+          + ', '.join(f"{n} {k}" for k, n in sorted(kinds.items())))
+
+    if args.diff:
+        diff = diff_inventories(load_inventory(args.diff), elements)
+        print(f"\nvs {args.diff}: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+              f"{len(diff['changed'])} changed")
+        print_diff(diff)
+    else:
+        for element in elements:
+            print(f"  {format_element(element)}")
+
+    if args.save:
+        save_inventory(args.save, elements, args.url)
+        print(f"\n📄 Inventory saved to: {args.save}")
+    if args.diff and any(diff.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
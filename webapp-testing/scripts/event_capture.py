@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Stream browser console, page-error and network events to compressed JSONL.
+
+Event handlers only build a small dict and put it on a bounded queue; a
+writer thread drains the queue into a gzip JSONL file. Memory stays flat on
+long crawls and load runs: when the writer falls behind, new events are
+dropped and counted rather than buffered. Aggregate counters (per page label,
+kind and level/status class) are kept in memory for summaries.
+
+Works with both the sync and async Playwright APIs:
+
+    from event_capture import EventCapture
+
+    with EventCapture('screenshots/events.jsonl.gz') as capture:
+        capture.attach_context(context, console_types=('error', 'warning'))
+        ...
+    print(capture.stats())
+
+Usage:
+    python scripts/event_capture.py summarize screenshots/events.jsonl.gz
+    python scripts/event_capture.py summarize events.jsonl.gz --kind console --level error --limit 20
+"""
+
+import argparse
+import fnmatch
+import gzip
+import json
+import queue
+import threading
+import time
+from collections import Counter
+
+DEFAULT_QUEUE_SIZE = 10000
+FLUSH_INTERVAL = 1.0
+_STOP = object()
+
+
+def _status_class(status):
+    return f"{status // 100}xx" if status else 'none'
+
+
+class EventCapture:
+    """
+    Bounded, thread-backed event sink.
+
+    Args:
+        path: output file (.jsonl.gz is gzip-compressed, anything else plain JSONL)
+        max_queue: events buffered before new ones are dropped
+    """
+
+    def __init__(self, path, max_queue=DEFAULT_QUEUE_SIZE):
+        self.path = path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._counters = Counter()
+        self._counter_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self._pages = 0
+        self._writer = threading.Thread(target=self._write_loop, name='event-capture', daemon=True)
+        self._writer.start()
+
+    # -- sink --------------------------------------------------------------
+
+    def _open(self):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'wt', encoding='utf-8', compresslevel=6)
+        return open(self.path, 'w', encoding='utf-8')
+
+    def _write_loop(self):
+        with self._open() as f:
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    event = self._queue.get(timeout=FLUSH_INTERVAL)
+                except queue.Empty:
+                    event = None
+                if event is _STOP:
+                    break
+                if event is not None:
+                    f.write(json.dumps(event, separators=(',', ':')) + '\n')
+                    self.written += 1
+                if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                    f.flush()
+                    last_flush = time.monotonic()
+
+    def emit(self, label, kind, **fields):
+        """Count an event and queue it for writing; never blocks the caller."""
+        level = fields.get('level') or _status_class(fields.get('status'))
+        with self._counter_lock:
+            self._counters[(label, kind, level)] += 1
+        try:
+            self._queue.put_nowait({'ts': round(time.time(), 3), 'page': label, 'kind': kind, **fields})
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+
+    # -- wiring ------------------------------------------------------------
+
+    def attach(self, page, label=None, console_types=None, network=True, url_filter=None,
+               failed_only=False):
+        """
+        Capture events from one page.
+
+        Args:
+            label: name used in events and counters (default: page-N)
+            console_types: console levels to keep, e.g. ('error', 'warning'); None keeps all
+            network: capture responses and failed requests
+            url_filter: fnmatch pattern; network events for other URLs are skipped
+            failed_only: only keep network responses with status >= 400 (and failures)
+        """
+        self._pages += 1
+        label = label or f"page-{self._pages}"
+
+        def on_console(msg):
+            if console_types is None or msg.type in console_types:
+                location = msg.location or {}
+                self.emit(label, 'console', level=msg.type, text=msg.text[:2000],
+                          url=location.get('url'), line=location.get('lineNumber'))
+
+        def on_page_error(error):
+            self.emit(label, 'pageerror', level='error', text=str(error)[:2000])
+
+        def wanted(url):
+            return url_filter is None or fnmatch.fnmatch(url, url_filter)
+
+        def on_response(response):
+            if wanted(response.url) and (not failed_only or response.status >= 400):
+                request = response.request
+                self.emit(label, 'response', status=response.status, method=request.method,
+                          url=response.url, resource_type=request.resource_type)
+
+        def on_request_failed(request):
+            if wanted(request.url):
+                self.emit(label, 'requestfailed', level='error', method=request.method, url=request.url,
+                          resource_type=request.resource_type, failure=request.failure)
+
+        page.on('console', on_console)
+        page.on('pageerror', on_page_error)
+        if network:
+            page.on('response', on_response)
+            page.on('requestfailed', on_request_failed)
+        return page
+
+    def attach_context(self, context, **filters):
+        """Capture every current and future page of a browser context."""
+        for page in context.pages:
+            self.attach(page, **filters)
+        context.on('page', lambda page: self.attach(page, **filters))
+        return context
+
+    # -- results -----------------------------------------------------------
+
+    def stats(self):
+        """Aggregate counters: totals by kind/level, per page, written and dropped."""
+        with self._counter_lock:
+            counters = dict(self._counters)
+            dropped = self.dropped
+        by_kind = Counter()
+        by_page = {}
+        for (label, kind, level), count in counters.items():
+            by_kind[f"{kind}:{level}"] += count
+            by_page.setdefault(label, Counter())[f"{kind}:{level}"] += count
+        return {
+            'events': sum(counters.values()),
+            'written': self.written,
+            'dropped': dropped,
+            'by_kind': dict(by_kind),
+            'by_page': {label: dict(c) for label, c in by_page.items()},
+        }
+
+    def count(self, kind, level=None, label=None):
+        with self._counter_lock:
+            return sum(n for (l, k, lv), n in self._counters.items()
+                       if k == kind and (level is None or lv == level) and (label is None or l == label))
+
+    def close(self):
+        """Drain the queue and close the file."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_events(path):
+    """Iterate events from a capture file."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a console/network event capture')
+    parser.add_argument('action', choices=['summarize'])
+    parser.add_argument('path')
+    parser.add_argument('--kind', help='Only this kind (console, pageerror, response, requestfailed)')
+    parser.add_argument('--level', help='Only this console level or status class (error, 4xx, ...)')
+    parser.add_argument('--limit', type=int, default=10, help='Events to print (default: 10)')
+    args = parser.parse_args()
+
+    totals = Counter()
+    shown = 0
+    for event in read_events(args.path):
+        level = event.get('level') or _status_class(event.get('status'))
+        if (args.kind and event['kind'] != args.kind) or (args.level and level != args.level):
+            continue
+        totals[f"{event['kind']}:{level}"] += 1
+        if shown < args.limit:
+            detail = event.get('text') or f"{event.get('method')} {event.get('url')} {event.get('status') or event.get('failure')}"
+            print(f"  [{event['page']}] {event['kind']}:{level} {detail[:200]}")
+            shown += 1
+    print(f"\n{sum(totals.values())} event(s)")
+    for key, count in totals.most_common():
+        print(f"  {key:<24} {count}")
+
+
+if __name__ == '__main__':
+    main()
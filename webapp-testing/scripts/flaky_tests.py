@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Flaky-test detection from run history, and the quarantine list it maintains.
+
+Every suite run appends one line to screenshots/test_history.jsonl mapping
+test ids (test_fitconnect.py::test_coaches_page) to an outcome:
+- passed, failed
+- flaky: failed, then passed when retried in a fresh context (pytest --retries)
+
+pytest runs are recorded by conftest.py; script-mode runs of test_fitconnect.py
+and test_api.py record their test_results.json / api_test_results.json, where
+a test fails if any of its checks failed.
+
+A test's flakiness score is the weighted share of its recent runs that show
+instability: a run that only passed on retry, or an isolated blip - an
+outcome that differs from the runs on both sides of it (P,F,P or F,P,F). A
+single change of outcome is not instability: a test that broke and stays
+broken, or a regression that was fixed, flips once. Newer runs weigh more
+(DECAY per run), so a test that was fixed drifts back to zero.
+
+Runs where more than MASS_FAILURE of at least MASS_FAILURE_MIN_TESTS tests
+failed are left out of the scores: a server outage or a broken deploy fails
+everything at once and says nothing about any one test.
+
+Tests with at least MIN_UNSTABLE unstable runs, scoring QUARANTINE_AT or more
+over at least MIN_RUNS runs, are moved to screenshots/quarantine.json; they
+leave it once they score below RELEASE_BELOW. Under pytest, quarantined tests still run but their failures
+are reported as xfail and do not fail the session (see conftest.py
+--quarantine).
+
+Usage:
+    python scripts/flaky_tests.py scores                 # flakiest tests first
+    python scripts/flaky_tests.py update                 # recompute the quarantine list
+    python scripts/flaky_tests.py record screenshots/test_results.json
+    python scripts/flaky_tests.py rerun -- -x            # rerun only last pytest run's failures
+
+    pytest --retries 2                                   # retry failed tests, record history, update quarantine
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+TESTING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCREENSHOTS_DIR = os.path.join(TESTING_DIR, 'screenshots')
+HISTORY_FILE = os.path.join(SCREENSHOTS_DIR, 'test_history.jsonl')
+QUARANTINE_FILE = os.path.join(SCREENSHOTS_DIR, 'quarantine.json')
+PYTEST_RESULTS = os.path.join(SCREENSHOTS_DIR, 'pytest_results.json')
+
+# Script-mode results file -> the module its test groups belong to
+SCRIPT_RESULTS = {'test_results.json': 'test_fitconnect.py', 'api_test_results.json': 'test_api.py'}
+
+MAX_RUNS = 500
+WINDOW = 30
+DECAY = 0.9
+MIN_RUNS = 5
+MIN_UNSTABLE = 3
+QUARANTINE_AT = 0.3
+RELEASE_BELOW = 0.1
+MASS_FAILURE = 0.5
+MASS_FAILURE_MIN_TESTS = 5
+
+
+def run_outcomes(report, module=None):
+    """
+    Per-test outcomes of one results file.
+
+    Args:
+        report: pytest_results.json (has 'tests') or a script-mode ResultLog file
+        module: module name for script-mode test groups
+
+    Returns:
+        Dict of test id -> 'passed' | 'failed' | 'flaky'
+    """
+    outcomes = {}
+    if 'tests' in report:
+        for test in report['tests']:
+            if test['outcome'] == 'skipped':
+                continue
+            if test['outcome'] == 'passed':
+                outcomes[test['nodeid']] = 'flaky' if test.get('attempts', 1) > 1 else 'passed'
+            else:
+                outcomes[test['nodeid']] = 'failed'
+        return outcomes
+    for result in report.get('results', []):
+        group = result.get('group')
+        if not group:
+            continue
+        test_id = f"{module}::{group}" if module else group
+        if not result['passed']:
+            outcomes[test_id] = 'failed'
+        else:
+            outcomes.setdefault(test_id, 'passed')
+    return outcomes
+
+
+def load_history(path=HISTORY_FILE):
+    """Recorded runs, oldest first."""
+    runs = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return runs
+
+
+def record_run(outcomes, source, path=HISTORY_FILE, started=None, keep=MAX_RUNS):
+    """Append one run to the history, trimming it to the newest `keep` runs."""
+    if not outcomes:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps({'started': started or time.time(), 'source': source, 'tests': outcomes}) + '\n')
+    runs = load_history(path)
+    if len(runs) > keep:
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(run) + '\n' for run in runs[-keep:])
+
+
+def record_results(results_path, history=HISTORY_FILE):
+    """Record a results JSON file (pytest or script mode); returns the outcomes recorded."""
+    with open(results_path) as f:
+        report = json.load(f)
+    name = os.path.basename(results_path)
+    outcomes = run_outcomes(report, SCRIPT_RESULTS.get(name))
+    record_run(outcomes, name, history, report.get('started'))
+    return outcomes
+
+
+def unstable_runs(outcomes):
+    """Per run (oldest first): passed only on retry, or an isolated blip between two equal outcomes."""
+    passed = [outcome != 'failed' for outcome in outcomes]
+    return [
+        outcome == 'flaky' or (0 < i < len(outcomes) - 1 and passed[i - 1] == passed[i + 1] != passed[i])
+        for i, outcome in enumerate(outcomes)
+    ]
+
+
+def flakiness(outcomes, decay=DECAY):
+    """Decay-weighted share of runs (oldest first) that passed only on retry or blipped."""
+    if not outcomes:
+        return 0.0
+    weighted = total = 0.0
+    for i, unstable in enumerate(unstable_runs(outcomes)):
+        weight = decay ** (len(outcomes) - 1 - i)
+        weighted += weight * unstable
+        total += weight
+    return weighted / total
+
+
+def mass_failure(run, share=MASS_FAILURE, min_tests=MASS_FAILURE_MIN_TESTS):
+    """Whether most of a run's tests failed, as when the server was down."""
+    outcomes = list(run['tests'].values())
+    return len(outcomes) >= min_tests and outcomes.count('failed') > share * len(outcomes)
+
+
+def score_tests(runs, window=WINDOW, decay=DECAY):
+    """
+    Returns:
+        Dict of test id -> {'runs', 'failed', 'flaky', 'unstable', 'score', 'last'} over each test's
+        last `window` runs, leaving out runs where most tests failed
+    """
+    by_test = {}
+    for run in runs:
+        if mass_failure(run):
+            continue
+        for test_id, outcome in run['tests'].items():
+            by_test.setdefault(test_id, []).append(outcome)
+    scores = {}
+    for test_id, outcomes in by_test.items():
+        recent = outcomes[-window:]
+        scores[test_id] = {
+            'runs': len(recent),
+            'failed': recent.count('failed'),
+            'flaky': recent.count('flaky'),
+            'unstable': sum(unstable_runs(recent)),
+            'score': round(flakiness(recent, decay), 3),
+            'last': recent[-1],
+        }
+    return scores
+
+
+def load_quarantine(path=QUARANTINE_FILE):
+    """Quarantined test id -> entry ({'score', 'since', 'runs'}); empty when there is no file."""
+    try:
+        with open(path) as f:
+            return json.load(f).get('tests', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def update_quarantine(scores, path=QUARANTINE_FILE, quarantine_at=QUARANTINE_AT, release_below=RELEASE_BELOW,
+                      min_runs=MIN_RUNS, min_unstable=MIN_UNSTABLE):
+    """
+    Quarantine chronic flakes and release recovered ones, then save the list.
+
+    Returns:
+        (quarantine dict, [added test ids], [released test ids])
+    """
+    quarantine = load_quarantine(path)
+    added, released = [], []
+    for test_id, entry in sorted(scores.items()):
+        if test_id in quarantine:
+            if entry['score'] < release_below:
+                del quarantine[test_id]
+                released.append(test_id)
+            else:
+                quarantine[test_id].update(score=entry['score'], runs=entry['runs'])
+        elif entry['runs'] >= min_runs and entry['unstable'] >= min_unstable and entry['score'] >= quarantine_at:
+            quarantine[test_id] = {'score': entry['score'], 'runs': entry['runs'], 'since': time.time()}
+            added.append(test_id)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'updated': time.time(), 'quarantine_at': quarantine_at, 'release_below': release_below,
+                   'tests': quarantine}, f, indent=2)
+    return quarantine, added, released
+
+
+def failed_tests(results_path=PYTEST_RESULTS):
+    """Node ids that failed or errored in a pytest_results.json."""
+    with open(results_path) as f:
+        report = json.load(f)
+    return [t['nodeid'] for t in report['tests'] if t['outcome'] in ('failed', 'error')]
+
+
+def print_scores(scores, quarantine, limit=20):
+    ranked = sorted(scores.items(), key=lambda item: (-item[1]['score'], item[0]))[:limit]
+    if not ranked:
+        print("No recorded runs yet - run the suites (pytest or script mode) first")
+        return
+    print(f"{'score':>6} {'runs':>5} {'failed':>6} {'flaky':>6} {'unstable':>8}  test")
+    for test_id, entry in ranked:
+        flag = '  [quarantined]' if test_id in quarantine else ''
+        print(f"{entry['score']:>6.2f} {entry['runs']:>5} {entry['failed']:>6} {entry['flaky']:>6} "
+              f"{entry['unstable']:>8}  {test_id}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flakiness scores and quarantine from suite run history')
+    parser.add_argument('action', choices=['scores', 'update', 'record', 'rerun'])
+    parser.add_argument('args', nargs='*', help='record: results JSON files; rerun: extra pytest arguments (after --)')
+    parser.add_argument('--history', default=HISTORY_FILE, help=f'Run history (default: {HISTORY_FILE})')
+    parser.add_argument('--quarantine', default=QUARANTINE_FILE, help=f'Quarantine list (default: {QUARANTINE_FILE})')
+    parser.add_argument('--results', default=PYTEST_RESULTS, help='pytest results to rerun failures from')
+    parser.add_argument('--window', type=int, default=WINDOW, help=f'Runs per test to score (default: {WINDOW})')
+    args = parser.parse_args()
+
+    if args.action == 'record':
+        if not args.args:
+            parser.error('record needs one or more results JSON files')
+        for path in args.args:
+            outcomes = record_results(path, args.history)
+            print(f"✅ Recorded {len(outcomes)} test outcome(s) from {path}")
+        return
+
+    if args.action == 'rerun':
+        try:
+            failed = failed_tests(args.results)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Cannot read {args.results}: {e}")
+            sys.exit(2)
+        if not failed:
+            print("✅ No failed tests in the last run")
+            return
+        print(f"Rerunning {len(failed)} failed test(s): {', '.join(failed)}", file=sys.stderr)
+        rerun_json = os.path.join(SCREENSHOTS_DIR, 'pytest_rerun_results.json')
+        sys.exit(subprocess.call([sys.executable, '-m', 'pytest', *failed, '--results-json', rerun_json, *args.args],
+                                 cwd=TESTING_DIR))
+
+    scores = score_tests(load_history(args.history), args.window)
+    if args.action == 'update':
+        quarantine, added, released = update_quarantine(scores, args.quarantine)
+        for test_id in added:
+            print(f"⚠️  Quarantined {test_id} (score {scores[test_id]['score']:.2f})")
+        for test_id in released:
+            print(f"✅ Released {test_id} (score {scores[test_id]['score']:.2f})")
+        print(f"📄 {len(quarantine)} quarantined test(s) in: {args.quarantine}")
+        return
+    print_scores(scores, load_quarantine(args.quarantine))
+
+
+if __name__ == '__main__':
+    main()
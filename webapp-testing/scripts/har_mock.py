@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Record and replay /api/* traffic as HAR so frontend scenarios can run without a backend.
+
+Record mode captures every /api/* call of a browser context into a HAR file.
+Replay mode serves those responses through Playwright route interception, so
+only the Next.js frontend has to be running - no API handlers, no Postgres.
+
+A fingerprint of every src/app/api route handler is stored next to the HAR
+(<har>.routes.json). The staleness check compares it with the current tree
+and reports recorded routes that were removed or whose handler changed.
+
+Usage:
+    # Check whether a recording still matches src/app/api
+    python scripts/har_mock.py check recordings/fitconnect.har
+
+    # List the routes covered by a recording
+    python scripts/har_mock.py routes recordings/fitconnect.har
+
+From a Playwright script:
+    from har_mock import record_context, replay_context
+
+    context = record_context(browser, 'recordings/fitconnect.har')
+    ...                                   # run scenarios
+    finish_recording(context, 'recordings/fitconnect.har', keep=all_passed)
+
+    context, misses = replay_context(browser, 'recordings/fitconnect.har')
+    ...                                   # run scenarios; misses lists unrecorded calls
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from urllib.parse import urlsplit
+
+from app_routes import discover_routes, match_route, route_fingerprints
+
+API_URL_GLOB = '**/api/**'
+
+
+def _pending_path(har_path):
+    return har_path + '.recording'
+
+
+def _fingerprint_path(har_path):
+    return har_path + '.routes.json'
+
+
+def record_context(browser, har_path, **context_kwargs):
+    """
+    Create a browser context that records /api/* traffic.
+
+    The HAR is written to a temporary path when the context closes; call
+    finish_recording() to keep it only if the run passed.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(har_path)), exist_ok=True)
+    return browser.new_context(
+        record_har_path=_pending_path(har_path),
+        record_har_url_filter=API_URL_GLOB,
+        record_har_content='embed',
+        **context_kwargs,
+    )
+
+
+def finish_recording(context, har_path, keep=True):
+    """
+    Close a recording context and promote its HAR if the run passed.
+
+    A failing run never overwrites the last good recording.
+
+    Returns:
+        True if the HAR was saved
+    """
+    context.close()
+    pending = _pending_path(har_path)
+    if not keep:
+        if os.path.exists(pending):
+            os.remove(pending)
+        return False
+
+    shutil.move(pending, har_path)
+    with open(_fingerprint_path(har_path), 'w') as f:
+        json.dump(route_fingerprints(discover_routes(kind='api')), f, indent=2, sort_keys=True)
+    return True
+
+
+def replay_context(browser, har_path, strict=True, **context_kwargs):
+    """
+    Create a browser context that serves /api/* from a HAR recording.
+
+    Requests missing from the HAR are collected in the returned list. With
+    strict=True they are aborted; otherwise they go through to the network,
+    which is useful when a real server is available for the gaps.
+
+    Returns:
+        (context, misses) where misses is a list of "METHOD url" strings
+    """
+    if not os.path.exists(har_path):
+        raise FileNotFoundError(f"HAR recording not found: {har_path} (run once in record mode first)")
+
+    context = browser.new_context(**context_kwargs)
+    misses = []
+
+    def handle_miss(route):
+        request = route.request
+        misses.append(f"{request.method} {request.url}")
+        if strict:
+            route.abort()
+        else:
+            route.continue_()
+
+    # Handlers registered later run first, so the HAR handler falls back to handle_miss
+    context.route(API_URL_GLOB, handle_miss)
+    context.route_from_har(har_path, url=API_URL_GLOB, not_found='fallback')
+    return context, misses
+
+
+def load_har_entries(har_path):
+    """Return (method, url) for every request in a HAR file."""
+    with open(har_path) as f:
+        har = json.load(f)
+    return [(e['request']['method'], e['request']['url']) for e in har.get('log', {}).get('entries', [])]
+
+
+def recorded_route_set(har_path, routes=None):
+    """
+    Map the requests of a HAR file onto src/app/api route patterns.
+
+    Returns:
+        (covered, unknown): covered maps pattern -> sorted methods, unknown
+        lists "METHOD path" entries that match no current route
+    """
+    routes = routes if routes is not None else discover_routes(kind='api')
+    covered = {}
+    unknown = set()
+    for method, url in load_har_entries(har_path):
+        path = urlsplit(url).path
+        route = match_route(path, routes)
+        if route is None:
+            unknown.add(f"{method} {path}")
+        else:
+            covered.setdefault(route.pattern, set()).add(method)
+    return {k: sorted(v) for k, v in sorted(covered.items())}, sorted(unknown)
+
+
+def check_staleness(har_path, routes=None):
+    """
+    Compare a recording against the current src/app/api tree.
+
+    Returns:
+        Dict with 'removed' (recorded calls that match no route), 'changed'
+        (recorded routes whose handler changed since recording), 'unrecorded'
+        (current API routes the recording never hit) and 'stale' (bool)
+    """
+    routes = routes if routes is not None else discover_routes(kind='api')
+    covered, unknown = recorded_route_set(har_path, routes)
+    current = route_fingerprints(routes)
+
+    recorded = {}
+    if os.path.exists(_fingerprint_path(har_path)):
+        with open(_fingerprint_path(har_path)) as f:
+            recorded = json.load(f)
+
+    changed = sorted(p for p in covered if p in recorded and recorded[p] != current.get(p))
+    # Without a fingerprint file every covered route is treated as unverified
+    if not recorded:
+        changed = sorted(covered)
+
+    return {
+        'covered': covered,
+        'removed': unknown,
+        'changed': changed,
+        'unrecorded': sorted(p for p in current if p not in covered),
+        'stale': bool(unknown or changed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect HAR recordings of /api/* traffic')
+    parser.add_argument('action', choices=['check', 'routes'], help='check: staleness report; routes: covered routes')
+    parser.add_argument('har', help='Path to the HAR recording')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.har):
+        print(f"❌ HAR recording not found: {args.har}")
+        sys.exit(1)
+
+    if args.action == 'routes':
+        covered, unknown = recorded_route_set(args.har)
+        for pattern, methods in covered.items():
+            print(f"  {','.join(methods):12} {pattern}")
+        for entry in unknown:
+            print(f"  ?            {entry}")
+        print(f"\n{len(covered)} route(s) recorded")
+        return
+
+    report = check_staleness(args.har)
+    print(f"Recorded routes: {len(report['covered'])} | Not recorded: {len(report['unrecorded'])}")
+    for entry in report['removed']:
+        print(f"  ❌ Removed route: {entry}")
+    for pattern in report['changed']:
+        print(f"  ❌ Handler changed since recording: {pattern}")
+    if report['stale']:
+        print("\n❌ Recording is stale - re-run the suite with --record-har")
+        sys.exit(1)
+    print("\n✅ Recording is up to date")
+
+
+if __name__ == '__main__':
+    main()
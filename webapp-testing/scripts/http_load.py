@@ -0,0 +1,343 @@
+"""
+Shared HTTP helpers for the FitConnect load and stress harnesses.
+
+Standard library only: a keep-alive API client with one connection per
+thread and a per-session cookie jar, a minimal asyncio connection for
+event-loop load workers, thread-safe latency statistics, and a bounded
+concurrent runner.
+"""
+
+import asyncio
+import http.client
+import json
+import math
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+BASE_URL = 'http://localhost:3000'
+
+# Accounts created by prisma/seed.ts (all use DEMO_PASSWORD)
+DEMO_PASSWORD = 'password123'
+SEEDED_CLIENTS = ['alex@example.com', 'jordan@example.com', 'sam@example.com']
+SEEDED_COACHES = [
+    'sarah@example.com', 'marcus@example.com', 'emma@example.com',
+    'james@example.com', 'rachel@example.com', 'david@example.com',
+]
+
+Response = namedtuple('Response', ['status', 'headers', 'body', 'elapsed'])
+
+# Safe to resend when a kept-alive connection drops mid-request; a resent POST
+# (register, create-intent, bookings) could duplicate the write.
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'})
+# Node closes keep-alive connections idle for 5s (server.keepAliveTimeout).
+# Other methods are not retried, so they get a fresh connection after this long.
+IDLE_REOPEN_S = 4.0
+
+
+class ApiClient:
+    """
+    HTTP client for one user session against the Next.js server.
+
+    Each thread gets its own keep-alive connection; cookies (the auth_token
+    set by /api/auth/login) are shared by every thread of the session.
+
+    client_ip is sent as X-Forwarded-For, which the auth routes use as the
+    rate-limit key, so each virtual user gets its own login/register budget.
+    """
+
+    def __init__(self, base_url=BASE_URL, timeout=30, client_ip=None):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.client_ip = client_ip
+        self.cookies = {}
+        self._cookie_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self, method='GET'):
+        conn = getattr(self._local, 'conn', None)
+        if (conn is not None and method not in IDEMPOTENT_METHODS
+                and time.monotonic() - self._local.last_used > IDLE_REOPEN_S):
+            self._reset_connection()
+            conn = None
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _store_cookies(self, headers):
+        with self._cookie_lock:
+            for name, value in headers:
+                if name.lower() == 'set-cookie':
+                    pair = value.split(';', 1)[0]
+                    if '=' in pair:
+                        key, val = pair.split('=', 1)
+                        self.cookies[key.strip()] = val.strip()
+
+    def request(self, method, path, body=None, json_body=None, headers=None):
+        """
+        Send a request and return a Response with the elapsed wall time in seconds.
+
+        A dropped keep-alive connection is re-opened and an idempotent request
+        retried once; other methods raise rather than risk a duplicate write.
+        """
+        headers = dict(headers or {})
+        if self.client_ip:
+            headers.setdefault('X-Forwarded-For', self.client_ip)
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers.setdefault('Content-Type', 'application/json')
+        if isinstance(body, str):
+            body = body.encode()
+        with self._cookie_lock:
+            if self.cookies:
+                headers['Cookie'] = '; '.join(f"{k}={v}" for k, v in self.cookies.items())
+
+        for attempt in range(2):
+            conn = self._connection(method)
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._reset_connection()
+                if attempt or method not in IDEMPOTENT_METHODS:
+                    raise
+                continue
+            finally:
+                self._local.last_used = time.monotonic()
+            elapsed = time.perf_counter() - start
+            resp_headers = resp.getheaders()
+            self._store_cookies(resp_headers)
+            return Response(resp.status, resp_headers, data, elapsed)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def login(self, email, password=DEMO_PASSWORD):
+        """Log in through /api/auth/login; returns the user dict, or None on failure."""
+        resp = self.post('/api/auth/login', json_body={'email': email, 'password': password})
+        if resp.status != 200:
+            return None
+        return (parse_json(resp) or {}).get('user') or {'email': email}
+
+    def close(self):
+        self._reset_connection()
+
+
+class AsyncConnection:
+    """
+    One keep-alive HTTP/1.1 connection for asyncio load workers.
+
+    Just enough HTTP for the API routes: fixed extra headers (cookies,
+    X-Forwarded-For), Content-Length and chunked responses. The body is read
+    and discarded; request() returns (status, body size). A keep-alive
+    connection the server has closed is re-opened and an idempotent request
+    retried once (see IDEMPOTENT_METHODS).
+    """
+
+    def __init__(self, base_url=BASE_URL, headers=None, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.last_used = 0.0
+
+    async def request(self, method, path, body=None, content_type='application/json'):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        if isinstance(body, str):
+            body = body.encode()
+        if body is not None:
+            lines += [f"Content-Type: {content_type}", f"Content-Length: {len(body)}"]
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode() + (body or b'')
+
+        for attempt in range(2):
+            if (self.writer is not None and method not in IDEMPOTENT_METHODS
+                    and time.monotonic() - self.last_used > IDLE_REOPEN_S):
+                self.close()
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout)
+            try:
+                self.writer.write(payload)
+                return await asyncio.wait_for(self._read_response(method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if attempt or method not in IDEMPOTENT_METHODS:
+                    raise
+            except asyncio.TimeoutError:
+                self.close()
+                raise
+            finally:
+                self.last_used = time.monotonic()
+
+    async def _read_response(self, method):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('server closed the connection')
+        status = int(status_line.split()[1])
+        length, chunked, close = None, False, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding':
+                chunked = 'chunked' in value
+            elif name == 'connection':
+                close = value == 'close'
+
+        size = 0
+        if method == 'HEAD' or status in (204, 304) or status < 200:
+            pass
+        elif chunked:
+            while True:
+                chunk = int((await self.reader.readline()).split(b';')[0], 16)
+                if chunk == 0:
+                    while await self.reader.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+        elif length is not None:
+            await self.reader.readexactly(length)
+            size = length
+        else:
+            size = len(await self.reader.read())
+            close = True
+        if close:
+            self.close()
+        return status, size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def virtual_ip(index):
+    """Deterministic private address for the index-th virtual user."""
+    return f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+
+
+def parse_json(response):
+    """Decode a JSON response body, returning None if it is not JSON."""
+    try:
+        return json.loads(response.body)
+    except (ValueError, TypeError):
+        return None
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyStats:
+    """Thread-safe latency samples (seconds) grouped by label."""
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, label, seconds):
+        with self._lock:
+            self._samples.setdefault(label, []).append(seconds)
+
+    def labels(self):
+        with self._lock:
+            return sorted(self._samples)
+
+    def summary(self, label=None):
+        """
+        Summarize one label, or all samples when label is None.
+
+        Returns:
+            Dict with count, mean/p50/p90/p95/p99/max in milliseconds
+        """
+        with self._lock:
+            if label is None:
+                values = [v for samples in self._samples.values() for v in samples]
+            else:
+                values = list(self._samples.get(label, []))
+        values.sort()
+        count = len(values)
+        return {
+            'count': count,
+            'mean_ms': round(sum(values) / count * 1000, 2) if count else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p90_ms': round(percentile(values, 90) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2) if count else 0.0,
+        }
+
+    def report(self):
+        """Summaries for every label plus an 'all' entry."""
+        report = {label: self.summary(label) for label in self.labels()}
+        report['all'] = self.summary()
+        return report
+
+
+def linear_slope(points):
+    """Least-squares slope of (x, y) points."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def format_summary(name, summary):
+    """One-line human readable latency summary."""
+    return (
+        f"{name}: n={summary['count']} mean={summary['mean_ms']}ms p50={summary['p50_ms']}ms "
+        f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms max={summary['max_ms']}ms"
+    )
+
+
+def run_concurrently(func, items, concurrency):
+    """
+    Call func(item) for every item with at most `concurrency` in flight.
+
+    Returns:
+        List of (item, result, exception) in input order
+    """
+    def call(item):
+        try:
+            return item, func(item), None
+        except Exception as e:
+            return item, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(call, items))
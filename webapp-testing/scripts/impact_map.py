@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Test impact analysis: map suite tests to the app routes and source files they
+exercise, then pick only the tests a git diff can affect.
+
+The map records, per pytest node id (test_fitconnect.py::test_coaches_page),
+the URL paths the test touched. Paths come from two sources:
+- recorded: every browser request made during `pytest --record-impact`
+- static: URL literals in the test function (covers page.request API calls,
+  which do not surface as browser requests)
+
+At selection time each path is resolved to its src/app route, the route's
+layouts, and the transitive closure of their imports (@/components, @/lib,
+relative imports), so the file set always reflects the current tree.
+
+Selection rules:
+- on main/master, with --all, or when the base ref cannot be diffed
+  (missing in a shallow or fork checkout): everything
+- without a recorded map, the static map (URL literals only) is used
+- changes to build/config/schema files, or to conftest.py, pytest.ini and any
+  harness module the suites import (directly or indirectly): everything
+- a changed test module: its tests
+- a changed file under src/: the tests whose closure contains it
+- anything else (docs, other harnesses): nothing
+
+Usage:
+    python scripts/impact_map.py build                      # static map (no server needed)
+    python scripts/impact_map.py show
+    python scripts/impact_map.py select --base origin/main  # print selected node ids
+    python scripts/impact_map.py run --base origin/main -- -n 4   # run pytest on the selection
+
+    pytest --record-impact                                  # refresh the map from a real run
+"""
+
+import argparse
+import ast
+import fnmatch
+import json
+import os
+import re
+import subprocess
+import sys
+from urllib.parse import urlparse
+
+from app_routes import APP_DIR, discover_routes, match_route
+
+TESTING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPO_ROOT = os.path.dirname(TESTING_DIR)
+SRC_DIR = os.path.join(REPO_ROOT, 'src')
+DEFAULT_MAP = os.path.join(TESTING_DIR, 'screenshots', 'impact_map.json')
+SUITE_MODULES = ('test_fitconnect.py', 'test_api.py')
+
+# Changes here can affect every test
+GLOBAL_PATTERNS = (
+    'package.json', 'package-lock.json', 'tsconfig.json', 'next.config.*', 'postcss.config.*',
+    'tailwind.config.*', 'components.json', '.env*', 'prisma/*', 'prisma.config.ts', 'migration.sql',
+    'src/middleware.ts', 'public/*',
+    'webapp-testing/conftest.py', 'webapp-testing/pytest.ini',
+)
+MAIN_BRANCHES = ('main', 'master')
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+LAYOUT_FILES = ('layout', 'template', 'loading', 'error', 'not-found')
+IMPORT_RE = re.compile(r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)['"]([^'"]+)['"]""")
+
+
+def _rel(path):
+    return os.path.relpath(path, REPO_ROOT).replace(os.sep, '/')
+
+
+def _resolve_import(spec, importer):
+    """Resolve an import specifier to a file under src/, or None for packages."""
+    if spec.startswith('@/'):
+        base = os.path.join(SRC_DIR, spec[2:])
+    elif spec.startswith('.'):
+        base = os.path.normpath(os.path.join(os.path.dirname(importer), spec))
+    else:
+        return None
+    candidates = [base] + [base + ext for ext in SOURCE_EXTENSIONS]
+    candidates += [os.path.join(base, 'index' + ext) for ext in SOURCE_EXTENSIONS]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+class SourceGraph:
+    """Import graph of src/, resolved lazily and cached per file."""
+
+    def __init__(self):
+        self._imports = {}
+
+    def imports(self, path):
+        if path not in self._imports:
+            found = set()
+            if path.endswith(SOURCE_EXTENSIONS):
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    for spec in IMPORT_RE.findall(f.read()):
+                        target = _resolve_import(spec, path)
+                        if target:
+                            found.add(target)
+            self._imports[path] = found
+        return self._imports[path]
+
+    def closure(self, roots):
+        seen = set()
+        stack = list(roots)
+        while stack:
+            path = stack.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            stack.extend(self.imports(path))
+        return seen
+
+
+def route_roots(route):
+    """Files that render a route: its page/route file plus the layouts above a page."""
+    roots = [route.file]
+    if route.kind == 'page':
+        directory = os.path.dirname(route.file)
+        while True:
+            for name in LAYOUT_FILES:
+                for ext in SOURCE_EXTENSIONS:
+                    candidate = os.path.join(directory, name + ext)
+                    if os.path.isfile(candidate):
+                        roots.append(candidate)
+            if os.path.abspath(directory) == os.path.abspath(APP_DIR):
+                break
+            directory = os.path.dirname(directory)
+    return roots
+
+
+def _string_value(node):
+    """Literal text of a str constant or f-string; interpolations become placeholders."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for i, value in enumerate(node.values):
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            elif i > 0:
+                parts.append('x')   # {coach_id} in /api/coaches/{coach_id}; a leading {BASE_URL} is dropped
+        return ''.join(parts)
+    return None
+
+
+def _url_path(text):
+    if text.startswith(('http://localhost', 'http://127.0.0.1')):
+        return urlparse(text).path or '/'
+    if text.startswith('/') and not text.startswith('//'):
+        return text.split('?', 1)[0]
+    return None
+
+
+def static_paths(module_path):
+    """Return {test function name: sorted URL paths named in its source}."""
+    with open(module_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=module_path)
+    found = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name.startswith('test_'):
+            paths = set()
+            for child in ast.walk(node):
+                text = _string_value(child)
+                path = _url_path(text) if text else None
+                if path:
+                    paths.add(path)
+            found[node.name] = sorted(paths)
+    return found
+
+
+def build_static_map(modules=SUITE_MODULES):
+    tests = {}
+    for module in modules:
+        for name, paths in static_paths(os.path.join(TESTING_DIR, module)).items():
+            tests[f'{module}::{name}'] = {'recorded': [], 'static': paths}
+    return {'tests': tests}
+
+
+def merge_recorded(impact_map, recorded):
+    """Fold {node id: [URL paths]} from a --record-impact run into the map."""
+    for nodeid, paths in recorded.items():
+        entry = impact_map['tests'].setdefault(nodeid, {'recorded': [], 'static': []})
+        entry['recorded'] = sorted({_url_path(p) or p for p in paths})
+    return impact_map
+
+
+def load_map(path=DEFAULT_MAP):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_map(impact_map, path=DEFAULT_MAP):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(impact_map, f, indent=2, sort_keys=True)
+
+
+def resolve_map(impact_map, routes=None, graph=None):
+    """Return {node id: {'routes': [...], 'files': set of repo-relative paths}}."""
+    routes = routes if routes is not None else discover_routes()
+    graph = graph or SourceGraph()
+    closure_by_route = {}
+    resolved = {}
+    for nodeid, entry in impact_map['tests'].items():
+        matched = {}
+        for path in set(entry.get('recorded', [])) | set(entry.get('static', [])):
+            if path.startswith('/_next/'):
+                continue
+            route = match_route(path, routes)
+            if route:
+                matched[(route.pattern, route.kind)] = route
+        files = set()
+        for key, route in matched.items():
+            if key not in closure_by_route:
+                closure_by_route[key] = {_rel(p) for p in graph.closure(route_roots(route))}
+            files |= closure_by_route[key]
+        resolved[nodeid] = {'routes': sorted(f'{kind} {pattern}' for pattern, kind in matched), 'files': files}
+    return resolved
+
+
+def harness_files(roots=('conftest.py',) + SUITE_MODULES):
+    """
+    Repo-relative paths of the Python modules the suites load (the suite modules
+    themselves excluded), following imports from conftest.py and the suite
+    modules into webapp-testing/ and scripts/.
+    """
+    search = (TESTING_DIR, os.path.join(TESTING_DIR, 'scripts'))
+    pending = [os.path.join(TESTING_DIR, root) for root in roots]
+    seen = set()
+    while pending:
+        path = pending.pop()
+        if path in seen or not os.path.isfile(path):
+            continue
+        seen.add(path)
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                for directory in search:
+                    candidate = os.path.join(directory, name.split('.')[0] + '.py')
+                    if os.path.isfile(candidate):
+                        pending.append(candidate)
+    # A changed suite module selects its own tests, not everything
+    seen -= {os.path.join(TESTING_DIR, module) for module in SUITE_MODULES}
+    return {os.path.relpath(path, REPO_ROOT).replace(os.sep, '/') for path in seen}
+
+
+def changed_files(base, cwd=REPO_ROOT):
+    """Files changed since the merge base with `base`, plus uncommitted and untracked ones."""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.split('\n')
+
+    files = set(git('diff', '--name-only', f'{base}...HEAD'))
+    files |= set(git('diff', '--name-only', 'HEAD'))
+    files |= set(git('ls-files', '--others', '--exclude-standard'))
+    return sorted(f for f in files if f)
+
+
+def current_branch(cwd=REPO_ROOT):
+    result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=cwd, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def select(resolved, changed):
+    """
+    Pick the tests affected by a list of changed repo-relative files.
+
+    Returns:
+        (node ids or None for "run everything", {node id: [reasons]}, [changed src files no test covers])
+    """
+    reasons = {}
+    uncovered = []
+    harness = harness_files()
+    for path in changed:
+        if path in harness or any(fnmatch.fnmatch(path, pattern) for pattern in GLOBAL_PATTERNS):
+            return None, {'*': [path]}, []
+        if path.startswith('webapp-testing/'):
+            module = path[len('webapp-testing/'):]
+            for nodeid in resolved:
+                if nodeid.split('::', 1)[0] == module:
+                    reasons.setdefault(nodeid, []).append(path)
+            continue
+        if not path.startswith('src/'):
+            continue
+        hit = False
+        for nodeid, entry in resolved.items():
+            if path in entry['files']:
+                reasons.setdefault(nodeid, []).append(path)
+                hit = True
+        if not hit:
+            uncovered.append(path)
+    selected = [nodeid for nodeid in resolved if nodeid in reasons]
+    return selected, reasons, uncovered
+
+
+def plan(base, map_path=DEFAULT_MAP, run_all=False):
+    """Decide what to run; returns (node ids or None for everything, reasons, uncovered, note)."""
+    if run_all:
+        return None, {}, [], 'forced with --all'
+    branch = current_branch()
+    if branch in MAIN_BRANCHES:
+        return None, {}, [], f'on {branch}'
+    impact_map = load_map(map_path) or build_static_map()
+    try:
+        changed = changed_files(base)
+    except (subprocess.CalledProcessError, OSError):
+        # A shallow or fork checkout may not have the base ref; selecting nothing would pass CI blindly
+        return None, {}, [], f'cannot diff against {base}'
+    selected, reasons, uncovered = select(resolve_map(impact_map), changed)
+    note = f"{len(changed)} changed file(s) since {base}"
+    return selected, reasons, uncovered, note
+
+
+def show(map_path):
+    impact_map = load_map(map_path)
+    source = map_path
+    if impact_map is None:
+        impact_map, source = build_static_map(), 'static scan (no recorded map)'
+    print(f"Impact map: {source}\n")
+    for nodeid, entry in sorted(resolve_map(impact_map).items()):
+        print(f"{nodeid}")
+        print(f"    routes: {', '.join(entry['routes']) or '-'}")
+        print(f"    files:  {len(entry['files'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Select the suite tests affected by a git diff')
+    parser.add_argument('action', choices=['build', 'show', 'select', 'run'])
+    parser.add_argument('--map', default=DEFAULT_MAP, help=f'Impact map JSON (default: {DEFAULT_MAP})')
+    parser.add_argument('--base', default='origin/main', help='Diff against this ref (default: origin/main)')
+    parser.add_argument('--all', action='store_true', help='Select everything')
+    parser.add_argument('pytest_args', nargs='*', help='Extra pytest arguments for run (after --)')
+    args = parser.parse_args()
+
+    if args.action == 'build':
+        impact_map = build_static_map()
+        previous = load_map(args.map)
+        if previous:
+            merge_recorded(impact_map, {k: v.get('recorded', []) for k, v in previous['tests'].items()})
+        save_map(impact_map, args.map)
+        print(f"📄 {len(impact_map['tests'])} test(s) mapped to: {args.map}")
+        return
+    if args.action == 'show':
+        show(args.map)
+        return
+
+    selected, reasons, uncovered, note = plan(args.base, args.map, args.all)
+    if args.action == 'select':
+        for nodeid in SUITE_MODULES if selected is None else selected:
+            print(nodeid)
+        return
+
+    print(f"Impact: {note}", file=sys.stderr)
+    if selected is None:
+        trigger = reasons.get('*')
+        print(f"Running everything{f' ({trigger[0]} changed)' if trigger else ''}", file=sys.stderr)
+        targets = list(SUITE_MODULES)
+    else:
+        for nodeid in selected:
+            print(f"  {nodeid} <- {', '.join(reasons[nodeid][:3])}", file=sys.stderr)
+        for path in uncovered:
+            print(f"  ⚠️  {path} is not covered by any mapped test", file=sys.stderr)
+        if not selected:
+            print("✅ No affected tests", file=sys.stderr)
+            return
+        targets = selected
+    sys.exit(subprocess.call([sys.executable, '-m', 'pytest', *targets, *args.pytest_args], cwd=TESTING_DIR))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Probabilistic user-journey model: a Markov chain over the API routes.
+
+A model file (YAML or JSON, see journeys/fitconnect.yaml) has two sections.
+
+`steps` are the chain's states, one request each:
+    coach:
+      request: GET /api/coaches/{coach_id}      # METHOD path; {name} reads session state
+      body: {coachId: '{coach_id}'}             # JSON body, placeholders filled the same way
+      save: {package_id: 'packages[*].id'}      # response paths stored in session state
+      think: [5, 20]                            # seconds the user spends before the next step
+      expect: [201, 409]                        # statuses that count as success (default: any 2xx)
+      cleanup: {request: POST /api/bookings/{booking_id}/cancel}   # run after the journey
+      leaves_data: true                         # writes the API cannot undo (no cleanup possible)
+
+`roles` are the user types and their transition probabilities:
+    client:
+      weight: 3                 # share of journeys (overridable with --mix)
+      accounts: clients         # clients | coaches | none; sets {account} and {password}
+      start: {login: 1}
+      transitions:
+        login: {browse: 0.7, bookings: 0.3}
+        browse: {coach: 0.6, exit: 0.4}     # `exit` ends the journey
+
+Save paths are dotted keys; `[*]` picks a random list element and `[0]` a
+fixed one. {future_slot} is a fresh on-the-hour ISO time 1-8 weeks ahead.
+validate() checks the chain is well-formed and that every request path is a
+route under src/app/api.
+
+Usage:
+    from journey_model import load_model, validate, Journey
+    model = load_model('journeys/fitconnect.yaml')
+    problems = validate(model)
+    journey = Journey(model, 'client', random.Random(1), account='alex@example.com')
+    for step in journey: ...
+
+    python scripts/journey_model.py journeys/fitconnect.yaml   # validate and print the chain
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+
+import yaml
+
+from app_routes import discover_routes
+from http_load import DEMO_PASSWORD, SEEDED_CLIENTS, SEEDED_COACHES
+
+EXIT = 'exit'
+ACCOUNTS = {'clients': SEEDED_CLIENTS, 'coaches': SEEDED_COACHES, 'none': []}
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+MAX_STEPS = 50
+
+
+class MissingState(Exception):
+    """A step referenced session state no earlier step saved."""
+
+
+def load_model(path):
+    with open(path) as f:
+        model = json.load(f) if path.endswith('.json') else yaml.safe_load(f)
+    for name, step in model.get('steps', {}).items():
+        if isinstance(step, str):
+            model['steps'][name] = step = {'request': step}
+        step['method'], _, step['path'] = step['request'].partition(' ')
+    return model
+
+
+def validate(model, routes=None):
+    """
+    Returns:
+        List of problem strings (empty when the model is usable)
+    """
+    problems = []
+    steps = model.get('steps', {})
+    routes = [r for r in (routes if routes is not None else discover_routes()) if r.kind == 'api']
+    for name, step in steps.items():
+        concrete = PLACEHOLDER.sub('x', step['path']).split('?')[0]
+        if not any(r.regex.match(concrete) for r in routes):
+            problems.append(f"step {name}: {step['path']} is not a route under src/app/api")
+    for role, spec in model.get('roles', {}).items():
+        if spec.get('accounts', 'none') not in ACCOUNTS:
+            problems.append(f"role {role}: unknown accounts {spec['accounts']!r}")
+        chains = {'start': spec.get('start', {}), **spec.get('transitions', {})}
+        for source, targets in chains.items():
+            if source != 'start' and source not in steps:
+                problems.append(f"role {role}: transitions from unknown step {source}")
+            total = sum(targets.values())
+            if abs(total - 1) > 0.01:
+                problems.append(f"role {role}: probabilities from {source} sum to {total:.2f}")
+            for target in targets:
+                if target != EXIT and target not in steps:
+                    problems.append(f"role {role}: {source} -> unknown step {target}")
+                elif target != EXIT and target not in chains:
+                    problems.append(f"role {role}: step {target} is reachable but has no transitions")
+    return problems
+
+
+def leaves_data(model):
+    """Names of steps whose writes stay in the database after the run."""
+    return sorted(name for name, step in model.get('steps', {}).items() if step.get('leaves_data'))
+
+
+def extract(data, path, rng):
+    """Follow a dotted save path ('data[*].id') through a JSON value; None if it does not resolve."""
+    for part in path.split('.'):
+        match = re.match(r'^(\w*)(?:\[(\*|\d+)\])?$', part)
+        if not match:
+            return None
+        key, index = match.groups()
+        if key:
+            data = data.get(key) if isinstance(data, dict) else None
+        if index is not None:
+            if not isinstance(data, list) or not data:
+                return None
+            data = rng.choice(data) if index == '*' else (data[int(index)] if int(index) < len(data) else None)
+        if data is None:
+            return None
+    return data
+
+
+def future_slot(rng):
+    start = datetime.datetime.now(datetime.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    slot = start + datetime.timedelta(days=rng.randint(7, 56), hours=rng.randint(0, 23))
+    return slot.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class Journey:
+    """
+    One walk through a role's chain with its own session state.
+
+    Iterating yields (step name, step dict) until the walk reaches `exit`;
+    call fill() to render the step's request and record() with its response.
+    """
+
+    def __init__(self, model, role, rng, account=None):
+        self.model = model
+        self.role = role
+        self.spec = model['roles'][role]
+        self.rng = rng
+        self.state = {'account': account, 'password': DEMO_PASSWORD} if account else {}
+        self.path = []
+        self.cleanups = []
+
+    def _next(self, source):
+        targets = self.spec['start'] if source is None else self.spec['transitions'][source]
+        names = list(targets)
+        return self.rng.choices(names, [targets[n] for n in names])[0]
+
+    def __iter__(self):
+        current = self._next(None)
+        while current != EXIT and len(self.path) < MAX_STEPS:
+            self.path.append(current)
+            yield current, self.model['steps'][current]
+            current = self._next(current)
+
+    def _render(self, value):
+        if isinstance(value, dict):
+            return {k: self._render(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._render(v) for v in value]
+        if not isinstance(value, str):
+            return value
+
+        def substitute(match):
+            name = match.group(1)
+            if name == 'future_slot':
+                return future_slot(self.rng)
+            if self.state.get(name) is None:
+                raise MissingState(name)
+            return str(self.state[name])
+
+        return PLACEHOLDER.sub(substitute, value)
+
+    def fill(self, step):
+        """(method, path, body) with session state substituted; raises MissingState."""
+        return step['method'], self._render(step['path']), self._render(step.get('body'))
+
+    def record(self, step, data):
+        """Save response values into the session and queue the step's cleanup."""
+        saved = True
+        for name, path in (step.get('save') or {}).items():
+            value = extract(data, path, self.rng)
+            if value is None:
+                saved = False
+            else:
+                self.state[name] = value
+        cleanup = step.get('cleanup')
+        # Only clean up what this response created, not a value left by an earlier step
+        if cleanup and saved:
+            try:
+                method, _, path = cleanup['request'].partition(' ')
+                self.cleanups.append((method, self._render(path), self._render(cleanup.get('body'))))
+            except MissingState:
+                pass
+
+    def accepted(self, step, status):
+        expected = step.get('expect')
+        return status in expected if expected else 200 <= status < 300
+
+    def think(self, step, scale=1.0):
+        low, high = step.get('think', [0, 0])
+        return self.rng.uniform(low, high) * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate a journey model and print its chain')
+    parser.add_argument('model', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'journeys',
+                                                                 'fitconnect.yaml'))
+    args = parser.parse_args()
+    model = load_model(args.model)
+    for role, spec in model['roles'].items():
+        print(f"{role} (weight {spec.get('weight', 1)}, accounts {spec.get('accounts', 'none')})")
+        for source, targets in {'start': spec['start'], **spec.get('transitions', {})}.items():
+            print(f"  {source:<16} -> " + ", ".join(f"{t} {p:.0%}" for t, p in targets.items()))
+    problems = validate(model)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ {len(model['steps'])} steps, {len(model['roles'])} roles, every request maps to an API route")
+
+
+if __name__ == '__main__':
+    main()
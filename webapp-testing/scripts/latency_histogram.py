@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Mergeable log-linear latency histogram (HDR-style), standard library only.
+
+Values are recorded in microseconds into buckets whose width grows with the
+value: above 2**SUB_BUCKET_BITS microseconds, every power-of-two range is
+split into 2**(SUB_BUCKET_BITS - 1) equal buckets. With the default 7 bits a
+bucket is at most 1/64th of its value wide, so percentiles stay within about
+1% however many samples are recorded. Count, sum, min and max are kept exactly.
+
+Histograms from different threads or processes merge by adding bucket
+counts, so aggregated percentiles are exact to bucket precision. That is not
+true of averaging per-worker percentiles. to_dict()/from_dict() give a
+compact JSON-safe form for shipping them between processes.
+
+Usage:
+    from latency_histogram import LatencyHistogram
+    hist = LatencyHistogram()
+    hist.record(0.0123)               # seconds
+    total = LatencyHistogram.from_dict(worker_dict).merge(hist)
+    print(total.summary())            # same keys as http_load.LatencyStats.summary()
+"""
+
+SUB_BUCKET_BITS = 7
+
+
+class LatencyHistogram:
+    """Sparse log-linear histogram of latencies in microseconds."""
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = None
+
+    def _bucket(self, value_us):
+        shift = max(0, value_us.bit_length() - self.sub_bucket_bits)
+        return (value_us >> shift) << shift
+
+    def _midpoint(self, bucket):
+        shift = max(0, bucket.bit_length() - self.sub_bucket_bits)
+        return bucket + ((1 << shift) - 1) / 2
+
+    def record(self, seconds, count=1):
+        value = max(0, int(seconds * 1_000_000))
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += count
+        self.total_us += value * count
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = value if self.max_us is None else max(self.max_us, value)
+
+    def merge(self, other):
+        """Add another histogram's counts into this one; returns self."""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError('cannot merge histograms with different precision')
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+            self.max_us = other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+        return self
+
+    def percentile_us(self, pct):
+        """Nearest-rank percentile, reported as the middle of its bucket (clamped to min/max)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-pct * self.count // 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(max(self._midpoint(bucket), self.min_us), self.max_us)
+        return float(self.max_us)
+
+    def summary(self):
+        """
+        Returns:
+            Dict with count, mean/p50/p90/p95/p99/p999/max in milliseconds
+        """
+        def ms(us):
+            return round(us / 1000, 2)
+
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total_us / self.count) if self.count else 0.0,
+            'p50_ms': ms(self.percentile_us(50)),
+            'p90_ms': ms(self.percentile_us(90)),
+            'p95_ms': ms(self.percentile_us(95)),
+            'p99_ms': ms(self.percentile_us(99)),
+            'p999_ms': ms(self.percentile_us(99.9)),
+            'max_ms': ms(self.max_us or 0),
+        }
+
+    def to_dict(self):
+        return {'bits': self.sub_bucket_bits, 'count': self.count, 'total_us': self.total_us,
+                'min_us': self.min_us, 'max_us': self.max_us,
+                'buckets': [[bucket, count] for bucket, count in sorted(self.counts.items())]}
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data.get('bits', SUB_BUCKET_BITS))
+        hist.counts = {bucket: count for bucket, count in data['buckets']}
+        hist.count = data['count']
+        hist.total_us = data['total_us']
+        hist.min_us = data['min_us']
+        hist.max_us = data['max_us']
+        return hist
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Per-navigation network accounting and API anti-pattern detection.
+
+NetworkRecorder attaches a Chromium CDP session to a page and records every
+request: URL, method, resource type, start/end timing, transferred and
+decoded size, initiator (parser, script URL, preflight...) and cache status
+(memory/disk/service worker/304). Requests are grouped by top-level document
+load, so each page.goto() (or full reload) is its own navigation.
+
+audit_requests() then flags, per navigation, among fetch/XHR calls to /api/*:
+- duplicate:  the same API call (method + URL) issued more than once
+- n_plus_one: many calls to one endpoint template differing only by ids
+- waterfall:  a chain of API calls each starting after the previous ended
+- oversized:  JSON responses above the size budget
+- api_calls:  more API calls than the budget
+
+Thresholds fail CI via the exit code or test_fitconnect.py --network-audit.
+
+Usage:
+    python scripts/network_audit.py                         # default pages
+    python scripts/network_audit.py / /coaches client:/dashboard/client coach:/dashboard/coach
+    python scripts/network_audit.py /coaches --max-json-kb 128 --max-waterfall 2 --max-duplicates 0
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict, namedtuple
+from urllib.parse import urlparse
+
+BASE_URL = 'http://localhost:3000'
+RESULTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'screenshots'))
+DEFAULT_PAGES = ['/', '/coaches', 'client:/dashboard/client', 'client:/messages',
+                 'coach:/dashboard/coach', 'coach:/dashboard/coach/bookings']
+ROLE_ACCOUNTS = {'client': 'alex@example.com', 'coach': 'sarah@example.com'}
+DEMO_PASSWORD = 'password123'
+
+Thresholds = namedtuple('Thresholds', ['max_duplicates', 'n_plus_one', 'max_waterfall', 'max_json_kb', 'max_api_calls'])
+DEFAULT_THRESHOLDS = Thresholds(max_duplicates=0, n_plus_one=5, max_waterfall=3, max_json_kb=256, max_api_calls=None)
+
+Finding = namedtuple('Finding', ['kind', 'detail', 'value', 'limit'])
+
+API_TYPES = ('Fetch', 'XHR')
+API_PREFIX = '/api/'
+# Path segments that look like record ids: cuid/uuid/hex/numeric
+_ID_SEGMENT = re.compile(r'^(?:\d+|[0-9a-f]{8,}(?:-[0-9a-f]{4,})*|c[a-z0-9]{20,})$', re.IGNORECASE)
+
+
+def is_api_call(request):
+    """
+    A fetch/XHR to a route under /api/.
+
+    Next's <Link> prefetches (/coaches/<id>?_rsc=...) are fetches too, one per
+    visible link. They are page payloads, not API calls, and a list of links
+    would otherwise look like an N+1.
+    """
+    return request.type in API_TYPES and urlparse(request.url).path.startswith(API_PREFIX)
+
+
+def endpoint_template(url):
+    """'/api/coaches/ck9x...?page=2' -> '/api/coaches/{id}' (query dropped)"""
+    path = urlparse(url).path
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class _Request:
+    __slots__ = ('id', 'url', 'method', 'type', 'initiator', 'start', 'end', 'status', 'mime',
+                 'encoded_bytes', 'decoded_bytes', 'cache', 'failed')
+
+    def __init__(self, request_id, url, method, resource_type, initiator, start):
+        self.id = request_id
+        self.url = url
+        self.method = method
+        self.type = resource_type
+        self.initiator = initiator
+        self.start = start
+        self.end = None
+        self.status = None
+        self.mime = None
+        self.encoded_bytes = 0
+        self.decoded_bytes = 0
+        self.cache = None
+        self.failed = None
+
+    def as_dict(self, origin):
+        return {
+            'url': self.url, 'method': self.method, 'type': self.type, 'status': self.status,
+            'initiator': self.initiator, 'cache': self.cache, 'failed': self.failed, 'mime': self.mime,
+            'start_ms': round((self.start - origin) * 1000, 1),
+            'duration_ms': round((self.end - self.start) * 1000, 1) if self.end else None,
+            'transferred_bytes': self.encoded_bytes, 'decoded_bytes': self.decoded_bytes,
+        }
+
+
+def _describe_initiator(initiator):
+    kind = initiator.get('type', 'other')
+    if initiator.get('url'):
+        return f"{kind}: {initiator['url']}"
+    frames = (initiator.get('stack') or {}).get('callFrames') or []
+    if frames:
+        frame = frames[0]
+        return f"{kind}: {frame.get('functionName') or '(anonymous)'} @ {frame.get('url')}:{frame.get('lineNumber')}"
+    return kind
+
+
+class NetworkRecorder:
+    """
+    Record a page's requests through CDP, grouped by top-level navigation (Chromium only).
+
+    Args:
+        page: Playwright sync Page
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.navigations = []
+        self._by_id = {}
+        self._session = page.context.new_cdp_session(page)
+        self._main_frame = self._session.send('Page.getFrameTree')['frameTree']['frame']['id']
+        self._session.on('Network.requestWillBeSent', self._on_request)
+        self._session.on('Network.responseReceived', self._on_response)
+        self._session.on('Network.dataReceived', self._on_data)
+        self._session.on('Network.requestServedFromCache', self._on_cached)
+        self._session.on('Network.loadingFinished', self._on_finished)
+        self._session.on('Network.loadingFailed', self._on_failed)
+        self._session.send('Network.enable')
+
+    def mark(self, label):
+        """Start a new navigation bucket by hand (e.g. before a client-side route change)."""
+        self.navigations.append({'label': label, 'started': time.monotonic(), 'origin': None, 'requests': []})
+
+    def _current(self):
+        if not self.navigations:
+            self.mark(self.page.url)
+        return self.navigations[-1]
+
+    def _on_request(self, event):
+        request = event['request']
+        if (event.get('type') == 'Document' and event.get('frameId') == self._main_frame
+                and not event.get('redirectResponse')):
+            self.mark(request['url'])
+        navigation = self._current()
+        if navigation['origin'] is None:
+            navigation['origin'] = event['timestamp']
+        if event['requestId'] in self._by_id and event.get('redirectResponse'):
+            # Redirect hop: finish the previous record and start a new one under the same id
+            self._by_id[event['requestId']].status = event['redirectResponse'].get('status')
+            self._by_id[event['requestId']].end = event['timestamp']
+        record = _Request(event['requestId'], request['url'], request['method'], event.get('type', 'Other'),
+                          _describe_initiator(event.get('initiator') or {}), event['timestamp'])
+        self._by_id[event['requestId']] = record
+        navigation['requests'].append(record)
+
+    def _on_response(self, event):
+        record = self._by_id.get(event['requestId'])
+        if record is None:
+            return
+        response = event['response']
+        record.status = response.get('status')
+        record.mime = response.get('mimeType')
+        if response.get('fromServiceWorker'):
+            record.cache = 'service-worker'
+        elif response.get('fromDiskCache'):
+            record.cache = 'disk'
+        elif response.get('fromPrefetchCache'):
+            record.cache = 'prefetch'
+        elif record.status == 304:
+            record.cache = 'revalidated'
+
+    def _on_data(self, event):
+        record = self._by_id.get(event['requestId'])
+        if record is not None:
+            record.decoded_bytes += event.get('dataLength', 0)
+
+    def _on_cached(self, event):
+        record = self._by_id.get(event['requestId'])
+        if record is not None:
+            record.cache = 'memory'
+
+    def _on_finished(self, event):
+        record = self._by_id.get(event['requestId'])
+        if record is not None:
+            record.end = event['timestamp']
+            record.encoded_bytes = int(event.get('encodedDataLength', 0))
+
+    def _on_failed(self, event):
+        record = self._by_id.get(event['requestId'])
+        if record is not None:
+            record.end = event['timestamp']
+            record.failed = event.get('errorText') or 'failed'
+
+    def detach(self):
+        try:
+            self._session.detach()
+        except Exception:
+            pass
+
+    def summaries(self, thresholds=DEFAULT_THRESHOLDS):
+        """Per-navigation summary dicts with findings (see audit_requests)."""
+        results = []
+        for navigation in self.navigations:
+            if not navigation['requests']:
+                continue
+            origin = navigation['origin'] or 0
+            requests = navigation['requests']
+            api = [r for r in requests if is_api_call(r)]
+            results.append({
+                'navigation': navigation['label'],
+                'requests': len(requests),
+                'api_calls': len(api),
+                'transferred_bytes': sum(r.encoded_bytes for r in requests),
+                'cached': sum(1 for r in requests if r.cache),
+                'failed': sum(1 for r in requests if r.failed),
+                'findings': [f._asdict() for f in audit_requests(requests, thresholds)],
+                'api': [r.as_dict(origin) for r in api],
+            })
+        return results
+
+
+def waterfall_chain(api_requests, slack=0.005):
+    """Longest chain of calls where each starts after the previous one finished."""
+    done = sorted((r for r in api_requests if r.end), key=lambda r: r.start)
+    best = {}
+    for i, request in enumerate(done):
+        previous = [best[j.id] for j in done[:i] if j.end <= request.start + slack and j.id in best]
+        longest = max(previous, key=len, default=[])
+        best[request.id] = longest + [request]
+    return max(best.values(), key=len, default=[])
+
+
+def audit_requests(requests, thresholds=DEFAULT_THRESHOLDS):
+    """Return Finding tuples for one navigation's requests."""
+    findings = []
+    api = [r for r in requests if is_api_call(r)]
+
+    calls = defaultdict(int)
+    for r in api:
+        calls[(r.method, r.url)] += 1
+    for (method, url), count in sorted(calls.items()):
+        if count - 1 > thresholds.max_duplicates:
+            findings.append(Finding('duplicate', f"{method} {urlparse(url).path} x{count}", count - 1,
+                                    thresholds.max_duplicates))
+
+    templates = defaultdict(set)
+    for r in api:
+        templates[(r.method, endpoint_template(r.url))].add(r.url)
+    for (method, template), urls in sorted(templates.items()):
+        if '{id}' in template and len(urls) >= thresholds.n_plus_one:
+            findings.append(Finding('n_plus_one', f"{method} {template} called for {len(urls)} ids", len(urls),
+                                    thresholds.n_plus_one))
+
+    chain = waterfall_chain(api)
+    if len(chain) > thresholds.max_waterfall:
+        steps = ' -> '.join(urlparse(r.url).path for r in chain)
+        span = round((chain[-1].end - chain[0].start) * 1000)
+        findings.append(Finding('waterfall', f"{len(chain)} serial calls over {span}ms: {steps}", len(chain),
+                                thresholds.max_waterfall))
+
+    limit = thresholds.max_json_kb * 1024 if thresholds.max_json_kb else None
+    for r in requests:
+        if limit and r.mime and 'json' in r.mime and r.decoded_bytes > limit:
+            findings.append(Finding('oversized', f"{urlparse(r.url).path} {r.decoded_bytes / 1024:.0f}KB JSON",
+                                    round(r.decoded_bytes / 1024), thresholds.max_json_kb))
+
+    if thresholds.max_api_calls is not None and len(api) > thresholds.max_api_calls:
+        findings.append(Finding('api_calls', f"{len(api)} API calls", len(api), thresholds.max_api_calls))
+    return findings
+
+
+def print_summaries(summaries):
+    for s in summaries:
+        mark = '❌' if s['findings'] else '✅'
+        print(f"{mark} {s['navigation']}: {s['requests']} requests, {s['api_calls']} API, "
+              f"{s['transferred_bytes'] / 1024:.0f}KB, {s['cached']} cached, {s['failed']} failed")
+        for finding in s['findings']:
+            print(f"    {finding['kind']}: {finding['detail']} (limit {finding['limit']})")
+
+
+def main():
+    from playwright.sync_api import sync_playwright
+    from browser_server import launch_browser
+
+    parser = argparse.ArgumentParser(description='Per-page network accounting and API anti-pattern audit')
+    parser.add_argument('pages', nargs='*', help='Paths, optionally role-prefixed (client:/dashboard/client)')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--max-duplicates', type=int, default=DEFAULT_THRESHOLDS.max_duplicates,
+                        help='Allowed repeats of an identical API call (default: 0)')
+    parser.add_argument('--n-plus-one', type=int, default=DEFAULT_THRESHOLDS.n_plus_one,
+                        help='Distinct ids on one endpoint that count as N+1 (default: 5)')
+    parser.add_argument('--max-waterfall', type=int, default=DEFAULT_THRESHOLDS.max_waterfall,
+                        help='Longest allowed chain of serial API calls (default: 3)')
+    parser.add_argument('--max-json-kb', type=int, default=DEFAULT_THRESHOLDS.max_json_kb,
+                        help='Largest allowed JSON response (default: 256)')
+    parser.add_argument('--max-api-calls', type=int, help='Most API calls allowed per page')
+    args = parser.parse_args()
+    thresholds = Thresholds(args.max_duplicates, args.n_plus_one, args.max_waterfall, args.max_json_kb,
+                            args.max_api_calls)
+
+    results = []
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        contexts = {}
+        for spec in args.pages or DEFAULT_PAGES:
+            role, sep, path = spec.partition(':')
+            if not (sep and role in ROLE_ACCOUNTS):
+                role, path = None, spec
+            if role not in contexts:
+                contexts[role] = browser.new_context()
+                if role:
+                    contexts[role].request.post(f"{args.base_url}/api/auth/login",
+                                                data={'email': ROLE_ACCOUNTS[role], 'password': DEMO_PASSWORD})
+            page = contexts[role].new_page()
+            recorder = NetworkRecorder(page)
+            page.goto(f"{args.base_url}{path}")
+            page.wait_for_load_state('networkidle')
+            for summary in recorder.summaries(thresholds):
+                summary['page'] = spec
+                results.append(summary)
+            recorder.detach()
+            page.close()
+        browser.close()
+
+    print_summaries(results)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = os.path.join(RESULTS_DIR, 'network_audit.json')
+    with open(results_file, 'w') as f:
+        json.dump({'thresholds': thresholds._asdict(), 'pages': results}, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    sys.exit(1 if any(s['findings'] for s in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Read V8 heap usage from Node processes started with --inspect.
+
+Talks to the inspector's HTTP discovery endpoint (/json/list) and sends
+Runtime.getHeapUsage over its websocket, standard library only. `next dev`
+and `next start` may run more than one inspectable process (Next moves the
+server to the next port), so heap_usage() sums every target it finds.
+
+Start the server with the inspector enabled:
+    NODE_OPTIONS=--inspect npm run dev
+
+Usage:
+    python scripts/node_inspector.py                 # scans ports 9229-9231
+    python scripts/node_inspector.py --ports 9229,9230
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import socket
+import struct
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = (9229, 9230, 9231)
+
+
+def list_targets(port, host='127.0.0.1', timeout=2):
+    """Inspector targets on one port ([] if nothing is listening)."""
+    try:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.request('GET', '/json/list')
+        targets = json.loads(conn.getresponse().read())
+        conn.close()
+        return [t for t in targets if t.get('webSocketDebuggerUrl')]
+    except (OSError, ValueError, http.client.HTTPException):
+        return []
+
+
+class _WebSocket:
+    """Just enough of a websocket client for request/response inspector calls."""
+
+    def __init__(self, url, timeout=5):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall(
+            f"GET {parts.path} HTTP/1.1\r\nHost: {parts.hostname}:{parts.port}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        self.file = self.sock.makefile('rb')
+        status = self.file.readline()
+        if b' 101 ' not in status:
+            raise ConnectionError(f"websocket upgrade refused: {status.strip().decode(errors='replace')}")
+        while self.file.readline() not in (b'\r\n', b''):
+            pass
+
+    def send(self, text):
+        data = text.encode()
+        mask = os.urandom(4)
+        length = len(data)
+        if length < 126:
+            header = struct.pack('!BB', 0x81, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x81, 0x80 | 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x81, 0x80 | 127, length)
+        self.sock.sendall(header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(data)))
+
+    def recv(self):
+        fragments = []
+        while True:
+            head = self.file.read(2)
+            if len(head) < 2:
+                raise ConnectionError('inspector closed the connection')
+            fin, opcode, length = head[0] & 0x80, head[0] & 0x0F, head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self.file.read(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self.file.read(8))[0]
+            data = self.file.read(length)
+            if opcode == 0x8:
+                raise ConnectionError('inspector closed the connection')
+            if opcode in (0x0, 0x1):
+                fragments.append(data)
+                if fin:
+                    return b''.join(fragments).decode()
+
+    def call(self, method, params=None, call_id=1):
+        self.send(json.dumps({'id': call_id, 'method': method, 'params': params or {}}))
+        while True:
+            message = json.loads(self.recv())
+            if message.get('id') == call_id:
+                if 'error' in message:
+                    raise RuntimeError(message['error'].get('message', 'inspector error'))
+                return message.get('result', {})
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def heap_usage(ports=DEFAULT_PORTS, host='127.0.0.1'):
+    """
+    Sum Runtime.getHeapUsage over every inspector target on the given ports.
+
+    Returns:
+        Dict with used_mb, total_mb and targets, or None if no inspector answered
+    """
+    used = total = 0
+    targets = 0
+    for port in ports:
+        for target in list_targets(port, host):
+            try:
+                ws = _WebSocket(target['webSocketDebuggerUrl'])
+            except (OSError, ConnectionError):
+                continue
+            try:
+                result = ws.call('Runtime.getHeapUsage')
+                used += result.get('usedSize', 0)
+                total += result.get('totalSize', 0)
+                targets += 1
+            except (OSError, ConnectionError, RuntimeError, ValueError):
+                continue
+            finally:
+                ws.close()
+    if not targets:
+        return None
+    return {'used_mb': round(used / 2 ** 20, 1), 'total_mb': round(total / 2 ** 20, 1), 'targets': targets}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Print V8 heap usage of Node processes running with --inspect')
+    parser.add_argument('--ports', default=','.join(str(p) for p in DEFAULT_PORTS),
+                        help=f"Comma-separated inspector ports (default: {','.join(str(p) for p in DEFAULT_PORTS)})")
+    parser.add_argument('--host', default='127.0.0.1', help='Inspector host (default: 127.0.0.1)')
+    args = parser.parse_args()
+
+    usage = heap_usage([int(p) for p in args.ports.split(',')], args.host)
+    if usage is None:
+        print("No inspector found - start the server with NODE_OPTIONS=--inspect")
+        raise SystemExit(1)
+    print(f"Heap used {usage['used_mb']}MB of {usage['total_mb']}MB across {usage['targets']} target(s)")
+
+
+if __name__ == '__main__':
+    main()
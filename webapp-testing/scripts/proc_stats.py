@@ -0,0 +1,176 @@
+"""
+Process metrics for the server under test, read from /proc (Linux only).
+
+`next dev` / `next start` serve from a child node process, so metrics are
+summed over the process tree rooted at the pid that owns the listening port.
+
+Usage:
+    from proc_stats import find_listening_pid, CpuMeter
+    pid = find_listening_pid(3000)
+    meter = CpuMeter(pid)
+    ...                          # generate load
+    print(meter.read())          # {'cpu_pct': 187.5, 'rss_mb': 412.3, 'processes': 2}
+
+    sampler = RssSampler(pid).start()
+    ...
+    print(sampler.stop())        # {'baseline_mb': 380.1, 'peak_mb': 655.0, 'final_mb': 402.7, 'peak_growth_mb': 274.9}
+"""
+
+import os
+import threading
+import time
+
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def _listening_inodes(port):
+    inodes = set()
+    for table in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    local, state, inode = fields[1], fields[3], fields[9]
+                    if state == '0A' and int(local.rsplit(':', 1)[1], 16) == port:
+                        inodes.add(inode)
+        except (OSError, StopIteration):
+            continue
+    return inodes
+
+
+def find_listening_pid(port):
+    """Return the pid whose socket listens on `port`, or None if it cannot be found."""
+    targets = {f'socket:[{inode}]' for inode in _listening_inodes(port)}
+    if not targets:
+        return None
+    for pid in _pids():
+        fd_dir = f'/proc/{pid}/fd'
+        try:
+            for fd in os.listdir(fd_dir):
+                if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                    return pid
+        except OSError:
+            continue
+    return None
+
+
+def _pids():
+    try:
+        return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return []
+
+
+def _stat_fields(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        data = f.read()
+    # comm may contain spaces; fields after it are fixed
+    return data[data.rindex(')') + 2:].split()
+
+
+def process_tree(pid):
+    """`pid` and all of its descendants."""
+    children = {}
+    for other in _pids():
+        try:
+            children.setdefault(int(_stat_fields(other)[1]), []).append(other)
+        except (OSError, ValueError, IndexError):
+            continue
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def cpu_seconds(pids):
+    """User + system CPU time consumed so far by the given processes."""
+    total = 0
+    for pid in pids:
+        try:
+            fields = _stat_fields(pid)
+            total += int(fields[11]) + int(fields[12])
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / CLK_TCK
+
+
+def rss_bytes(pids):
+    """Resident set size summed over the given processes."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class CpuMeter:
+    """CPU utilisation of a process tree between consecutive read() calls."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self._pids = process_tree(pid)
+        self._last = (time.perf_counter(), cpu_seconds(self._pids))
+
+    def read(self):
+        """
+        Returns:
+            Dict with cpu_pct (100 = one core busy) since the previous read,
+            rss_mb now, and the number of processes in the tree
+        """
+        self._pids = process_tree(self.pid)
+        now, used = time.perf_counter(), cpu_seconds(self._pids)
+        wall = now - self._last[0]
+        cpu_pct = (used - self._last[1]) / wall * 100 if wall > 0 else 0.0
+        self._last = (now, used)
+        return {'cpu_pct': round(cpu_pct, 1), 'rss_mb': round(rss_bytes(self._pids) / 2 ** 20, 1),
+                'processes': len(self._pids)}
+
+
+class RssSampler:
+    """Samples a process tree's RSS on a background thread to catch short-lived peaks."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self._pids = process_tree(pid)
+        self._stop = threading.Event()
+        self._thread = None
+        self.baseline = self.peak = self.last = 0
+
+    def start(self):
+        self._pids = process_tree(self.pid)
+        self.baseline = self.peak = self.last = rss_bytes(self._pids)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        refresh = 0
+        while not self._stop.wait(self.interval):
+            refresh += 1
+            if refresh % 20 == 0:
+                self._pids = process_tree(self.pid)
+            self.last = rss_bytes(self._pids)
+            self.peak = max(self.peak, self.last)
+
+    def stop(self):
+        """
+        Returns:
+            Dict with baseline, peak and final RSS in MB and the peak growth over baseline
+        """
+        self._stop.set()
+        self._thread.join()
+        self.last = rss_bytes(self._pids)
+        mb = 2 ** 20
+        return {'baseline_mb': round(self.baseline / mb, 1), 'peak_mb': round(self.peak / mb, 1),
+                'final_mb': round(self.last / mb, 1), 'peak_growth_mb': round((self.peak - self.baseline) / mb, 1)}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Capture the SQL a request (or a whole test) runs, using pg_stat_statements.
+
+The statistics are reset before the measured code runs and read back after
+it, so everything the database executed in between is attributed to it. That
+only holds while nothing else uses the database: run against a local server
+with a single client, never under parallel load.
+
+pg_stat_statements has to be preloaded by the server, once:
+    # postgresql.conf
+    shared_preload_libraries = 'pg_stat_statements'
+    # then restart Postgres; ensure() creates the extension in the app database
+
+Statements come back normalized by Postgres (constants become $1, $2, ...),
+so repeated shapes group together: an N+1 shows up as one statement with
+calls growing with the number of rows returned.
+
+Usage:
+    from query_profile import QueryCapture
+    capture = QueryCapture()          # DATABASE_URL from the environment or .env
+    capture.ensure()
+    response, profile = capture.measure(client.get, '/api/coaches')
+    print(profile.count, profile.total_ms, profile.slowest(3))
+
+    python scripts/query_profile.py            # verify the extension is usable
+"""
+
+import argparse
+import json
+import re
+
+from db_snapshot import PsqlError, database_url, psql
+from http_load import linear_slope
+
+SCALING_THRESHOLD = 0.5  # extra queries per extra result row that counts as scaling
+OWN_QUERIES = re.compile(r'pg_stat_statements', re.IGNORECASE)
+
+
+def shorten(query, width=160):
+    """One-line, schema-less form of a statement for reports."""
+    text = re.sub(r'\s+', ' ', query).strip()
+    text = text.replace('"public".', '')
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+class QueryProfile:
+    """Statements captured for one measured call (or several merged)."""
+
+    def __init__(self, statements=None):
+        self.statements = statements or []
+
+    @property
+    def count(self):
+        return sum(s['calls'] for s in self.statements)
+
+    @property
+    def total_ms(self):
+        return round(sum(s['total_ms'] for s in self.statements), 2)
+
+    def slowest(self, n=5):
+        ranked = sorted(self.statements, key=lambda s: -s['total_ms'])[:n]
+        return [{**s, 'query': shorten(s['query'])} for s in ranked]
+
+    def most_called(self, n=5):
+        ranked = sorted(self.statements, key=lambda s: -s['calls'])[:n]
+        return [{**s, 'query': shorten(s['query'])} for s in ranked]
+
+    def merge(self, other):
+        """Add another profile's statements, grouping by normalized text."""
+        by_query = {s['query']: dict(s) for s in self.statements}
+        for s in other.statements:
+            merged = by_query.setdefault(s['query'], {'query': s['query'], 'calls': 0, 'total_ms': 0.0, 'rows': 0})
+            merged['calls'] += s['calls']
+            merged['total_ms'] = round(merged['total_ms'] + s['total_ms'], 3)
+            merged['rows'] += s['rows']
+        self.statements = list(by_query.values())
+        return self
+
+    def summary(self, top=5):
+        return {'queries': self.count, 'db_ms': self.total_ms, 'statements': len(self.statements),
+                'slowest': self.slowest(top)}
+
+
+class QueryCapture:
+    """pg_stat_statements reset/read around measured calls on the app database."""
+
+    def __init__(self, url=None):
+        self.url = url or database_url()
+        self._time_column = None
+
+    def ensure(self):
+        """Create the extension if needed and check it is collecting; raises PsqlError otherwise."""
+        psql(self.url, 'CREATE EXTENSION IF NOT EXISTS pg_stat_statements')
+        try:
+            psql(self.url, 'SELECT 1 FROM pg_stat_statements LIMIT 1')
+        except PsqlError as e:
+            raise PsqlError(f"{e}\nAdd shared_preload_libraries = 'pg_stat_statements' to postgresql.conf "
+                            "and restart Postgres")
+        version = int(psql(self.url, "SELECT current_setting('server_version_num')")[0])
+        # Postgres 13 split total_time into planning and execution time
+        self._time_column = 'total_exec_time' if version >= 130000 else 'total_time'
+
+    def reset(self):
+        psql(self.url, 'SELECT pg_stat_statements_reset()')
+
+    def read(self):
+        """Statements recorded for this database since the last reset."""
+        if self._time_column is None:
+            self.ensure()
+        lines = psql(self.url, f"""
+            SELECT coalesce(json_agg(json_build_object(
+                'query', query, 'calls', calls, 'total_ms', round({self._time_column}::numeric, 3), 'rows', rows)), '[]')
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())""")
+        statements = json.loads('\n'.join(lines)) if lines else []
+        return QueryProfile([{**s, 'total_ms': float(s['total_ms'])} for s in statements
+                             if not OWN_QUERIES.search(s['query'])])
+
+    def measure(self, func, *args, **kwargs):
+        """
+        Run func with the statistics reset first.
+
+        Returns:
+            (func's return value, QueryProfile)
+        """
+        self.reset()
+        result = func(*args, **kwargs)
+        return result, self.read()
+
+
+def scaling(points):
+    """
+    Does the query count grow with the result size?
+
+    Args:
+        points: (result rows, query count) pairs for one endpoint
+
+    Returns:
+        (queries per extra row, flagged)
+    """
+    sizes = {rows for rows, _count in points}
+    if len(sizes) < 2:
+        return None, False
+    slope = linear_slope(points)
+    return round(slope, 2), slope >= SCALING_THRESHOLD
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that pg_stat_statements is usable on the app database')
+    parser.add_argument('--url', help='DATABASE_URL (default: environment or .env)')
+    args = parser.parse_args()
+    try:
+        capture = QueryCapture(args.url)
+        capture.ensure()
+        profile = capture.read()
+    except PsqlError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(f"✅ pg_stat_statements is collecting ({len(profile.statements)} statement(s) since the last reset)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Supabase Realtime broadcast channels.
+
+Speaks enough of the Phoenix channel protocol that supabase-js uses
+(websocket at /realtime/v1/websocket, JSON serializer vsn 1.0.0 and 2.0.0)
+to accept phx_join/heartbeat/broadcast/phx_leave, and also the REST
+fallback (POST /realtime/v1/api/broadcast). Every broadcast is fanned out
+to the other sockets joined on the same topic and its arrival time is
+recorded by payload id, so benchmarks can measure send-to-visible latency
+without a Supabase project.
+
+Point the app at it when starting the server:
+    NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local npm run dev
+
+Usage:
+    python scripts/realtime_standin.py --port 54321
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import socketserver
+import struct
+import threading
+import time
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC11B85'
+DEFAULT_PORT = 54321
+
+
+class RealtimeHub:
+    """Topic membership, fan-out and arrival bookkeeping shared by all sockets."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+        self._topics = {}
+        self.arrivals = {}
+        self.broadcasts = 0
+        self.deliveries = 0
+
+    def join(self, topic, socket):
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(socket)
+
+    def leave(self, topic, socket):
+        with self._lock:
+            members = self._topics.get(topic)
+            if members:
+                members.discard(socket)
+
+    def leave_all(self, socket):
+        with self._lock:
+            for members in self._topics.values():
+                members.discard(socket)
+
+    def broadcast(self, topic, event, payload, sender=None):
+        """Record a broadcast and return the sockets it must be delivered to."""
+        now = time.perf_counter()
+        with self._lock:
+            self.broadcasts += 1
+            message_id = payload.get('id') if isinstance(payload, dict) else None
+            if message_id is not None:
+                self.arrivals.setdefault(message_id, now)
+            receivers = [s for s in self._topics.get(topic, ()) if s is not sender]
+            self.deliveries += len(receivers)
+            self._arrived.notify_all()
+        return receivers
+
+    def arrival_time(self, message_id, timeout=0):
+        """perf_counter() time a message id was broadcast, waiting up to timeout seconds."""
+        deadline = time.perf_counter() + timeout
+        with self._lock:
+            while message_id not in self.arrivals:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._arrived.wait(remaining)
+            return self.arrivals[message_id]
+
+    def arrival_times(self, message_ids, timeout=0):
+        """Broadcast times of the given message ids, waiting up to timeout seconds in total.
+
+        Returns:
+            Dict of message id -> perf_counter() time; ids missing at the deadline are left out
+        """
+        deadline = time.perf_counter() + timeout
+        pending = set(message_ids)
+        with self._lock:
+            while True:
+                pending -= self.arrivals.keys()
+                remaining = deadline - time.perf_counter()
+                if not pending or remaining <= 0:
+                    break
+                self._arrived.wait(remaining)
+            return {message_id: self.arrivals[message_id] for message_id in message_ids
+                    if message_id in self.arrivals}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'topics': sum(1 for members in self._topics.values() if members),
+                'broadcasts': self.broadcasts,
+                'deliveries': self.deliveries,
+            }
+
+
+class _Socket:
+    """One websocket connection speaking the Phoenix JSON serializer."""
+
+    def __init__(self, handler, hub, vsn):
+        self.handler = handler
+        self.hub = hub
+        self.vsn = vsn
+        self._send_lock = threading.Lock()
+
+    def send_text(self, text):
+        data = text.encode()
+        header = bytes([0x81])
+        if len(data) < 126:
+            header += bytes([len(data)])
+        elif len(data) < 65536:
+            header += bytes([126]) + struct.pack('!H', len(data))
+        else:
+            header += bytes([127]) + struct.pack('!Q', len(data))
+        with self._send_lock:
+            try:
+                self.handler.wfile.write(header + data)
+                self.handler.wfile.flush()
+            except OSError:
+                pass
+
+    def push(self, topic, event, payload, ref=None, join_ref=None):
+        if self.vsn.startswith('2'):
+            message = [join_ref, ref, topic, event, payload]
+        else:
+            message = {'topic': topic, 'event': event, 'payload': payload, 'ref': ref, 'join_ref': join_ref}
+        self.send_text(json.dumps(message))
+
+    def reply(self, topic, ref, join_ref, response=None):
+        self.push(topic, 'phx_reply', {'status': 'ok', 'response': response or {}}, ref, join_ref)
+
+    def handle(self, text):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if isinstance(message, list):
+            join_ref, ref, topic, event, payload = (message + [None] * 5)[:5]
+        else:
+            join_ref, ref = message.get('join_ref'), message.get('ref')
+            topic, event, payload = message.get('topic'), message.get('event'), message.get('payload')
+
+        if event == 'phx_join':
+            self.hub.join(topic, self)
+            self.reply(topic, ref, join_ref, {'postgres_changes': []})
+        elif event == 'phx_leave':
+            self.hub.leave(topic, self)
+            self.reply(topic, ref, join_ref)
+        elif event == 'broadcast' and isinstance(payload, dict):
+            for receiver in self.hub.broadcast(topic, payload.get('event'), payload.get('payload'), sender=self):
+                receiver.push(topic, 'broadcast', payload)
+            if ref is not None:
+                self.reply(topic, ref, join_ref)
+        elif ref is not None:
+            # heartbeat, access_token, presence: acknowledge and move on
+            self.reply(topic, ref, join_ref)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    hub = None
+
+    def handle(self):
+        request_line = self.rfile.readline().decode('latin-1').strip()
+        if not request_line:
+            return
+        method, target = request_line.split(' ')[:2]
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('upgrade', '').lower() == 'websocket':
+            self._websocket(target, headers)
+        elif method == 'POST' and target.split('?')[0].endswith('/api/broadcast'):
+            self._rest_broadcast(headers)
+        else:
+            self._respond(404, b'{"error":"not found"}')
+
+    def _respond(self, status, body):
+        reason = {202: 'Accepted', 400: 'Bad Request', 404: 'Not Found'}.get(status, 'OK')
+        self.wfile.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+
+    def _rest_broadcast(self, headers):
+        body = self.rfile.read(int(headers.get('content-length', 0) or 0))
+        try:
+            messages = json.loads(body).get('messages', [])
+        except (ValueError, AttributeError):
+            self._respond(400, b'{"error":"invalid body"}')
+            return
+        for message in messages:
+            topic = message.get('topic', '')
+            topic = topic if topic.startswith('realtime:') else f"realtime:{topic}"
+            envelope = {'type': 'broadcast', 'event': message.get('event'), 'payload': message.get('payload')}
+            for receiver in self.hub.broadcast(topic, envelope['event'], envelope['payload']):
+                receiver.push(topic, 'broadcast', envelope)
+        self._respond(202, b'{}')
+
+    def _websocket(self, target, headers):
+        key = headers.get('sec-websocket-key', '')
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.wfile.write(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        vsn = '2.0.0' if 'vsn=2' in target else '1.0.0'
+        socket = _Socket(self, self.hub, vsn)
+        fragments = []
+        try:
+            while True:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                fin, opcode, data = frame
+                if opcode == 0x8:
+                    with socket._send_lock:
+                        self.wfile.write(b'\x88\x00')
+                    break
+                if opcode == 0x9:
+                    with socket._send_lock:
+                        self.wfile.write(bytes([0x8A, min(len(data), 125)]) + data[:125])
+                    continue
+                if opcode in (0x0, 0x1):
+                    fragments.append(data)
+                    if fin:
+                        socket.handle(b''.join(fragments).decode('utf-8', 'replace'))
+                        fragments = []
+        except OSError:
+            pass
+        finally:
+            self.hub.leave_all(socket)
+
+    def _read_exact(self, n):
+        data = self.rfile.read(n)
+        return data if len(data) == n else None
+
+    def _read_frame(self):
+        head = self._read_exact(2)
+        if head is None:
+            return None
+        fin, opcode = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length in (126, 127):
+            # A connection closed mid-header leaves a short read, the same as a closed socket
+            extended = self._read_exact(2 if length == 126 else 8)
+            if extended is None:
+                return None
+            length = struct.unpack('!H' if length == 126 else '!Q', extended)[0]
+        mask = self._read_exact(4) if masked else None
+        if masked and mask is None:
+            return None
+        data = self._read_exact(length) if length else b''
+        if data is None:
+            return None
+        if mask:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        return bool(fin), opcode, data
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_standin(port=DEFAULT_PORT, host='127.0.0.1'):
+    """
+    Start the stand-in on a background thread.
+
+    Returns:
+        (server, hub) - call server.shutdown() to stop it
+    """
+    hub = RealtimeHub()
+    handler = type('RealtimeHandler', (_Handler,), {'hub': hub})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hub
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Supabase Realtime broadcast stand-in')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    args = parser.parse_args()
+
+    server, hub = start_standin(args.port, args.host)
+    print(f"Realtime stand-in listening on ws://{args.host}:{args.port}/realtime/v1/websocket")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {hub.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
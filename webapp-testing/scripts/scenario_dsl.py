@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Declarative browser scenarios.
+
+Scenarios are YAML or JSON files:
+
+    defaults:
+      context: anonymous            # anonymous | client | coach | isolated
+      viewport: {width: 1920, height: 1080}
+    scenarios:
+      - name: Coach bookings page
+        context: coach              # logged in once via /api/auth/login, shared by every coach scenario
+        steps:
+          - goto: /dashboard/coach/bookings
+          - expect:
+              - {selector: h1, contains: Bookings}
+              - {selector: 'input[placeholder*="Search"]', visible: true}
+          - screenshot: coach_bookings.png
+
+Steps: goto, fill, click, press, select, wait_for, wait_for_url, wait,
+viewport, expect, screenshot. `{coach_id}` (first coach profile) and any
+`variables:` entry are substituted into step strings.
+
+Each scenario is compiled once into a list of closures, so malformed steps
+fail before a browser starts. Consecutive expect steps are merged and their
+CSS/text checks run in a single page.evaluate() per poll instead of one
+locator round trip each; Playwright-only selectors (text=, :has-text, >>)
+fall back to locators. Scenarios are grouped by context so each role logs
+in once; `isolated` scenarios get a fresh context.
+
+Usage:
+    python scripts/scenario_dsl.py check scenarios/        # compile only
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+import yaml
+
+DEFAULT_ACCOUNTS = {'client': 'alex@example.com', 'coach': 'sarah@example.com'}
+DEFAULT_PASSWORD = 'password123'
+DEFAULT_VIEWPORT = {'width': 1920, 'height': 1080}
+DEFAULT_EXPECT_TIMEOUT = 5000
+POLL_INTERVAL = 0.1
+
+Scenario = namedtuple('Scenario', ['name', 'context', 'viewport', 'steps', 'source'])
+Step = namedtuple('Step', ['label', 'run'])
+
+_VARIABLE = re.compile(r'\{(\w+)\}')
+_PLAYWRIGHT_ONLY = ('text=', 'role=', 'xpath=', ':has-text(', ':text(', '>>', ':visible')
+
+
+class ScenarioError(ValueError):
+    """A scenario file that does not compile."""
+
+
+BATCH_JS = """checks => checks.map(check => {
+    if (check.selector == null) {
+        return {found: document.body.innerText.includes(check.text) ? 1 : 0};
+    }
+    let elements;
+    try {
+        elements = Array.from(document.querySelectorAll(check.selector));
+    } catch (e) {
+        return {fallback: true};
+    }
+    const visible = elements.filter(el => el.getClientRects().length > 0 &&
+        getComputedStyle(el).visibility !== 'hidden');
+    return {
+        found: elements.length,
+        visible: visible.length,
+        text: elements.length ? elements[0].innerText : null,
+    };
+})"""
+
+
+# -- loading -------------------------------------------------------------
+
+def scenario_files(paths):
+    """Expand files and directories into .yaml/.yml/.json scenario files."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(('.yaml', '.yml', '.json')):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def load_file(path):
+    with open(path) as f:
+        data = json.load(f) if path.endswith('.json') else yaml.safe_load(f)
+    if not isinstance(data, dict) or not isinstance(data.get('scenarios'), list):
+        raise ScenarioError(f"{path}: expected a mapping with a 'scenarios' list")
+    return data
+
+
+def substitute(value, variables):
+    """Replace {name} with known variables in every string of a step."""
+    if isinstance(value, str):
+        return _VARIABLE.sub(lambda m: str(variables[m.group(1)]) if m.group(1) in variables else m.group(0), value)
+    if isinstance(value, list):
+        return [substitute(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: substitute(v, variables) for k, v in value.items()}
+    return value
+
+
+def referenced_variables(paths):
+    """Variable names used anywhere in the given files (so expensive ones are only resolved when needed)."""
+    names = set()
+    for path in scenario_files(paths):
+        with open(path) as f:
+            names.update(_VARIABLE.findall(f.read()))
+    return names
+
+
+# -- compilation ---------------------------------------------------------
+
+def _is_css(selector):
+    return not any(marker in selector for marker in _PLAYWRIGHT_ONLY)
+
+
+def _compile_check(raw, where):
+    if isinstance(raw, str):
+        raw = {'selector': raw}
+    if not isinstance(raw, dict):
+        raise ScenarioError(f"{where}: expect entries must be mappings")
+    unknown = set(raw) - {'name', 'selector', 'text', 'url_contains', 'count', 'min_count', 'visible', 'contains'}
+    if unknown:
+        raise ScenarioError(f"{where}: unknown expect keys {sorted(unknown)}")
+    if sum(k in raw for k in ('selector', 'text', 'url_contains')) != 1:
+        raise ScenarioError(f"{where}: expect needs exactly one of selector, text, url_contains")
+    check = dict(raw)
+    check.setdefault('name', raw.get('selector') or raw.get('text') or f"url contains {raw['url_contains']}")
+    if 'selector' in check and not any(k in check for k in ('count', 'min_count', 'visible', 'contains')):
+        check['min_count'] = 1
+    return check
+
+
+def _evaluate_check(check, observed, url):
+    """(passed, details) for one check against batched DOM observations."""
+    if 'url_contains' in check:
+        return check['url_contains'] in url, f"URL: {url}"
+    if 'text' in check:
+        return bool(observed['found']), '' if observed['found'] else f"text not found: {check['text']!r}"
+    found, visible = observed['found'], observed['visible']
+    problems = []
+    if 'count' in check and found != check['count']:
+        problems.append(f"expected {check['count']}, found {found}")
+    if 'min_count' in check and found < check['min_count']:
+        problems.append(f"expected at least {check['min_count']}, found {found}")
+    if check.get('visible') is True and not visible:
+        problems.append('not visible')
+    if check.get('visible') is False and visible:
+        problems.append('unexpectedly visible')
+    if 'contains' in check and (observed['text'] is None or check['contains'] not in observed['text']):
+        problems.append(f"text does not contain {check['contains']!r}")
+    return not problems, '; '.join(problems) or f"found {found}"
+
+
+def _observe_with_locator(page, check):
+    locator = page.locator(check['selector'])
+    found = locator.count()
+    visible = sum(1 for i in range(min(found, 20)) if locator.nth(i).is_visible())
+    return {'found': found, 'visible': visible, 'text': locator.first.inner_text() if found else None}
+
+
+def _compile_expect(checks, timeout):
+    dom_checks = [c for c in checks if 'url_contains' not in c and ('text' in c or _is_css(c['selector']))]
+    locator_checks = [c for c in checks if 'selector' in c and not _is_css(c['selector'])]
+
+    def run(page, _runner):
+        deadline = time.perf_counter() + timeout / 1000
+        while True:
+            observed = {}
+            payload = [{'selector': c.get('selector'), 'text': c.get('text')} for c in dom_checks]
+            for check, result in zip(dom_checks, page.evaluate(BATCH_JS, payload) if payload else []):
+                observed[id(check)] = _observe_with_locator(page, check) if result.get('fallback') else result
+            for check in locator_checks:
+                observed[id(check)] = _observe_with_locator(page, check)
+            outcomes = [(c['name'],) + _evaluate_check(c, observed.get(id(c)), page.url) for c in checks]
+            if all(passed for _name, passed, _details in outcomes) or time.perf_counter() >= deadline:
+                return outcomes
+            time.sleep(POLL_INTERVAL)
+
+    return run
+
+
+def _require(kind, arg, keys, where):
+    """Fail compilation when a mapping step lacks one of its keys, instead of a KeyError mid-run."""
+    if not isinstance(arg, dict):
+        raise ScenarioError(f"{where}: {kind} takes a mapping with {', '.join(keys)}")
+    missing = [key for key in keys if key not in arg]
+    if missing:
+        raise ScenarioError(f"{where}: {kind} is missing {', '.join(missing)}")
+    return arg
+
+
+def _compile_step(kind, arg, where, defaults):
+    """Turn one step into a callable(page, runner) returning check outcomes or None."""
+    if kind == 'goto':
+        arg = _require(kind, {'url': arg} if isinstance(arg, str) else arg, ['url'], where)
+        wait = arg.get('wait', 'networkidle')
+
+        def run(page, runner):
+            url = arg['url'] if arg['url'].startswith('http') else runner.base_url + arg['url']
+            page.goto(url)
+            if wait:
+                page.wait_for_load_state(wait)
+        return run
+    if kind == 'fill':
+        if not isinstance(arg, dict):
+            raise ScenarioError(f"{where}: fill takes {{selector: value}} pairs")
+        if 'selector' in arg:
+            _require(kind, arg, ['selector', 'value'], where)
+            pairs = [(arg['selector'], arg['value'])]
+        else:
+            pairs = list(arg.items())
+
+        def run(page, runner):
+            for selector, value in pairs:
+                page.locator(selector).fill(str(value))
+        return run
+    if kind == 'click':
+        arg = _require(kind, {'selector': arg} if isinstance(arg, str) else arg, ['selector'], where)
+
+        def run(page, runner):
+            page.locator(arg['selector']).first.click()
+            if arg.get('wait_for_url'):
+                page.wait_for_url(arg['wait_for_url'])
+        return run
+    if kind == 'press':
+        _require(kind, arg, ['selector', 'key'], where)
+        return lambda page, runner: page.locator(arg['selector']).press(arg['key'])
+    if kind == 'select':
+        _require(kind, arg, ['selector', 'value'], where)
+        return lambda page, runner: page.locator(arg['selector']).select_option(arg['value'])
+    if kind == 'wait_for':
+        return lambda page, runner: page.locator(arg).first.wait_for(state='visible')
+    if kind == 'wait_for_url':
+        return lambda page, runner: page.wait_for_url(arg)
+    if kind == 'wait':
+        try:
+            ms = int(arg)
+        except (TypeError, ValueError):
+            raise ScenarioError(f"{where}: wait takes a number of milliseconds")
+        return lambda page, runner: page.wait_for_timeout(ms)
+    if kind == 'viewport':
+        return lambda page, runner: page.set_viewport_size(arg)
+    if kind == 'screenshot':
+        arg = _require(kind, {'name': arg} if isinstance(arg, str) else arg, ['name'], where)
+        full_page = arg.get('full_page', True)
+
+        def run(page, runner):
+            page.screenshot(path=os.path.join(runner.screenshots_dir, arg['name']), full_page=full_page)
+        return run
+    if kind == 'expect':
+        raw_checks = arg if isinstance(arg, list) else [arg]
+        timeout = defaults.get('expect_timeout', DEFAULT_EXPECT_TIMEOUT)
+        return _compile_expect([_compile_check(c, where) for c in raw_checks], timeout)
+    raise ScenarioError(f"{where}: unknown step '{kind}'")
+
+
+def compile_scenario(raw, defaults, source, variables=None):
+    """Validate and compile one scenario mapping into a Scenario."""
+    name = raw.get('name')
+    if not name or not isinstance(raw.get('steps'), list):
+        raise ScenarioError(f"{source}: every scenario needs a name and a steps list")
+    steps = []
+    pending_checks = []
+
+    def flush_expects():
+        if pending_checks:
+            label = f"expect x{len(pending_checks)}"
+            steps.append(Step(label, _compile_step('expect', list(pending_checks), f"{source}: {name}", defaults)))
+            pending_checks.clear()
+
+    for index, raw_step in enumerate(substitute(raw['steps'], variables or {}), 1):
+        where = f"{source}: {name}, step {index}"
+        if not isinstance(raw_step, dict) or len(raw_step) != 1:
+            raise ScenarioError(f"{where}: a step is a single-key mapping like {{goto: /}}")
+        (kind, arg), = raw_step.items()
+        if kind == 'expect':
+            # Merge consecutive expects into one batched evaluation
+            for check in (arg if isinstance(arg, list) else [arg]):
+                pending_checks.append(_compile_check(check, where))
+            continue
+        flush_expects()
+        steps.append(Step(f"{kind} {arg if isinstance(arg, str) else ''}".strip(),
+                          _compile_step(kind, arg, where, defaults)))
+    flush_expects()
+
+    context = raw.get('context', defaults.get('context', 'anonymous'))
+    if context not in ('anonymous', 'isolated') and context not in defaults['accounts']:
+        raise ScenarioError(f"{source}: {name}: unknown context '{context}'")
+    viewport = raw.get('viewport', defaults.get('viewport', DEFAULT_VIEWPORT))
+    return Scenario(name, context, viewport, steps, source)
+
+
+def compile_files(paths, variables=None, only=None):
+    """
+    Compile every scenario in the given files/directories.
+
+    Args:
+        variables: values for {name} placeholders (override file `variables:`)
+        only: fnmatch filter on scenario names
+
+    Returns:
+        (scenarios, accounts) - accounts merges DEFAULT_ACCOUNTS with every file's defaults
+    """
+    scenarios = []
+    accounts = dict(DEFAULT_ACCOUNTS)
+    for path in scenario_files(paths):
+        data = load_file(path)
+        defaults = dict(data.get('defaults') or {})
+        defaults['accounts'] = {**DEFAULT_ACCOUNTS, **defaults.get('accounts', {})}
+        accounts.update(defaults['accounts'])
+        file_variables = {**(data.get('variables') or {}), **(variables or {})}
+        for raw in data['scenarios']:
+            scenario = compile_scenario(raw, defaults, os.path.basename(path), file_variables)
+            if only is None or fnmatch.fnmatch(scenario.name.lower(), only.lower()):
+                scenarios.append(scenario)
+    return scenarios, accounts
+
+
+def execution_order(scenarios):
+    """Group scenarios sharing a context (stable within a group); isolated ones run last."""
+    groups = {}
+    for scenario in scenarios:
+        key = (scenario.context == 'isolated', scenario.context, json.dumps(scenario.viewport, sort_keys=True))
+        groups.setdefault(key, []).append(scenario)
+    first_seen = {key: i for i, key in enumerate(groups)}
+    return [s for key in sorted(groups, key=lambda k: (k[0], first_seen[k])) for s in groups[key]]
+
+
+# -- execution -----------------------------------------------------------
+
+class ScenarioRunner:
+    """
+    Runs compiled scenarios on one browser, reusing a context per (role, viewport).
+
+    Args:
+        browser: Playwright sync Browser
+        base_url: prepended to relative goto URLs
+        screenshots_dir: where screenshot steps write
+        accounts: {role: email} for logged-in contexts
+        login_ip: callable(index) -> X-Forwarded-For value for each role login
+    """
+
+    def __init__(self, browser, base_url, screenshots_dir, accounts=None, password=DEFAULT_PASSWORD, login_ip=None):
+        self.browser = browser
+        self.base_url = base_url.rstrip('/')
+        self.screenshots_dir = screenshots_dir
+        self.accounts = accounts or DEFAULT_ACCOUNTS
+        self.password = password
+        self.login_ip = login_ip
+        self._contexts = {}
+
+    def _login(self, context, role):
+        headers = {'X-Forwarded-For': self.login_ip(len(self._contexts) + 1)} if self.login_ip else None
+        response = context.request.post(f"{self.base_url}/api/auth/login", headers=headers,
+                                        data={'email': self.accounts[role], 'password': self.password})
+        if not response.ok:
+            raise RuntimeError(f"login as {role} failed with HTTP {response.status}")
+
+    def context_for(self, scenario):
+        if scenario.context == 'isolated':
+            return self.browser.new_context(viewport=scenario.viewport), True
+        key = (scenario.context, json.dumps(scenario.viewport, sort_keys=True))
+        if key not in self._contexts:
+            context = self.browser.new_context(viewport=scenario.viewport)
+            if scenario.context != 'anonymous':
+                self._login(context, scenario.context)
+            self._contexts[key] = context
+        return self._contexts[key], False
+
+    def run_scenario(self, scenario):
+        """Run one scenario; returns a result dict with per-check outcomes."""
+        start = time.perf_counter()
+        result = {'scenario': scenario.name, 'source': scenario.source, 'context': scenario.context,
+                  'passed': True, 'checks': [], 'error': None}
+        context = page = None
+        owned = False
+        current = 'setup'
+        try:
+            context, owned = self.context_for(scenario)
+            page = context.new_page()
+            for step in scenario.steps:
+                current = step.label
+                outcomes = step.run(page, self)
+                for name, passed, details in outcomes or ():
+                    result['checks'].append({'check': name, 'passed': passed, 'details': details})
+                    result['passed'] = result['passed'] and passed
+        except Exception as e:
+            result['passed'] = False
+            result['error'] = f"{current}: {str(e).splitlines()[0]}"
+        finally:
+            if page:
+                page.close()
+            if owned and context:
+                context.close()
+        result['elapsed_s'] = round(time.perf_counter() - start, 2)
+        return result
+
+    def run(self, scenarios):
+        return [self.run_scenario(s) for s in execution_order(scenarios)]
+
+    def close(self):
+        for context in self._contexts.values():
+            context.close()
+        self._contexts.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile-check declarative browser scenarios')
+    parser.add_argument('action', choices=['check'])
+    parser.add_argument('paths', nargs='+', help='Scenario files or directories')
+    args = parser.parse_args()
+    try:
+        scenarios, _accounts = compile_files(args.paths)
+    except ScenarioError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for scenario in execution_order(scenarios):
+        print(f"✅ [{scenario.context}] {scenario.name}: {len(scenario.steps)} compiled step(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Content-addressed screenshot store.
+
+Captures are keyed by the SHA-256 of the bytes Playwright produced, so an
+image identical to one from any earlier run is stored once. New objects are
+recompressed in a background thread pool (optimized PNG or lossless WebP,
+whichever is requested; needs Pillow, otherwise the capture is kept as-is).
+Each run writes runs/<run_id>.json mapping screenshot names to objects, and
+a retention policy (keep N runs, max age, max total size) deletes old runs
+and sweeps objects no retained run references.
+
+Layout:
+    screenshots/store/objects/ab/abcdef....png
+    screenshots/store/runs/20260101-120000.json
+
+Usage:
+    python scripts/screenshot_store.py ingest                  # store screenshots/*.png as a new run
+    python scripts/screenshot_store.py stats
+    python scripts/screenshot_store.py gc --keep-runs 20 --max-age-days 14 --max-mb 500
+    python scripts/screenshot_store.py restore 20260101-120000 --to /tmp/run
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SCREENSHOTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'screenshots'))
+STORE_DIR = os.path.join(SCREENSHOTS_DIR, 'store')
+
+DEFAULT_KEEP_RUNS = 20
+FORMATS = ('png', 'webp')
+
+
+def _recompress(data, fmt):
+    """Re-encode PNG bytes; returns the smaller of the original and the result."""
+    if Image is None:
+        return data, 'png'
+    out = io.BytesIO()
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if fmt == 'webp':
+                image.save(out, 'WEBP', lossless=True, method=6)
+            else:
+                image.save(out, 'PNG', optimize=True, compress_level=9)
+    except OSError:
+        return data, 'png'
+    encoded = out.getvalue()
+    return (encoded, fmt) if len(encoded) < len(data) else (data, 'png')
+
+
+class ScreenshotStore:
+    """
+    Deduplicating, retention-managed screenshot history.
+
+    Args:
+        root: store directory
+        fmt: 'png' (optimized, lossless) or 'webp' (lossless)
+        workers: threads used for hashing and recompression
+    """
+
+    def __init__(self, root=STORE_DIR, fmt='png', workers=4):
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {FORMATS}")
+        self.root = root
+        self.fmt = fmt
+        self.objects_dir = os.path.join(root, 'objects')
+        self.runs_dir = os.path.join(root, 'runs')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot-store')
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._run = None
+
+    # -- objects ---------------------------------------------------------
+
+    def _object_path(self, digest, ext):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{ext}")
+
+    def find(self, digest):
+        """Path of a stored object, or None."""
+        for ext in FORMATS:
+            path = self._object_path(digest, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _put(self, digest, data):
+        if self.find(digest):
+            return digest, True
+        encoded, ext = _recompress(data, self.fmt)
+        path = self._object_path(digest, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp, path)
+        return digest, False
+
+    # -- runs ------------------------------------------------------------
+
+    def begin_run(self, run_id=None):
+        """Start collecting screenshots for a run."""
+        if run_id is None:
+            base = run_id = time.strftime('%Y%m%d-%H%M%S')
+            suffix = 1
+            while os.path.exists(os.path.join(self.runs_dir, f"{run_id}.json")):
+                suffix += 1
+                run_id = f"{base}-{suffix}"
+        self._run = {'id': run_id, 'started': time.time(), 'screenshots': {}, 'futures': {}}
+        return run_id
+
+    def add(self, name, data):
+        """
+        Queue a capture for the current run.
+
+        Args:
+            name: screenshot name, e.g. '01_landing_page.png'
+            data: PNG bytes (as returned by page.screenshot()) or a file path
+        """
+        if self._run is None:
+            self.begin_run()
+        if isinstance(data, str):
+            with open(data, 'rb') as f:
+                data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            future = self._pending.get(digest)
+            if future is None:
+                future = self._pending[digest] = self._pool.submit(self._put, digest, data)
+        self._run['futures'][name] = future
+
+    def screenshot(self, page, name, path=None, **kwargs):
+        """page.screenshot() that also stores the capture; writes path too when given."""
+        data = page.screenshot(path=path, **kwargs)
+        self.add(name, data)
+        return data
+
+    def ingest_dir(self, directory=SCREENSHOTS_DIR, since=None):
+        """Queue every PNG in a directory (optionally only those modified after `since`)."""
+        count = 0
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith('.png'):
+                if since is None or entry.stat().st_mtime >= since:
+                    self.add(entry.name, entry.path)
+                    count += 1
+        return count
+
+    def finish_run(self):
+        """
+        Wait for background work and write the run manifest.
+
+        Returns:
+            dict with run id, screenshot count and how many were already stored
+        """
+        run = self._run
+        if run is None:
+            return None
+        created = set()
+        for name, future in run['futures'].items():
+            digest, existed = future.result()
+            run['screenshots'][name] = digest
+            if not existed:
+                created.add(digest)
+        with self._lock:
+            self._pending.clear()
+        manifest = {'id': run['id'], 'started': run['started'], 'finished': time.time(),
+                    'screenshots': run['screenshots']}
+        with open(os.path.join(self.runs_dir, f"{run['id']}.json"), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        self._run = None
+        return {'run': run['id'], 'screenshots': len(run['screenshots']),
+                'deduplicated': len(run['screenshots']) - len(created)}
+
+    def runs(self):
+        """Run manifests, oldest first."""
+        manifests = []
+        for name in os.listdir(self.runs_dir):
+            if name.endswith('.json'):
+                with open(os.path.join(self.runs_dir, name)) as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda m: m['started'])
+
+    def restore(self, run_id, target_dir):
+        """Copy a run's screenshots, under their original names, into target_dir."""
+        with open(os.path.join(self.runs_dir, f"{run_id}.json")) as f:
+            manifest = json.load(f)
+        os.makedirs(target_dir, exist_ok=True)
+        restored = []
+        for name, digest in manifest['screenshots'].items():
+            source = self.find(digest)
+            if source is None:
+                continue
+            target = os.path.join(target_dir, name)
+            if source.endswith('.png'):
+                shutil.copyfile(source, target)
+            elif Image is not None:
+                with Image.open(source) as image:
+                    image.save(target, 'PNG')
+            else:
+                continue
+            restored.append(target)
+        return restored
+
+    # -- retention -------------------------------------------------------
+
+    def _object_sizes(self):
+        sizes = {}
+        for shard in os.scandir(self.objects_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        sizes[entry.name.split('.')[0]] = (entry.path, entry.stat().st_size)
+        return sizes
+
+    def stats(self):
+        sizes = self._object_sizes()
+        runs = self.runs()
+        references = sum(len(r['screenshots']) for r in runs)
+        return {'runs': len(runs), 'objects': len(sizes), 'references': references,
+                'bytes': sum(size for _path, size in sizes.values())}
+
+    def gc(self, keep_runs=DEFAULT_KEEP_RUNS, max_age_days=None, max_bytes=None):
+        """
+        Apply the retention policy, then delete unreferenced objects.
+
+        Runs are dropped oldest first while there are more than keep_runs,
+        while they are older than max_age_days, or while the referenced
+        objects exceed max_bytes. The newest run is always kept.
+
+        Returns:
+            dict with removed run ids, removed object count and bytes freed
+        """
+        runs = self.runs()
+        sizes = self._object_sizes()
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+
+        def referenced_bytes(kept):
+            digests = {d for r in kept for d in r['screenshots'].values()}
+            return sum(sizes[d][1] for d in digests if d in sizes)
+
+        removed_runs = []
+        while len(runs) > 1:
+            oldest = runs[0]
+            too_many = keep_runs is not None and len(runs) > keep_runs
+            too_old = cutoff is not None and oldest['started'] < cutoff
+            too_big = max_bytes is not None and referenced_bytes(runs) > max_bytes
+            if not (too_many or too_old or too_big):
+                break
+            os.remove(os.path.join(self.runs_dir, f"{oldest['id']}.json"))
+            removed_runs.append(oldest['id'])
+            runs.pop(0)
+
+        live = {d for r in runs for d in r['screenshots'].values()}
+        with self._lock:
+            live.update(self._pending)
+        removed_objects = 0
+        freed = 0
+        for digest, (path, size) in sizes.items():
+            if digest not in live:
+                os.remove(path)
+                removed_objects += 1
+                freed += size
+        return {'removed_runs': removed_runs, 'removed_objects': removed_objects, 'bytes_freed': freed}
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed screenshot store')
+    parser.add_argument('action', choices=['ingest', 'stats', 'gc', 'restore'])
+    parser.add_argument('run_id', nargs='?', help='restore: run to restore')
+    parser.add_argument('--store', default=STORE_DIR, help=f'Store directory (default: {STORE_DIR})')
+    parser.add_argument('--from', dest='source', default=SCREENSHOTS_DIR,
+                        help=f'ingest: directory of PNGs (default: {SCREENSHOTS_DIR})')
+    parser.add_argument('--to', help='restore: target directory')
+    parser.add_argument('--format', choices=FORMATS, default='png', help='Stored encoding (default: png)')
+    parser.add_argument('--workers', type=int, default=4, help='Recompression threads (default: 4)')
+    parser.add_argument('--keep-runs', type=int, default=DEFAULT_KEEP_RUNS,
+                        help=f'Runs to keep (default: {DEFAULT_KEEP_RUNS})')
+    parser.add_argument('--max-age-days', type=float, help='Drop runs older than this')
+    parser.add_argument('--max-mb', type=float, help='Cap on stored object size')
+    args = parser.parse_args()
+
+    store = ScreenshotStore(args.store, args.format, args.workers)
+    try:
+        if args.action == 'ingest':
+            store.begin_run()
+            store.ingest_dir(args.source)
+            summary = store.finish_run()
+            print(f"✅ Run {summary['run']}: {summary['screenshots']} screenshot(s), "
+                  f"{summary['deduplicated']} already stored")
+            result = store.gc(args.keep_runs, args.max_age_days,
+                              int(args.max_mb * 1024 * 1024) if args.max_mb else None)
+            if result['removed_runs']:
+                print(f"🧹 Retention removed {len(result['removed_runs'])} run(s), "
+                      f"{result['bytes_freed'] / 1024:.0f} KB")
+        elif args.action == 'stats':
+            stats = store.stats()
+            print(f"{stats['runs']} run(s), {stats['references']} screenshot(s), "
+                  f"{stats['objects']} unique object(s), {stats['bytes'] / 1024 / 1024:.1f} MB")
+        elif args.action == 'gc':
+            result = store.gc(args.keep_runs, args.max_age_days,
+                              int(args.max_mb * 1024 * 1024) if args.max_mb else None)
+            print(f"🧹 Removed {len(result['removed_runs'])} run(s), {result['removed_objects']} object(s), "
+                  f"{result['bytes_freed'] / 1024:.0f} KB freed")
+        else:
+            if not args.run_id:
+                parser.error('restore needs a run id')
+            target = args.to or os.path.join(args.store, 'restored', args.run_id)
+            restored = store.restore(args.run_id, target)
+            print(f"✅ Restored {len(restored)} screenshot(s) to {target}")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
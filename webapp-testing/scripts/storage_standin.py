@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Supabase Storage object uploads.
+
+Accepts the storage-js upload calls the app makes
+(POST/PUT /storage/v1/object/<bucket>/<path>) and streams each body to a
+hash without keeping it, recording size, receive time and arrival order per
+bucket, so upload harnesses can check that every byte reached storage without
+a Supabase project. Storage behaviour can be degraded to see how the app
+copes: a per-upload delay (slow storage keeps request buffers alive longer),
+an upload size limit (413), and failing every Nth upload (500).
+
+Point the app at it when starting the server:
+    NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=local npm run dev
+
+It listens on the realtime stand-in's default port, as the app reaches both
+through NEXT_PUBLIC_SUPABASE_URL; run one or the other.
+
+Usage:
+    python scripts/storage_standin.py --port 54321
+    python scripts/storage_standin.py --delay-ms 500 --max-mb 5 --fail-every 10
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_PORT = 54321
+OBJECT_PREFIX = '/storage/v1/object/'
+CHUNK = 1 << 16
+
+
+class StorageHub:
+    """Upload bookkeeping shared by all request threads."""
+
+    def __init__(self, delay_ms=0, max_bytes=None, fail_every=0):
+        self.delay_ms = delay_ms
+        self.max_bytes = max_bytes
+        self.fail_every = fail_every
+        self._lock = threading.Lock()
+        self.objects = {}      # 'bucket/path' -> {'bytes', 'sha256', 'content_type'}
+        self.uploads = []      # one entry per accepted upload, in arrival order
+        self.rejected = {'too_large': 0, 'injected': 0, 'aborted': 0}
+        self._attempts = 0
+
+    def next_attempt(self):
+        with self._lock:
+            self._attempts += 1
+            return self._attempts
+
+    def record(self, bucket, path, size, digest, content_type, receive_s):
+        key = f"{bucket}/{path}"
+        with self._lock:
+            self.objects[key] = {'bytes': size, 'sha256': digest, 'content_type': content_type}
+            self.uploads.append({'key': key, 'bucket': bucket, 'bytes': size, 'sha256': digest,
+                                 'receive_s': round(receive_s, 4), 'arrived': time.perf_counter()})
+        return key
+
+    def reject(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def mark(self):
+        """Position to pass to since() to get uploads after this point."""
+        with self._lock:
+            return len(self.uploads)
+
+    def since(self, mark):
+        with self._lock:
+            return list(self.uploads[mark:])
+
+    def stats(self):
+        with self._lock:
+            by_bucket = {}
+            for upload in self.uploads:
+                bucket = by_bucket.setdefault(upload['bucket'], {'uploads': 0, 'bytes': 0})
+                bucket['uploads'] += 1
+                bucket['bytes'] += upload['bytes']
+            return {'uploads': len(self.uploads), 'objects': len(self.objects),
+                    'buckets': by_bucket, 'rejected': dict(self.rejected)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hub = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _object_key(self):
+        path = unquote(urlsplit(self.path).path)
+        if not path.startswith(OBJECT_PREFIX):
+            return None, None
+        bucket, _, name = path[len(OBJECT_PREFIX):].partition('/')
+        return (bucket, name) if bucket and name and bucket not in ('public', 'sign') else (None, None)
+
+    def _upload(self):
+        bucket, name = self._object_key()
+        if bucket is None:
+            self._respond(404, {'error': 'not_found', 'message': 'Object not found'})
+            return
+        declared = int(self.headers.get('Content-Length') or 0)
+        hub = self.hub
+        attempt = hub.next_attempt()
+        if hub.max_bytes is not None and declared > hub.max_bytes:
+            # Drain so the client sees the response rather than a reset
+            self._drain(declared)
+            self._too_large()
+            return
+
+        start = time.perf_counter()
+        digest = hashlib.sha256()
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        length = 0
+        for chunk in (self._chunked_body() if chunked else self._body(declared)):
+            if chunk is None:
+                hub.reject('aborted')
+                self.close_connection = True
+                return
+            digest.update(chunk)
+            length += len(chunk)
+        received = time.perf_counter() - start
+        if hub.max_bytes is not None and length > hub.max_bytes:
+            self._too_large()
+            return
+
+        if hub.delay_ms:
+            time.sleep(hub.delay_ms / 1000)
+        if hub.fail_every and attempt % hub.fail_every == 0:
+            hub.reject('injected')
+            self._respond(500, {'statusCode': '500', 'error': 'Internal', 'message': 'Injected storage failure'})
+            return
+        key = hub.record(bucket, name, length, digest.hexdigest(),
+                         self.headers.get('Content-Type', ''), received)
+        self._respond(200, {'Key': key, 'Id': str(uuid.uuid4())})
+
+    def _too_large(self):
+        self.hub.reject('too_large')
+        self._respond(413, {'statusCode': '413', 'error': 'Payload too large',
+                            'message': 'The object exceeded the maximum allowed size'})
+
+    def _body(self, length):
+        """Yield a Content-Length body in chunks; None if the client hangs up early."""
+        while length > 0:
+            chunk = self.rfile.read(min(CHUNK, length))
+            if not chunk:
+                yield None
+                return
+            length -= len(chunk)
+            yield chunk
+
+    def _chunked_body(self):
+        """Yield a Transfer-Encoding: chunked body; None if it is cut short."""
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                yield None
+                return
+            size = int(line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+                return
+            yield from self._body(size)
+            self.rfile.readline()
+
+    def _drain(self, length):
+        while length > 0:
+            chunk = self.rfile.read(min(CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+
+    do_POST = _upload
+    do_PUT = _upload
+
+    def do_GET(self):
+        # Public URLs resolve, but bodies are not kept
+        self._respond(404, {'error': 'not_found', 'message': 'Stand-in does not keep object bodies'})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_standin(port=DEFAULT_PORT, host='127.0.0.1', delay_ms=0, max_bytes=None, fail_every=0):
+    """
+    Start the stand-in on a background thread.
+
+    Returns:
+        (server, hub) - call server.shutdown() to stop it
+    """
+    hub = StorageHub(delay_ms, max_bytes, fail_every)
+    handler = type('StorageHandler', (_Handler,), {'hub': hub})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hub
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Supabase Storage upload stand-in')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--delay-ms', type=int, default=0, help='Delay before acknowledging each upload')
+    parser.add_argument('--max-mb', type=float, help='Reject larger uploads with 413')
+    parser.add_argument('--fail-every', type=int, default=0, help='Fail every Nth upload with 500')
+    args = parser.parse_args()
+
+    max_bytes = int(args.max_mb * 2 ** 20) if args.max_mb else None
+    server, hub = start_standin(args.port, args.host, args.delay_ms, max_bytes, args.fail_every)
+    print(f"Storage stand-in listening on http://{args.host}:{args.port}{OBJECT_PREFIX}<bucket>/<path>")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {hub.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Local stand-in for Stripe webhook deliveries.
+
+Builds Stripe-shaped event payloads and signs them exactly like Stripe does
+(Stripe-Signature: t=<unix>,v1=<hex HMAC-SHA256 of "<t>.<payload>">), so
+/api/stripe/webhook accepts them through constructWebhookEvent().
+
+The server must run with the same secret, e.g.:
+    STRIPE_WEBHOOK_SECRET=whsec_fitconnect_local npm run dev
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+DEFAULT_WEBHOOK_SECRET = 'whsec_fitconnect_local'
+WEBHOOK_PATH = '/api/stripe/webhook'
+
+
+def webhook_secret():
+    """Secret shared with the server (STRIPE_WEBHOOK_SECRET, or the local default)."""
+    return os.environ.get('STRIPE_WEBHOOK_SECRET', DEFAULT_WEBHOOK_SECRET)
+
+
+def _random_id(prefix):
+    return f"{prefix}_{secrets.token_hex(12)}"
+
+
+def sign_payload(payload, secret=None, timestamp=None):
+    """Return the Stripe-Signature header value for a raw payload string."""
+    secret = secret or webhook_secret()
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    signed = f"{timestamp}.{payload}".encode()
+    digest = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def make_event(event_type, obj, event_id=None, created=None):
+    """Wrap a Stripe object in an event envelope."""
+    return {
+        'id': event_id or _random_id('evt'),
+        'object': 'event',
+        'api_version': '2025-12-15.clover',
+        'created': int(created if created is not None else time.time()),
+        'livemode': False,
+        'pending_webhooks': 1,
+        'request': {'id': None, 'idempotency_key': None},
+        'type': event_type,
+        'data': {'object': obj},
+    }
+
+
+def payment_intent(intent_id=None, booking_id=None, amount_cents=5000, currency='usd',
+                   platform_fee_cents=None, status='succeeded'):
+    """Build a PaymentIntent object carrying the metadata create-intent attaches."""
+    platform_fee_cents = round(amount_cents * 0.1) if platform_fee_cents is None else platform_fee_cents
+    metadata = {
+        'platformFeeCents': str(platform_fee_cents),
+        'payoutCents': str(amount_cents - platform_fee_cents),
+    }
+    if booking_id:
+        metadata['bookingId'] = booking_id
+    return {
+        'id': intent_id or _random_id('pi'),
+        'object': 'payment_intent',
+        'amount': amount_cents,
+        'amount_received': amount_cents if status == 'succeeded' else 0,
+        'currency': currency,
+        'status': status,
+        'metadata': metadata,
+    }
+
+
+def charge_refunded(intent_id, amount_cents=5000, currency='usd'):
+    """Build a refunded Charge object pointing at a PaymentIntent."""
+    return {
+        'id': _random_id('ch'),
+        'object': 'charge',
+        'amount': amount_cents,
+        'amount_refunded': amount_cents,
+        'currency': currency,
+        'payment_intent': intent_id,
+        'refunded': True,
+    }
+
+
+def encode_event(event, secret=None, timestamp=None):
+    """
+    Serialize and sign an event.
+
+    Returns:
+        (body, headers) ready to POST to the webhook
+    """
+    body = json.dumps(event, separators=(',', ':'))
+    headers = {
+        'Content-Type': 'application/json',
+        'Stripe-Signature': sign_payload(body, secret, timestamp),
+        'User-Agent': 'Stripe/1.0 (+https://stripe.com/docs/webhooks)',
+    }
+    return body, headers
@@ -0,0 +1,130 @@
+"""
+Shared runner core for the browser and API suites.
+
+Suites record checks with log_result(); the checks go to whichever ResultLog
+is active instead of a module-global list, so the same test functions run
+both as plain scripts (run_suite) and under pytest (conftest.py activates a
+log per test and fails the test if any of its checks failed).
+
+Script mode:
+    log = ResultLog('FITCONNECT API TEST SUITE')
+    run_suite(log, [test_a, test_b], page)
+    log.print_summary()
+    log.write_json(os.path.join(SCREENSHOTS_DIR, 'api_test_results.json'))
+"""
+
+import contextvars
+import json
+import os
+import time
+import traceback
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar('suite_runner_log', default=None)
+
+
+class ResultLog:
+    """Ordered pass/fail checks plus per-test timings for one suite run."""
+
+    def __init__(self, title=''):
+        self.title = title
+        self.results = []
+        self.timings = {}
+        self.started = time.time()
+        self._test = None
+
+    def log(self, test_name, passed, details=""):
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status}: {test_name}")
+        if details:
+            print(f"    {details}")
+        entry = {"test": test_name, "passed": passed, "details": details}
+        if self._test:
+            entry["group"] = self._test
+        self.results.append(entry)
+
+    @contextmanager
+    def test(self, name):
+        """Attribute checks and wall time to a test function."""
+        previous, self._test = self._test, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+            self._test = previous
+
+    def failures(self):
+        return [r for r in self.results if not r['passed']]
+
+    def all_passed(self):
+        return not self.failures()
+
+    def summary(self):
+        passed = sum(1 for r in self.results if r['passed'])
+        return {'total': len(self.results), 'passed': passed, 'failed': len(self.results) - passed}
+
+    def print_summary(self, heading='TEST SUMMARY'):
+        summary = self.summary()
+        print("\n" + "=" * 60)
+        print(heading)
+        print("=" * 60)
+        print(f"\nTotal: {summary['total']} | Passed: {summary['passed']} | Failed: {summary['failed']}")
+        print(f"Pass Rate: {(summary['passed'] / summary['total'] * 100):.1f}%" if summary['total'] > 0
+              else "No tests run")
+        if summary['failed'] > 0:
+            print("\n❌ Failed Tests:")
+            for r in self.failures():
+                print(f"  - {r['test']}: {r['details']}")
+        if self.timings:
+            slowest = sorted(self.timings.items(), key=lambda item: -item[1])[:5]
+            print("\n⏱️  Slowest: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in slowest))
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                'summary': self.summary(),
+                'started': self.started,
+                'timings': self.timings,
+                'results': self.results,
+            }, f, indent=2)
+        print(f"📄 Results saved to: {path}")
+
+
+@contextmanager
+def activate(log):
+    """Route log_result() calls to `log` for the duration of the block."""
+    token = _active.set(log)
+    try:
+        yield log
+    finally:
+        _active.reset(token)
+
+
+def log_result(test_name, passed, details=""):
+    """Record a check on the active ResultLog (a throwaway one when none is active)."""
+    log = _active.get()
+    if log is None:
+        log = ResultLog()
+        _active.set(log)
+    log.log(test_name, passed, details)
+
+
+def run_suite(log, tests, *args):
+    """
+    Run test functions in order against `log`, timing each one.
+
+    A test that raises gets a failed check with the exception, its traceback is
+    printed, and the remaining tests still run (under pytest it fails the test).
+    """
+    with activate(log):
+        for test in tests:
+            with log.test(test.__name__):
+                try:
+                    test(*args)
+                except Exception as e:
+                    print(traceback.format_exc().rstrip())
+                    message = str(e).splitlines()[0] if str(e) else ''
+                    log.log(f"{test.__name__} raised", False, f"{type(e).__name__}: {message}")
+    return log
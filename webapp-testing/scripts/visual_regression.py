@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Compare screenshots against stored baselines.
+
+Each screenshot goes through three stages, cheapest first:
+1. Byte hash equal to the baseline's           -> unchanged, no decoding
+2. Perceptual hash (DCT) far from the baseline's, same size, no masks
+                                               -> changed whatever the pixel ratio
+3. Vectorized NumPy pixel diff with a per-pixel tolerance and mask
+   rectangles; fails when the share of differing pixels exceeds the limit
+
+The perceptual hash only decides the verdict early; the pixel diff still
+runs so every changed screenshot gets a diff image. Equal hashes never pass an image,
+because a 64-bit hash of a downscaled page misses small regressions: changed
+text, a missing button, a colour shift.
+
+Baseline hashes are cached in <baselines>/manifest.json, so baselines are
+only decoded when a pixel diff is actually needed. Diff images (changed
+pixels in red over a dimmed copy) are written to <baselines>/../diffs/.
+
+Usage:
+    python scripts/visual_regression.py compare
+    python scripts/visual_regression.py compare --masks masks.json --tolerance 24 --max-diff-ratio 0.002
+    python scripts/visual_regression.py approve 06_coaches_page.png   # promote current screenshots
+    python scripts/visual_regression.py approve --all
+
+Masks file: {"06_coaches_page.png": [[x, y, width, height]], "*_dashboard.png": [[0, 0, 1920, 80]]}
+Keys are fnmatch patterns; every matching entry applies.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image
+
+SCREENSHOTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'screenshots'))
+BASELINES_DIR = os.path.join(SCREENSHOTS_DIR, 'baselines')
+DIFFS_DIR = os.path.join(SCREENSHOTS_DIR, 'diffs')
+MANIFEST_NAME = 'manifest.json'
+
+DEFAULT_TOLERANCE = 16        # max per-channel difference (0-255) still treated as equal
+DEFAULT_MAX_DIFF_RATIO = 0.001  # share of unmasked pixels allowed to differ
+HASH_SIZE = 8
+PHASH_CHANGED_DISTANCE = 16   # differing hash bits (of 64) that mean a large, certain change
+
+Comparison = namedtuple('Comparison', ['name', 'status', 'stage', 'diff_ratio', 'diff_path', 'elapsed', 'details'])
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+_DCT_32 = _dct_matrix(HASH_SIZE * 4)
+
+
+def perceptual_hash(image):
+    """
+    64-bit DCT perceptual hash of a PIL image, as a hex string.
+
+    The image is reduced to 32x32 grayscale, transformed with a 2-D DCT and
+    the top-left 8x8 low frequencies are thresholded at their median.
+    """
+    small = np.asarray(image.convert('L').resize((HASH_SIZE * 4, HASH_SIZE * 4), Image.BILINEAR), dtype=np.float64)
+    dct = _DCT_32 @ small @ _DCT_32.T
+    low = dct[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = low > np.median(low[1:])
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+def image_signature(path):
+    """Hashes and size recorded for a baseline."""
+    with Image.open(path) as image:
+        return {'sha256': file_digest(path), 'phash': perceptual_hash(image), 'size': list(image.size)}
+
+
+def load_manifest(baselines_dir):
+    path = os.path.join(baselines_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(baselines_dir, manifest):
+    os.makedirs(baselines_dir, exist_ok=True)
+    with open(os.path.join(baselines_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def load_masks(masks_path):
+    if not masks_path:
+        return {}
+    with open(masks_path) as f:
+        return json.load(f)
+
+
+def mask_for(name, shape, masks):
+    """Boolean array, True where pixels are compared."""
+    keep = np.ones(shape, dtype=bool)
+    for pattern, rects in masks.items():
+        if fnmatch.fnmatch(name, pattern):
+            for x, y, width, height in rects:
+                keep[max(0, y):max(0, y + height), max(0, x):max(0, x + width)] = False
+    return keep
+
+
+def pixel_diff(current, baseline, tolerance, keep):
+    """
+    Vectorized pixel comparison.
+
+    Returns:
+        (changed mask, diff ratio over compared pixels)
+    """
+    delta = np.abs(current.astype(np.int16) - baseline.astype(np.int16)).max(axis=2)
+    changed = (delta > tolerance) & keep
+    compared = int(keep.sum())
+    return changed, (int(changed.sum()) / compared if compared else 0.0)
+
+
+def write_diff_image(current, changed, path):
+    """Dim the current screenshot and paint changed pixels red."""
+    overlay = (current[:, :, :3] * 0.3).astype(np.uint8)
+    overlay[changed] = (255, 0, 0)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(overlay, 'RGB').save(path, optimize=False)
+
+
+def compare_image(path, baselines_dir, manifest, masks, tolerance, max_diff_ratio, diffs_dir=DIFFS_DIR):
+    """Compare one screenshot with its baseline; returns a Comparison."""
+    name = os.path.basename(path)
+    start = time.perf_counter()
+    baseline_path = os.path.join(baselines_dir, name)
+
+    def result(status, stage, ratio=0.0, diff_path=None, details=''):
+        return Comparison(name, status, stage, ratio, diff_path, time.perf_counter() - start, details)
+
+    if not os.path.exists(baseline_path):
+        return result('new', 'missing', details='no baseline - run approve to accept it')
+
+    signature = manifest.get(name)
+    if signature is None:
+        signature = manifest[name] = image_signature(baseline_path)
+
+    if file_digest(path) == signature['sha256']:
+        return result('unchanged', 'bytes')
+
+    with Image.open(path) as image:
+        current_hash = perceptual_hash(image)
+        size = list(image.size)
+        distance = hamming(current_hash, signature['phash'])
+        certain = size == signature['size'] and distance >= PHASH_CHANGED_DISTANCE and not masks_apply(name, masks)
+        current = np.asarray(image.convert('RGB'))
+
+    with Image.open(baseline_path) as base_image:
+        baseline = np.asarray(base_image.convert('RGB'))
+
+    if current.shape != baseline.shape:
+        # Compare the shared area and count the size change as fully changed rows/columns
+        height = min(current.shape[0], baseline.shape[0])
+        width = min(current.shape[1], baseline.shape[1])
+        keep = mask_for(name, (height, width), masks)
+        changed, _ = pixel_diff(current[:height, :width], baseline[:height, :width], tolerance, keep)
+        full = np.ones(current.shape[:2], dtype=bool)
+        full[:height, :width] = changed
+        diff_path = os.path.join(diffs_dir, name)
+        write_diff_image(current, full, diff_path)
+        return result('changed', 'size', 1.0, diff_path,
+                      f"size {baseline.shape[1]}x{baseline.shape[0]} -> {current.shape[1]}x{current.shape[0]}")
+
+    keep = mask_for(name, current.shape[:2], masks)
+    changed, ratio = pixel_diff(current, baseline, tolerance, keep)
+    if ratio <= max_diff_ratio and not certain:
+        return result('unchanged', 'pixels', ratio, details=f"hash distance {distance}")
+
+    diff_path = os.path.join(diffs_dir, name)
+    write_diff_image(current, changed, diff_path)
+    if certain:
+        return result('changed', 'phash', ratio, diff_path,
+                      f"perceptual hash distance {distance}/{HASH_SIZE ** 2}, {ratio * 100:.3f}% of pixels differ")
+    return result('changed', 'pixels', ratio, diff_path, f"{ratio * 100:.3f}% of pixels differ")
+
+
+def masks_apply(name, masks):
+    """A masked image never short-circuits on the whole-image hash."""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in masks)
+
+
+def compare_all(screenshots_dir=SCREENSHOTS_DIR, baselines_dir=BASELINES_DIR, masks=None,
+                tolerance=DEFAULT_TOLERANCE, max_diff_ratio=DEFAULT_MAX_DIFF_RATIO, names=None):
+    """Compare every PNG in screenshots_dir (or only `names`) with its baseline."""
+    masks = masks or {}
+    manifest = load_manifest(baselines_dir)
+    known = dict(manifest)
+    if names is None:
+        names = sorted(n for n in os.listdir(screenshots_dir) if n.lower().endswith('.png'))
+    results = [
+        compare_image(os.path.join(screenshots_dir, name), baselines_dir, manifest, masks, tolerance, max_diff_ratio)
+        for name in names
+    ]
+    if manifest != known:
+        save_manifest(baselines_dir, manifest)
+    return results
+
+
+def approve(names, screenshots_dir=SCREENSHOTS_DIR, baselines_dir=BASELINES_DIR):
+    """Copy screenshots into the baselines and refresh their manifest entries."""
+    os.makedirs(baselines_dir, exist_ok=True)
+    manifest = load_manifest(baselines_dir)
+    for name in names:
+        source = os.path.join(screenshots_dir, name)
+        target = os.path.join(baselines_dir, name)
+        shutil.copyfile(source, target)
+        manifest[name] = image_signature(target)
+        print(f"✅ Approved {name}")
+    save_manifest(baselines_dir, manifest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screenshot visual regression against stored baselines')
+    parser.add_argument('action', choices=['compare', 'approve'])
+    parser.add_argument('names', nargs='*', help='Screenshot file names (default: all PNGs)')
+    parser.add_argument('--all', action='store_true', help='approve: promote every screenshot')
+    parser.add_argument('--screenshots', default=SCREENSHOTS_DIR, help=f'Screenshot directory (default: {SCREENSHOTS_DIR})')
+    parser.add_argument('--baselines', default=BASELINES_DIR, help=f'Baseline directory (default: {BASELINES_DIR})')
+    parser.add_argument('--masks', help='JSON file of ignored rectangles per screenshot pattern')
+    parser.add_argument('--tolerance', type=int, default=DEFAULT_TOLERANCE,
+                        help=f'Per-channel difference treated as equal, 0-255 (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--max-diff-ratio', type=float, default=DEFAULT_MAX_DIFF_RATIO,
+                        help=f'Share of pixels allowed to differ (default: {DEFAULT_MAX_DIFF_RATIO})')
+    args = parser.parse_args()
+
+    if args.action == 'approve':
+        names = args.names
+        if args.all:
+            names = sorted(n for n in os.listdir(args.screenshots) if n.lower().endswith('.png'))
+        if not names:
+            parser.error('approve needs screenshot names or --all')
+        approve(names, args.screenshots, args.baselines)
+        return
+
+    results = compare_all(args.screenshots, args.baselines, load_masks(args.masks),
+                          args.tolerance, args.max_diff_ratio, args.names or None)
+    icons = {'unchanged': '✅', 'changed': '❌', 'new': '🆕'}
+    for r in results:
+        line = f"{icons[r.status]} {r.name}: {r.status} ({r.stage}, {r.elapsed * 1000:.0f}ms)"
+        if r.details:
+            line += f" - {r.details}"
+        print(line)
+        if r.diff_path:
+            print(f"    diff: {r.diff_path}")
+
+    changed = sum(1 for r in results if r.status == 'changed')
+    new = sum(1 for r in results if r.status == 'new')
+    print(f"\n{len(results)} screenshot(s): {changed} changed, {new} without baseline")
+    sys.exit(1 if changed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,11 +14,14 @@ Usage:
       -- python test.py
 """
 
+import os
+import signal
 import subprocess
 import socket
 import time
 import sys
 import argparse
+from contextlib import contextmanager
 
 def is_server_ready(port, timeout=30):
     """Wait for server to be ready by polling the port."""
@@ -32,6 +35,87 @@ def is_server_ready(port, timeout=30):
     return False
 
 
+def start_servers(servers, timeout=30, output=subprocess.PIPE):
+    """
+    Start servers in order, waiting for each port before starting the next.
+
+    Args:
+        servers: list of {'cmd': str, 'port': int}, optionally with 'env': {name: value} overrides
+                 and 'cwd' to run the command in
+        output: where server stdout/stderr go (PIPE, DEVNULL or an open file)
+
+    Returns:
+        list of Popen processes (already stopped again if one failed to start)
+    """
+    server_processes = []
+    try:
+        for i, server in enumerate(servers):
+            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
+
+            # Use shell=True to support commands with cd and &&. The server gets its own
+            # process group so stop_servers() also stops what the shell spawned (npm -> node).
+            process = subprocess.Popen(
+                server['cmd'],
+                shell=True,
+                stdout=output,
+                stderr=output,
+                env={**os.environ, **server['env']} if server.get('env') else None,
+                cwd=server.get('cwd'),
+                start_new_session=os.name == 'posix'
+            )
+            server_processes.append(process)
+
+            # Wait for this server to be ready
+            print(f"Waiting for server on port {server['port']}...")
+            if not is_server_ready(server['port'], timeout=timeout):
+                raise RuntimeError(f"Server failed to start on port {server['port']} within {timeout}s")
+
+            print(f"Server ready on port {server['port']}")
+    except BaseException:
+        stop_servers(server_processes)
+        raise
+
+    print(f"\nAll {len(servers)} server(s) ready")
+    return server_processes
+
+
+def _signal_server(process, sig):
+    """Signal the server's whole process group (just the shell on Windows)."""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def stop_servers(server_processes):
+    """Terminate servers, killing any that do not exit within 5 seconds."""
+    print(f"\nStopping {len(server_processes)} server(s)...")
+    for i, process in enumerate(server_processes):
+        try:
+            _signal_server(process, signal.SIGTERM)
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _signal_server(process, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            process.wait()
+        print(f"Server {i+1} stopped")
+    print("All servers stopped")
+
+
+@contextmanager
+def servers_running(servers, timeout=30, output=subprocess.PIPE):
+    """Context manager form of start_servers/stop_servers, for test fixtures."""
+    server_processes = start_servers(servers, timeout, output)
+    try:
+        yield server_processes
+    finally:
+        stop_servers(server_processes)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Run command with one or more servers')
     parser.add_argument('--server', action='append', dest='servers', required=True, help='Server command (can be repeated)')
@@ -58,48 +142,11 @@ def main():
     for cmd, port in zip(args.servers, args.ports):
         servers.append({'cmd': cmd, 'port': port})
 
-    server_processes = []
-
-    try:
-        # Start all servers
-        for i, server in enumerate(servers):
-            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
-
-            # Use shell=True to support commands with cd and &&
-            process = subprocess.Popen(
-                server['cmd'],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            server_processes.append(process)
-
-            # Wait for this server to be ready
-            print(f"Waiting for server on port {server['port']}...")
-            if not is_server_ready(server['port'], timeout=args.timeout):
-                raise RuntimeError(f"Server failed to start on port {server['port']} within {args.timeout}s")
-
-            print(f"Server ready on port {server['port']}")
-
-        print(f"\nAll {len(servers)} server(s) ready")
-
+    with servers_running(servers, timeout=args.timeout):
         # Run the command
         print(f"Running: {' '.join(args.command)}\n")
         result = subprocess.run(args.command)
-        sys.exit(result.returncode)
-
-    finally:
-        # Clean up all servers
-        print(f"\nStopping {len(server_processes)} server(s)...")
-        for i, process in enumerate(server_processes):
-            try:
-                process.terminate()
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            print(f"Server {i+1} stopped")
-        print("All servers stopped")
+    sys.exit(result.returncode)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,338 @@
+"""
+FitConnect Soak Test
+Loops the existing suites (test_api.py and test_fitconnect.py) for hours
+against one server and watches it for slow degradation:
+- server RSS, summed over the process tree on the port
+- V8 heap used, when the server runs with the inspector (--inspect)
+- latency of probe requests sent at a steady rate from a logged-in session
+- suite iteration time and check failures
+
+Samples are taken every --sample-interval seconds. After a warm-up period, a
+least-squares trend line is fitted to each series. The run fails when RSS or
+heap grow faster than the MB/hour thresholds, or when probe p95 drifts by more
+than --max-p95-drift percent per hour. The report is a compact columnar time
+series plus the fitted trends (screenshots/soak_report.json). Ctrl-C ends the
+run early and still reports.
+
+Usage:
+    python soak.py --duration 4h                                         # server already running
+    python soak.py --server "cd .. && npm run build && npm run start" --inspect --duration 8h
+    python soak.py --suites api --duration 30m --sample-interval 15 --warmup 5m
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import nullcontext, redirect_stdout
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, LatencyStats, SEEDED_CLIENTS, linear_slope, virtual_ip
+from node_inspector import DEFAULT_PORTS, heap_usage
+from proc_stats import find_listening_pid, process_tree, rss_bytes
+from suite_runner import ResultLog, run_suite
+from with_server import servers_running
+
+BASE_URL = 'http://localhost:3000'
+SUITES = ['api', 'browser']
+DEFAULT_PROBES = ['/api/auth/me', '/api/coaches?limit=5', '/']
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+SPARK = '▁▂▃▄▅▆▇█'
+
+
+def parse_duration(text):
+    """'90s', '30m', '4h', '1h30m' or plain seconds -> seconds"""
+    if re.fullmatch(r'\d+(\.\d+)?', text):
+        return float(text)
+    parts = re.findall(r'(\d+(?:\.\d+)?)([hms])', text)
+    if not parts or ''.join(n + u for n, u in parts) != text:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text}")
+    return sum(float(n) * {'h': 3600, 'm': 60, 's': 1}[u] for n, u in parts)
+
+
+def sparkline(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return ''.join(SPARK[min(len(SPARK) - 1, int((v - low) / span * len(SPARK)))] for v in values)
+
+
+class Monitor:
+    """Background thread: steady probe traffic plus a resource sample every interval."""
+
+    def __init__(self, base_url, probes, probe_interval, sample_interval, pid, inspect_ports):
+        self.probes = probes
+        self.probe_interval = probe_interval
+        self.sample_interval = sample_interval
+        self.pid = pid
+        self.inspect_ports = inspect_ports
+        self.out = sys.stdout     # the workload redirects stdout while suites run
+        self.client = ApiClient(base_url, client_ip=virtual_ip(700))
+        self.samples = []
+        self.started = time.perf_counter()
+        self._window = LatencyStats()
+        self._errors = 0
+        self._iterations = []     # (suite, seconds, failed checks) since the last sample
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        if not self.client.login(SEEDED_CLIENTS[0]):
+            print(f"⚠️  Probe session could not log in {SEEDED_CLIENTS[0]}; /api/auth/me will measure the 401 path")
+        self._thread.start()
+
+    def record_iteration(self, suite, seconds, failed):
+        with self._lock:
+            self._iterations.append((suite, seconds, failed))
+
+    def _probe_once(self):
+        for path in self.probes:
+            try:
+                response = self.client.get(path)
+                self._window.add(path, response.elapsed)
+                if response.status >= 500:
+                    self._errors += 1
+            except Exception:
+                self._errors += 1
+
+    def _sample(self):
+        window, self._window = self._window, LatencyStats()
+        errors, self._errors = self._errors, 0
+        with self._lock:
+            iterations, self._iterations = self._iterations, []
+        overall = window.summary()
+        rss = rss_bytes(process_tree(self.pid)) / 2 ** 20 if self.pid else None
+        heap = heap_usage(self.inspect_ports) if self.inspect_ports else None
+        sample = {
+            't': round(time.perf_counter() - self.started, 1),
+            'rss_mb': round(rss, 1) if rss else None,
+            'heap_mb': heap['used_mb'] if heap else None,
+            'p50_ms': overall['p50_ms'] if overall['count'] else None,
+            'p95_ms': overall['p95_ms'] if overall['count'] else None,
+            'probes': overall['count'],
+            'probe_errors': errors,
+            'iterations': len(iterations),
+            'iteration_s': round(sum(s for _, s, _ in iterations) / len(iterations), 2) if iterations else None,
+            'failed_checks': sum(f for _, _, f in iterations),
+        }
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        next_sample = time.perf_counter() + self.sample_interval
+        while not self._stop.is_set():
+            self._probe_once()
+            if time.perf_counter() >= next_sample:
+                sample = self._sample()
+                next_sample += self.sample_interval
+                print(f"  [{sample['t'] / 60:6.1f}m] rss {sample['rss_mb'] or '-'}MB heap {sample['heap_mb'] or '-'}MB "
+                      f"p95 {sample['p95_ms'] or '-'}ms iterations {sample['iterations']} "
+                      f"failed checks {sample['failed_checks']}", file=self.out, flush=True)
+            self._stop.wait(self.probe_interval)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.client.close()
+
+
+def load_suites(names):
+    suites = []
+    if 'api' in names:
+        from test_api import TESTS as API_TESTS
+        suites.append(('api', API_TESTS))
+    if 'browser' in names:
+        from test_fitconnect import TESTS as BROWSER_TESTS
+        suites.append(('browser', BROWSER_TESTS))
+    return suites
+
+
+def run_workload(suites, monitor, deadline, recycle, base_url=BASE_URL):
+    """Loop the suites in this thread (Playwright sync objects stay on their thread) until the deadline"""
+    from playwright.sync_api import sync_playwright
+
+    iterations = 0
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            while time.time() < deadline:
+                for name, tests in suites:
+                    # The suites use relative URLs, resolved against the context's base_url
+                    context = browser.new_context(base_url=base_url)
+                    page = context.new_page()
+                    log = ResultLog(name)
+                    start = time.perf_counter()
+                    # The suites print every check; keep the soak output to one line per sample
+                    with redirect_stdout(io.StringIO()):
+                        run_suite(log, tests, page)
+                    monitor.record_iteration(name, time.perf_counter() - start, len(log.failures()))
+                    context.close()
+                iterations += 1
+                if recycle and iterations % recycle == 0:
+                    # A long-lived browser grows too; restart it so client-side growth cannot mask the server's
+                    browser.close()
+                    browser = p.chromium.launch(headless=True)
+        finally:
+            browser.close()
+    return iterations
+
+
+def fit_trend(samples, key, warmup):
+    """Slope per hour and fitted start value of one series, ignoring the warm-up"""
+    points = [(s['t'] / 3600, s[key]) for s in samples if s['t'] >= warmup and s[key] is not None]
+    if len(points) < 3:
+        return None
+    slope = linear_slope(points)
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    start = mean_y + slope * (points[0][0] - mean_x)
+    return {'slope_per_hour': round(slope, 2), 'start': round(start, 2), 'points': len(points)}
+
+
+def analyze(samples, warmup, max_rss_growth, max_heap_growth, max_p95_drift):
+    trends = {key: fit_trend(samples, key, warmup) for key in ('rss_mb', 'heap_mb', 'p95_ms', 'iteration_s')}
+    verdicts = []
+
+    def check(name, value, limit, unit):
+        if value is None or limit is None:
+            return
+        verdicts.append({'check': name, 'value': value, 'limit': limit, 'unit': unit, 'passed': value <= limit})
+
+    if trends['rss_mb']:
+        check('rss growth', trends['rss_mb']['slope_per_hour'], max_rss_growth, 'MB/h')
+    if trends['heap_mb']:
+        check('heap growth', trends['heap_mb']['slope_per_hour'], max_heap_growth, 'MB/h')
+    if trends['p95_ms'] and trends['p95_ms']['start'] > 0:
+        drift = trends['p95_ms']['slope_per_hour'] / trends['p95_ms']['start'] * 100
+        trends['p95_ms']['drift_pct_per_hour'] = round(drift, 1)
+        check('p95 drift', round(drift, 1), max_p95_drift, '%/h')
+    return trends, verdicts
+
+
+def run_soak(base_url=BASE_URL, duration=3600, suites=None, server_cmd=None, server_timeout=120, inspect=False,
+             inspect_ports=DEFAULT_PORTS, probes=None, probe_interval=1.0, sample_interval=60, warmup=600,
+             max_rss_growth=50.0, max_heap_growth=20.0, max_p95_drift=25.0, recycle=50):
+    """Run the soak and return the report dict"""
+    suites = SUITES if suites is None else suites
+    probes = probes or DEFAULT_PROBES
+    port = urlsplit(base_url).port or 80
+    print("=" * 60)
+    print("FITCONNECT SOAK TEST")
+    print("=" * 60)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    server_log = open(os.path.join(RESULTS_DIR, 'soak_server.log'), 'ab') if server_cmd else None
+    if server_cmd:
+        env = {'NODE_OPTIONS': f"{os.environ.get('NODE_OPTIONS', '')} --inspect".strip()} if inspect else None
+        lifecycle = servers_running([{'cmd': server_cmd, 'port': port, 'env': env}], server_timeout, server_log)
+    else:
+        lifecycle = nullcontext()
+
+    interrupted = False
+    with lifecycle:
+        pid = find_listening_pid(port)
+        ports = inspect_ports if (inspect or heap_usage(inspect_ports)) else None
+        print(f"\nServer pid: {pid or 'not found (RSS not sampled)'} | heap: "
+              f"{'inspector on ' + ','.join(map(str, ports)) if ports else 'no inspector (use --inspect)'}")
+        print(f"Suites: {', '.join(suites)} | {duration / 3600:.2f}h, sample every {sample_interval}s, "
+              f"warm-up {warmup / 60:.0f}m\n")
+
+        monitor = Monitor(base_url, probes, probe_interval, sample_interval, pid, ports)
+        monitor.start()
+        deadline = time.time() + duration
+        iterations = 0
+        try:
+            if suites:
+                iterations = run_workload(load_suites(suites), monitor, deadline, recycle, base_url)
+            else:
+                while time.time() < deadline:
+                    time.sleep(1)
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\n⏹️  Interrupted - analysing what was collected")
+        finally:
+            monitor.stop()
+    if server_log:
+        server_log.close()
+
+    samples = monitor.samples
+    trends, verdicts = analyze(samples, warmup, max_rss_growth, max_heap_growth, max_p95_drift)
+
+    print("\n" + "=" * 60)
+    print("SOAK SUMMARY")
+    print("=" * 60)
+    elapsed = samples[-1]['t'] if samples else 0
+    print(f"\nRan {elapsed / 3600:.2f}h, {len(samples)} sample(s), {iterations} suite iteration(s), "
+          f"{sum(s['failed_checks'] for s in samples)} failed check(s), "
+          f"{sum(s['probe_errors'] for s in samples)} probe error(s)")
+    for key, label in (('rss_mb', 'RSS MB'), ('heap_mb', 'heap MB'), ('p95_ms', 'probe p95 ms'),
+                       ('iteration_s', 'iteration s')):
+        trend = trends[key]
+        line = sparkline([s[key] for s in samples])
+        if trend:
+            print(f"  {label:<13} {line}  {trend['slope_per_hour']:+}/h from {trend['start']}")
+        elif line:
+            print(f"  {label:<13} {line}  (too few samples after warm-up for a trend)")
+    for verdict in verdicts:
+        mark = '✅' if verdict['passed'] else '❌'
+        print(f"{mark} {verdict['check']}: {verdict['value']}{verdict['unit']} (limit {verdict['limit']}{verdict['unit']})")
+    if not verdicts:
+        print("⚠️  Not enough samples after the warm-up to judge trends")
+
+    columns = list(samples[0]) if samples else []
+    report = {
+        'config': {'base_url': base_url, 'duration_s': duration, 'suites': suites, 'probes': probes,
+                   'probe_interval_s': probe_interval, 'sample_interval_s': sample_interval, 'warmup_s': warmup,
+                   'thresholds': {'rss_mb_per_hour': max_rss_growth, 'heap_mb_per_hour': max_heap_growth,
+                                  'p95_drift_pct_per_hour': max_p95_drift},
+                   'server_cmd': server_cmd, 'server_pid': pid},
+        'interrupted': interrupted,
+        'iterations': iterations,
+        'series': {column: [s[column] for s in samples] for column in columns},
+        'trends': trends,
+        'verdicts': verdicts,
+        'passed': bool(verdicts) and all(v['passed'] for v in verdicts),
+    }
+    results_file = os.path.join(RESULTS_DIR, 'soak_report.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, separators=(',', ':'))
+    print(f"\n📄 Results saved to: {results_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Loop the suites for hours and fail on memory growth or latency drift')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--duration', type=parse_duration, default=3600, help='How long to run, e.g. 30m, 4h (default: 1h)')
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"Comma-separated suites to loop, empty for probes only (default: {','.join(SUITES)})")
+    parser.add_argument('--server', help='Start the server with this command via with_server.py (default: expect it running)')
+    parser.add_argument('--server-timeout', type=int, default=120, help='Seconds to wait for the server (default: 120)')
+    parser.add_argument('--inspect', action='store_true', help='Start the server with NODE_OPTIONS=--inspect to sample heap')
+    parser.add_argument('--inspect-ports', default=','.join(map(str, DEFAULT_PORTS)),
+                        help=f"Inspector ports to read heap from (default: {','.join(map(str, DEFAULT_PORTS))})")
+    parser.add_argument('--probe', help=f"Comma-separated probe paths (default: {','.join(DEFAULT_PROBES)})")
+    parser.add_argument('--probe-interval', type=float, default=1.0, help='Seconds between probe rounds (default: 1)')
+    parser.add_argument('--sample-interval', type=float, default=60, help='Seconds between samples (default: 60)')
+    parser.add_argument('--warmup', type=parse_duration, default=600, help='Ignore this much at the start for trends (default: 10m)')
+    parser.add_argument('--max-rss-growth', type=float, default=50.0, help='RSS growth limit in MB/hour (default: 50)')
+    parser.add_argument('--max-heap-growth', type=float, default=20.0, help='Heap growth limit in MB/hour (default: 20)')
+    parser.add_argument('--max-p95-drift', type=float, default=25.0, help='Probe p95 drift limit in %%/hour (default: 25)')
+    parser.add_argument('--recycle', type=int, default=50, help='Relaunch the browser every N iterations, 0 never (default: 50)')
+    args = parser.parse_args()
+    suites = [s for s in args.suites.split(',') if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+    report = run_soak(args.base_url, args.duration, suites, args.server, args.server_timeout, args.inspect,
+                      [int(p) for p in args.inspect_ports.split(',')], args.probe.split(',') if args.probe else None,
+                      args.probe_interval, args.sample_interval, args.warmup, args.max_rss_growth,
+                      args.max_heap_growth, args.max_p95_drift, args.recycle)
+    sys.exit(0 if report['passed'] else 1)
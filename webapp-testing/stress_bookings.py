@@ -0,0 +1,324 @@
+"""
+FitConnect Booking Concurrency Stress Harness
+Fires concurrent create/cancel/reschedule storms at a shared set of slots of
+one coach through /api/bookings/create-intent, /api/bookings/[id]/cancel and
+/api/bookings/[id]/reschedule, then checks the coach's calendar for
+overlapping active bookings.
+
+Slots are spaced by half the package duration, so competing requests have
+different start times and only the overlap query (not the
+@@unique([coachId, startTime]) constraint) can keep them apart.
+
+Storms are planned up front from --seed: the same seed gives the same clients,
+slots and operations in every wave. Cancels and reschedules name the create
+whose booking they act on by its handle (its index in the plan), resolved to
+a booking id at run time; one whose create lost its race, or was already
+cancelled, is counted as 'unresolved' instead of sent. The target coach must have completed Stripe setup
+(stripeOnboarded) for create-intent to accept bookings.
+
+Usage:
+    python stress_bookings.py --clients 12 --slots 6 --waves 4 --seed 1
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import (ApiClient, DEMO_PASSWORD, LatencyStats, SEEDED_CLIENTS, format_summary,
+                       parse_json, run_concurrently, virtual_ip)
+
+BASE_URL = 'http://localhost:3000'
+ACTIVE_STATUSES = ('CONFIRMED', 'PENDING_PAYMENT')
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def iso(dt):
+    return dt.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+def login_clients(base_url, count, seed):
+    """Log in the seeded clients, registering deterministic extra clients up to count"""
+    clients = []
+    emails = list(SEEDED_CLIENTS[:count])
+    emails += [f"stress_{seed}_{i}@example.com" for i in range(count - len(emails))]
+    for i, email in enumerate(emails):
+        client = ApiClient(base_url, client_ip=virtual_ip(100 + i))
+        user = client.login(email)
+        if not user and email not in SEEDED_CLIENTS:
+            client.post('/api/auth/register', json_body={'email': email, 'password': DEMO_PASSWORD, 'role': 'CLIENT'})
+            user = client.login(email)
+        if user:
+            clients.append(client)
+        else:
+            print(f"    ⚠️  Could not log in {email}")
+    return clients
+
+def fetch_coach_calendar(coach):
+    """All bookings of the logged-in coach"""
+    bookings = []
+    page = 1
+    while True:
+        data = parse_json(coach.get(f'/api/coach/bookings?upcoming=true&limit=100&page={page}')) or {}
+        bookings.extend(data.get('data', []))
+        if page >= data.get('pagination', {}).get('totalPages', 1):
+            return bookings
+        page += 1
+
+def find_overlaps(bookings):
+    """Pairs of active bookings whose [startTime, endTime) windows intersect"""
+    active = sorted(
+        ((parse_time(b['startTime']), parse_time(b['endTime']), b['id']) for b in bookings if b['status'] in ACTIVE_STATUSES),
+    )
+    overlaps = []
+    for i, (start, end, booking_id) in enumerate(active):
+        for other_start, _other_end, other_id in active[i + 1:]:
+            if other_start >= end:
+                break
+            overlaps.append((booking_id, other_id))
+    return overlaps
+
+class StormState:
+    """Booking ids behind the plan's create handles, and the bookings each client holds"""
+
+    def __init__(self, clients):
+        self.lock = threading.Lock()
+        self.held = {i: set() for i in range(len(clients))}
+        self.handles = {}
+        self.cancelled = set()
+
+    def add(self, client_index, booking_id, handle=None):
+        with self.lock:
+            self.held[client_index].add(booking_id)
+            if handle is not None:
+                self.handles[handle] = booking_id
+
+    def remove(self, client_index, booking_id):
+        with self.lock:
+            self.held[client_index].discard(booking_id)
+            self.cancelled.add(booking_id)
+
+    def resolve(self, handle):
+        """Booking id a create handle won, or None if it lost or was cancelled"""
+        with self.lock:
+            booking_id = self.handles.get(handle)
+            return None if booking_id in self.cancelled else booking_id
+
+    def snapshot(self):
+        with self.lock:
+            return {i: sorted(ids) for i, ids in self.held.items()}
+
+def plan_storm(rng, client_count, slots, waves, ops, mix):
+    """
+    Draw every wave's operations from the seeded rng before anything is sent.
+
+    The first wave only creates. Each create is a handle (its index in the plan);
+    later waves cancel or reschedule handles their client created in earlier
+    waves, so the plan does not depend on which requests win their races.
+
+    Returns:
+        List of waves, each a list of (kind, client index, handle, slot)
+    """
+    kinds, weights = zip(*mix.items())
+    planned = {i: [] for i in range(client_count)}
+    storm = []
+    handle = 0
+    for wave in range(waves):
+        held = {i: list(handles) for i, handles in planned.items()}
+        plan = []
+        for _ in range(ops):
+            client_index = rng.randrange(client_count)
+            kind = rng.choices(kinds, weights)[0] if wave else 'create'
+            if kind != 'create' and not held[client_index]:
+                kind = 'create'
+            slot = rng.choice(slots)
+            if kind == 'create':
+                plan.append((kind, client_index, handle, slot))
+                planned[client_index].append(handle)
+                handle += 1
+                continue
+            target = rng.choice(held[client_index])
+            if kind == 'cancel':
+                held[client_index].remove(target)
+                planned[client_index].remove(target)
+            plan.append((kind, client_index, target, slot))
+        storm.append(plan)
+    return storm
+
+def run_booking_stress(base_url=BASE_URL, coach_email='sarah@example.com', client_count=12, slot_count=6,
+                       waves=4, ops_per_wave=48, concurrency=24, seed=1, day_offset=14, cleanup=True):
+    """Run the stress harness and return the report dict"""
+    print("=" * 60)
+    print("FITCONNECT BOOKING CONCURRENCY STRESS HARNESS")
+    print("=" * 60)
+
+    rng = random.Random(seed)
+
+    print("\n=== Setting Up ===")
+    coach = ApiClient(base_url, client_ip=virtual_ip(99))
+    coach_user = coach.login(coach_email)
+    if not coach_user:
+        print(f"❌ Could not log in coach {coach_email}")
+        return None
+    listing = parse_json(ApiClient(base_url).get('/api/coaches?limit=100')) or {}
+    profile = next((c for c in listing.get('data', []) if c['userId'] == coach_user.get('id')), None)
+    if not profile or not profile.get('packages'):
+        print(f"❌ {coach_email} has no public profile with active packages")
+        return None
+    package = profile['packages'][0]
+    duration = datetime.timedelta(minutes=package['durationMins'])
+
+    clients = login_clients(base_url, client_count, seed)
+    day = datetime.datetime.now(datetime.timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0)
+    day += datetime.timedelta(days=day_offset)
+    slots = [day + i * duration / 2 for i in range(slot_count)]
+    print(f"    Coach {profile['displayName']} ({package['title']}, {package['durationMins']} min)")
+    print(f"    {len(clients)} clients, {slot_count} slots from {iso(slots[0])} every {package['durationMins'] // 2} min")
+
+    stats = LatencyStats()
+    state = StormState(clients)
+    outcomes = {}
+    outcomes_lock = threading.Lock()
+
+    def count(key):
+        with outcomes_lock:
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+    def execute(op, label_prefix, handle=None):
+        kind, client_index, booking_id, slot = op
+        client = clients[client_index]
+        if kind == 'create':
+            response = client.post('/api/bookings/create-intent', json_body={
+                'coachId': profile['id'], 'packageId': package['id'], 'startTime': iso(slot)})
+            body = parse_json(response) or {}
+            if response.status == 201 and body.get('bookingId'):
+                state.add(client_index, body['bookingId'], handle)
+        elif kind == 'cancel':
+            response = client.post(f'/api/bookings/{booking_id}/cancel', json_body={'reason': 'stress test'})
+            if response.status == 200:
+                state.remove(client_index, booking_id)
+        else:
+            response = client.post(f'/api/bookings/{booking_id}/reschedule', json_body={'startTime': iso(slot)})
+        stats.add(f"{label_prefix}:{kind}", response.elapsed)
+        count(f"{kind} {response.status}")
+        return response.status
+
+    # Uncontended baseline: one request at a time on slots far away from the storm
+    print("\n=== Baseline (serial, uncontended) ===")
+    baseline_slots = [day + datetime.timedelta(days=1) + i * duration * 2 for i in range(min(4, len(clients)))]
+    baseline_plan = [('create', i, None, slot) for i, slot in enumerate(baseline_slots)]
+    for op in baseline_plan:
+        status = execute(op, 'baseline')
+        if status == 400:
+            print("❌ create-intent returned 400 - is the coach Stripe-onboarded and the slot in the future?")
+    held = state.snapshot()
+    for i, _slot in enumerate(baseline_slots):
+        for booking_id in held[i]:
+            execute(('cancel', i, booking_id, None), 'baseline')
+    print(f"    {format_summary('baseline', stats.summary('baseline:create'))}")
+
+    mix = {'create': 6, 'cancel': 2, 'reschedule': 2}
+    storm_plan = plan_storm(rng, len(clients), slots, waves, ops_per_wave, mix)
+    violations = []
+    wave_reports = []
+    for wave, plan in enumerate(storm_plan):
+        parties = min(concurrency, len(plan))
+        barrier = threading.Barrier(parties)
+
+        def fire(item, barrier=barrier, parties=parties):
+            index, op = item
+            # Line the first batch up so it hits the server at the same instant
+            if index < parties:
+                try:
+                    barrier.wait(timeout=5)
+                except threading.BrokenBarrierError:
+                    pass
+            kind, client_index, handle, slot = op
+            if kind == 'create':
+                return execute(op, 'storm', handle)
+            booking_id = state.resolve(handle)
+            if booking_id is None:
+                count(f"{kind} unresolved")
+                return None
+            return execute((kind, client_index, booking_id, slot), 'storm')
+
+        start = time.perf_counter()
+        run_concurrently(fire, list(enumerate(plan)), concurrency)
+        wall = time.perf_counter() - start
+
+        calendar = fetch_coach_calendar(coach)
+        overlaps = find_overlaps(calendar)
+        resurrected = sorted(b['id'] for b in calendar if b['status'] in ACTIVE_STATUSES and b['id'] in state.cancelled)
+        seen = {tuple(v['bookings']) for v in violations}
+        violations.extend({'wave': wave + 1, 'bookings': list(pair)} for pair in overlaps if pair not in seen)
+        wave_reports.append({'wave': wave + 1, 'ops': len(plan), 'wall_s': round(wall, 3),
+                             'active_bookings': sum(1 for b in calendar if b['status'] in ACTIVE_STATUSES),
+                             'overlaps': len(overlaps), 'resurrected': resurrected})
+        status = "✅" if not overlaps and not resurrected else "❌"
+        print(f"{status} Wave {wave + 1}: {len(plan)} ops in {wall:.2f}s, "
+              f"{wave_reports[-1]['active_bookings']} active, {len(overlaps)} overlapping pair(s), "
+              f"{len(resurrected)} cancelled booking(s) active again")
+
+    if cleanup:
+        held = state.snapshot()
+        cleanup_ops = [('cancel', i, b, None) for i, ids in held.items() for b in ids]
+        run_concurrently(lambda op: execute(op, 'cleanup'), cleanup_ops, concurrency)
+
+    baseline = stats.summary('baseline:create')
+    storm = {kind: stats.summary(f'storm:{kind}') for kind in ('create', 'cancel', 'reschedule')}
+    tail_amplification = round(storm['create']['p99_ms'] / baseline['p50_ms'], 2) if baseline['p50_ms'] else None
+
+    print("\n" + "=" * 60)
+    print("BOOKING STRESS SUMMARY")
+    print("=" * 60)
+    print(f"\nSeed: {seed} | Waves: {waves} | Ops/wave: {ops_per_wave} | Concurrency: {concurrency}")
+    print(format_summary('baseline create', baseline))
+    for kind, summary in storm.items():
+        if summary['count']:
+            print(format_summary(f'storm {kind}', summary))
+    if tail_amplification:
+        print(f"Contention tail amplification (storm create p99 / baseline p50): {tail_amplification}x")
+    print("Outcomes: " + ", ".join(f"{k}: {v}" for k, v in sorted(outcomes.items())))
+    if violations:
+        print(f"\n❌ {len(violations)} overlapping booking pair(s) detected")
+    else:
+        print("\n✅ No overlapping bookings")
+
+    report = {
+        'config': {'seed': seed, 'coach': coach_email, 'clients': len(clients), 'slots': [iso(s) for s in slots],
+                   'waves': waves, 'ops_per_wave': ops_per_wave, 'concurrency': concurrency},
+        'baseline': baseline,
+        'storm': storm,
+        'tail_amplification': tail_amplification,
+        'outcomes': outcomes,
+        'waves': wave_reports,
+        'violations': violations,
+    }
+    results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, 'booking_stress.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results saved to: {results_file}")
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Concurrent booking create/cancel/reschedule stress harness')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--coach-email', default='sarah@example.com', help='Coach whose slots are contended')
+    parser.add_argument('--clients', type=int, default=12, help='Competing clients (default: 12)')
+    parser.add_argument('--slots', type=int, default=6, help='Shared slots, half a session apart (default: 6)')
+    parser.add_argument('--waves', type=int, default=4, help='Storm waves (default: 4)')
+    parser.add_argument('--ops', type=int, default=48, help='Operations per wave (default: 48)')
+    parser.add_argument('--concurrency', type=int, default=24, help='Requests in flight (default: 24)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the storm plan (default: 1)')
+    parser.add_argument('--day-offset', type=int, default=14, help='Days ahead to place the slots (default: 14)')
+    parser.add_argument('--no-cleanup', action='store_true', help='Leave the created bookings in place')
+    args = parser.parse_args()
+    report = run_booking_stress(args.base_url, args.coach_email, args.clients, args.slots, args.waves, args.ops,
+                                args.concurrency, args.seed, args.day_offset, not args.no_cleanup)
+    sys.exit(0 if report and not report['violations'] else 1)
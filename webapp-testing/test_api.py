@@ -3,188 +3,147 @@ FitConnect Backend API Test Suite
 Tests all API endpoints for functionality and error handling
 """
 from playwright.sync_api import sync_playwright
-import json
+import argparse
 import os
+import sys
 
-BASE_URL = 'http://localhost:3000'
-RESULTS = []
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from browser_server import launch_browser
+from flaky_tests import record_results
+from suite_runner import ResultLog, log_result, run_suite
 
-def log_result(test_name, passed, details=""):
-    status = "✅ PASS" if passed else "❌ FAIL"
-    print(f"{status}: {test_name}")
-    if details:
-        print(f"    {details}")
-    RESULTS.append({"test": test_name, "passed": passed, "details": details})
+# Requests use relative URLs; the context's base_url (conftest's base_url fixture under pytest) resolves them
+BASE_URL = 'http://localhost:3000'
 
 def test_api_auth_endpoints(page):
     """Test authentication API endpoints"""
     print("\n=== Testing Auth API Endpoints ===")
     
     # Test login endpoint
-    try:
-        response = page.request.post(f'{BASE_URL}/api/auth/login', data={
-            'email': 'alex@example.com',
-            'password': 'password123'
-        })
-        status = response.status
-        body = response.json() if response.ok else response.text()
-        log_result("POST /api/auth/login", status in [200, 401, 500], f"Status: {status}, Response: {str(body)[:200]}")
-    except Exception as e:
-        log_result("POST /api/auth/login", False, str(e))
+    response = page.request.post('/api/auth/login', data={
+        'email': 'alex@example.com',
+        'password': 'password123'
+    })
+    status = response.status
+    body = response.json() if response.ok else response.text()
+    log_result("POST /api/auth/login", status in [200, 401, 500], f"Status: {status}, Response: {str(body)[:200]}")
     
     # Test login with wrong credentials
-    try:
-        response = page.request.post(f'{BASE_URL}/api/auth/login', data={
-            'email': 'wrong@example.com',
-            'password': 'wrongpassword'
-        })
-        status = response.status
-        log_result("POST /api/auth/login (invalid creds)", status == 401 or status == 500, f"Status: {status}")
-    except Exception as e:
-        log_result("POST /api/auth/login (invalid)", False, str(e))
+    response = page.request.post('/api/auth/login', data={
+        'email': 'wrong@example.com',
+        'password': 'wrongpassword'
+    })
+    status = response.status
+    log_result("POST /api/auth/login (invalid creds)", status == 401 or status == 500, f"Status: {status}")
     
     # Test register endpoint
-    try:
-        response = page.request.post(f'{BASE_URL}/api/auth/register', data={
-            'email': f'test_{int(__import__("time").time())}@example.com',
-            'password': 'testpass123',
-            'name': 'Test User',
-            'role': 'CLIENT'
-        })
-        status = response.status
-        body = response.json() if response.ok else response.text()
-        log_result("POST /api/auth/register", status in [200, 201, 400, 500], f"Status: {status}, Response: {str(body)[:200]}")
-    except Exception as e:
-        log_result("POST /api/auth/register", False, str(e))
+    response = page.request.post('/api/auth/register', data={
+        'email': f'test_{int(__import__("time").time())}@example.com',
+        'password': 'testpass123',
+        'name': 'Test User',
+        'role': 'CLIENT'
+    })
+    status = response.status
+    body = response.json() if response.ok else response.text()
+    log_result("POST /api/auth/register", status in [200, 201, 400, 500], f"Status: {status}, Response: {str(body)[:200]}")
     
     # Test me endpoint (unauthenticated)
-    try:
-        response = page.request.get(f'{BASE_URL}/api/auth/me')
-        status = response.status
-        log_result("GET /api/auth/me (unauth)", status == 401 or status == 200, f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/auth/me", False, str(e))
+    response = page.request.get('/api/auth/me')
+    status = response.status
+    log_result("GET /api/auth/me (unauth)", status == 401 or status == 200, f"Status: {status}")
 
 def test_api_coaches_endpoints(page):
     """Test coaches API endpoints"""
     print("\n=== Testing Coaches API Endpoints ===")
     
     # Get coaches list
-    try:
-        response = page.request.get(f'{BASE_URL}/api/coaches')
-        status = response.status
-        if response.ok:
-            data = response.json()
-            coach_count = len(data.get('coaches', data)) if isinstance(data, dict) else len(data)
-            log_result("GET /api/coaches", True, f"Status: {status}, Found {coach_count} coaches")
-        else:
-            log_result("GET /api/coaches", status < 500, f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/coaches", False, str(e))
+    response = page.request.get('/api/coaches')
+    status = response.status
+    if response.ok:
+        data = response.json()
+        coach_count = len(data.get('coaches', data)) if isinstance(data, dict) else len(data)
+        log_result("GET /api/coaches", True, f"Status: {status}, Found {coach_count} coaches")
+    else:
+        log_result("GET /api/coaches", status < 500, f"Status: {status}")
     
     # Get single coach (try ID 1 or first available)
-    try:
-        response = page.request.get(f'{BASE_URL}/api/coaches/1')
-        status = response.status
-        log_result("GET /api/coaches/:id", status in [200, 404], f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/coaches/:id", False, str(e))
+    response = page.request.get('/api/coaches/1')
+    status = response.status
+    log_result("GET /api/coaches/:id", status in [200, 404], f"Status: {status}")
 
 def test_api_user_endpoints(page):
     """Test user API endpoints"""
     print("\n=== Testing User API Endpoints ===")
     
     # Get user profile (requires auth)
-    try:
-        response = page.request.get(f'{BASE_URL}/api/user/profile')
-        status = response.status
-        log_result("GET /api/user/profile", status in [200, 401], f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/user/profile", False, str(e))
+    response = page.request.get('/api/user/profile')
+    status = response.status
+    log_result("GET /api/user/profile", status in [200, 401], f"Status: {status}")
 
 def test_api_bookings_endpoints(page):
     """Test bookings API endpoints"""
     print("\n=== Testing Bookings API Endpoints ===")
     
     # Get bookings (requires auth)
-    try:
-        response = page.request.get(f'{BASE_URL}/api/bookings')
-        status = response.status
-        log_result("GET /api/bookings", status in [200, 401], f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/bookings", False, str(e))
+    response = page.request.get('/api/bookings')
+    status = response.status
+    log_result("GET /api/bookings", status in [200, 401], f"Status: {status}")
 
 def test_api_messages_endpoints(page):
     """Test messages API endpoints"""
     print("\n=== Testing Messages API Endpoints ===")
     
     # Get messages (requires auth)
-    try:
-        response = page.request.get(f'{BASE_URL}/api/messages')
-        status = response.status
-        log_result("GET /api/messages", status in [200, 401], f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/messages", False, str(e))
+    response = page.request.get('/api/messages')
+    status = response.status
+    log_result("GET /api/messages", status in [200, 401], f"Status: {status}")
 
 def test_api_reviews_endpoints(page):
     """Test reviews API endpoints"""
     print("\n=== Testing Reviews API Endpoints ===")
     
-    try:
-        response = page.request.get(f'{BASE_URL}/api/reviews')
-        status = response.status
-        log_result("GET /api/reviews", status in [200, 401, 404], f"Status: {status}")
-    except Exception as e:
-        log_result("GET /api/reviews", False, str(e))
+    response = page.request.get('/api/reviews')
+    status = response.status
+    log_result("GET /api/reviews", status in [200, 401, 404], f"Status: {status}")
 
-def run_api_tests():
+TESTS = [
+    test_api_auth_endpoints,
+    test_api_coaches_endpoints,
+    test_api_user_endpoints,
+    test_api_bookings_endpoints,
+    test_api_messages_endpoints,
+    test_api_reviews_endpoints,
+]
+
+def run_api_tests(base_url=BASE_URL):
     """Run all API tests"""
     print("=" * 60)
     print("FITCONNECT API TEST SUITE")
     print("=" * 60)
+    log = ResultLog('FITCONNECT API TEST SUITE')
     
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
+        browser = launch_browser(p)
+        context = browser.new_context(base_url=base_url)
         page = context.new_page()
         
-        test_api_auth_endpoints(page)
-        test_api_coaches_endpoints(page)
-        test_api_user_endpoints(page)
-        test_api_bookings_endpoints(page)
-        test_api_messages_endpoints(page)
-        test_api_reviews_endpoints(page)
+        run_suite(log, TESTS, page)
         
         browser.close()
     
-    # Print summary
-    print("\n" + "=" * 60)
-    print("API TEST SUMMARY")
-    print("=" * 60)
-    
-    passed = sum(1 for r in RESULTS if r['passed'])
-    failed = sum(1 for r in RESULTS if not r['passed'])
-    total = len(RESULTS)
-    
-    print(f"\nTotal: {total} | Passed: {passed} | Failed: {failed}")
-    print(f"Pass Rate: {(passed/total*100):.1f}%" if total > 0 else "No tests run")
-    
-    if failed > 0:
-        print("\n❌ Failed Tests:")
-        for r in RESULTS:
-            if not r['passed']:
-                print(f"  - {r['test']}: {r['details']}")
+    log.print_summary('API TEST SUMMARY')
     
     # Save results
     results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
-    os.makedirs(results_dir, exist_ok=True)
+    print()
     results_file = os.path.join(results_dir, 'api_test_results.json')
-    with open(results_file, 'w') as f:
-        json.dump({
-            'summary': {'total': total, 'passed': passed, 'failed': failed},
-            'results': RESULTS
-        }, f, indent=2)
-    print(f"\n📄 Results saved to: {results_file}")
+    log.write_json(results_file)
+    record_results(results_file)
+    return log
 
 if __name__ == '__main__':
-    run_api_tests()
+    parser = argparse.ArgumentParser(description='FitConnect API test suite')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    args = parser.parse_args()
+    log = run_api_tests(args.base_url)
+    sys.exit(0 if log.all_passed() else 1)
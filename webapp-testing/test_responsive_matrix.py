@@ -0,0 +1,290 @@
+"""
+FitConnect Responsive Matrix
+Loads every page in a page list on every device profile, one fresh browser
+context per cell, with cells running in parallel. For each cell it records
+the HTTP status, horizontal overflow (page wider than the viewport, plus the
+elements sticking out) and render timing (TTFB, first contentful paint,
+DOMContentLoaded, load, network idle), then prints a pages x devices grid
+and writes JSON and HTML reports.
+
+Pages are paths, optionally prefixed with the seeded role to log in as;
+{coach} is replaced with the first coach profile id:
+    python test_responsive_matrix.py
+    python test_responsive_matrix.py --pages "/,/coaches,client:/dashboard/client" --devices "Mobile,iPhone 13,Pixel 7"
+    python test_responsive_matrix.py --concurrency 8 --budget-ms 3000 --screenshots
+"""
+from playwright.async_api import async_playwright
+import argparse
+import asyncio
+import html
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from browser_server import launch_browser_async
+from http_load import DEMO_PASSWORD, virtual_ip
+
+BASE_URL = 'http://localhost:3000'
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+
+# Same viewports as test_fitconnect.test_responsive_design; any other name is
+# looked up in Playwright's device registry (user agent, scale, touch)
+VIEWPORTS = {
+    'Desktop': {'viewport': {'width': 1920, 'height': 1080}},
+    'Tablet': {'viewport': {'width': 768, 'height': 1024}},
+    'Mobile': {'viewport': {'width': 375, 'height': 667}},
+}
+DEFAULT_DEVICES = ['Desktop', 'Tablet', 'Mobile', 'iPhone 13', 'Pixel 7']
+DEFAULT_PAGES = [
+    '/',
+    '/coaches',
+    '/coaches/{coach}',
+    'client:/booking/{coach}',
+    'client:/dashboard/client',
+    'client:/messages',
+    'coach:/dashboard/coach',
+    'coach:/dashboard/coach/bookings',
+]
+ROLE_ACCOUNTS = {'client': 'alex@example.com', 'coach': 'sarah@example.com'}
+
+MEASURE_JS = """() => {
+    const root = document.documentElement;
+    const viewport = root.clientWidth;
+    const clips = el => {
+        for (let node = el.parentElement; node && node !== document.body; node = node.parentElement) {
+            const overflowX = getComputedStyle(node).overflowX;
+            if (overflowX !== 'visible') return true;
+        }
+        return false;
+    };
+    const describe = el => el.tagName.toLowerCase() + (el.id ? '#' + el.id : '') +
+        (typeof el.className === 'string' && el.className.trim()
+            ? '.' + el.className.trim().split(/\\s+/).slice(0, 2).join('.') : '');
+    const offenders = [];
+    for (const el of document.body.querySelectorAll('*')) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width > 0 && (rect.right > viewport + 1 || rect.left < -1) && !clips(el)) {
+            offenders.push({element: describe(el), right: Math.round(rect.right), width: Math.round(rect.width)});
+            if (offenders.length >= 5) break;
+        }
+    }
+    const nav = performance.getEntriesByType('navigation')[0] || {};
+    const paint = performance.getEntriesByType('paint').find(p => p.name === 'first-contentful-paint');
+    return {
+        viewport_width: viewport,
+        scroll_width: root.scrollWidth,
+        overflow_px: Math.max(0, root.scrollWidth - viewport),
+        offenders,
+        ttfb_ms: Math.round(nav.responseStart || 0),
+        fcp_ms: paint ? Math.round(paint.startTime) : null,
+        dom_content_loaded_ms: Math.round(nav.domContentLoadedEventEnd || 0),
+        load_ms: Math.round(nav.loadEventEnd || 0),
+    };
+}"""
+
+
+def parse_page(spec):
+    """'coach:/dashboard/coach' -> ('coach', '/dashboard/coach')"""
+    role, sep, path = spec.partition(':')
+    if sep and role in ROLE_ACCOUNTS:
+        return role, path
+    return None, spec
+
+
+def device_options(playwright, name):
+    if name in VIEWPORTS:
+        return dict(VIEWPORTS[name])
+    if name in playwright.devices:
+        options = dict(playwright.devices[name])
+        options.pop('default_browser_type', None)
+        return options
+    raise ValueError(f"Unknown device profile: {name}")
+
+
+async def role_storage_states(browser, base_url, roles):
+    """Log each role in once and return {role: storage_state} for reuse by every cell"""
+    states = {}
+    for i, role in enumerate(sorted(roles)):
+        context = await browser.new_context()
+        response = await context.request.post(
+            f"{base_url}/api/auth/login",
+            data={'email': ROLE_ACCOUNTS[role], 'password': DEMO_PASSWORD},
+            headers={'X-Forwarded-For': virtual_ip(200 + i)},
+        )
+        if response.ok:
+            states[role] = await context.storage_state()
+        else:
+            print(f"⚠️  Could not log in as {role} ({response.status})")
+        await context.close()
+    return states
+
+
+async def first_coach_id(browser, base_url):
+    context = await browser.new_context()
+    try:
+        response = await context.request.get(f"{base_url}/api/coaches?limit=1")
+        data = await response.json() if response.ok else {}
+        coaches = data.get('data') or []
+        return coaches[0]['id'] if coaches else None
+    finally:
+        await context.close()
+
+
+async def run_cell(browser, semaphore, base_url, page_spec, device, options, storage_state,
+                   coach_id, budget_ms, screenshots):
+    role, path = parse_page(page_spec)
+    cell = {'page': page_spec, 'device': device, 'passed': False, 'problems': []}
+    if '{coach}' in path:
+        if not coach_id:
+            cell['problems'].append('no coach profile to fill {coach}')
+            return cell
+        path = path.replace('{coach}', coach_id)
+    if role and storage_state is None:
+        cell['problems'].append(f'not logged in as {role}')
+        return cell
+
+    async with semaphore:
+        context = await browser.new_context(**options, storage_state=storage_state)
+        page = await context.new_page()
+        try:
+            start = time.perf_counter()
+            response = await page.goto(f"{base_url}{path}", wait_until='load')
+            await page.wait_for_load_state('networkidle')
+            cell['network_idle_ms'] = round((time.perf_counter() - start) * 1000)
+            cell['status'] = response.status if response else None
+            cell['final_url'] = page.url
+            cell.update(await page.evaluate(MEASURE_JS))
+            if screenshots:
+                slug = f"{path.strip('/').replace('/', '_') or 'landing'}_{device.replace(' ', '_').lower()}"
+                cell['screenshot'] = f"matrix_{slug}.png"
+                await page.screenshot(path=os.path.join(SCREENSHOTS_DIR, cell['screenshot']), full_page=True)
+        except Exception as e:
+            cell['problems'].append(str(e).splitlines()[0])
+            return cell
+        finally:
+            await context.close()
+
+    if cell['status'] is None or cell['status'] >= 400:
+        cell['problems'].append(f"HTTP {cell['status']}")
+    if '/login' in cell['final_url'] and '/login' not in path:
+        cell['problems'].append('redirected to login')
+    if cell['overflow_px']:
+        offenders = ', '.join(o['element'] for o in cell['offenders'][:3])
+        cell['problems'].append(f"overflows by {cell['overflow_px']}px ({offenders})")
+    if budget_ms and cell['network_idle_ms'] > budget_ms:
+        cell['problems'].append(f"network idle {cell['network_idle_ms']}ms > {budget_ms}ms")
+    cell['passed'] = not cell['problems']
+    return cell
+
+
+def print_grid(pages, devices, cells):
+    by_key = {(c['page'], c['device']): c for c in cells}
+    page_width = max(len(p) for p in pages) + 2
+    column = max(12, max(len(d) for d in devices) + 2)
+    print(f"{'page':<{page_width}}" + ''.join(f"{d:>{column}}" for d in devices))
+    for page_spec in pages:
+        row = f"{page_spec:<{page_width}}"
+        for device in devices:
+            cell = by_key[(page_spec, device)]
+            mark = '✅' if cell['passed'] else '❌'
+            timing = f"{cell['network_idle_ms']}ms" if 'network_idle_ms' in cell else '-'
+            row += f"{mark + ' ' + timing:>{column}}"
+        print(row)
+
+
+def write_html(pages, devices, cells, path):
+    by_key = {(c['page'], c['device']): c for c in cells}
+    rows = []
+    for page_spec in pages:
+        tds = []
+        for device in devices:
+            cell = by_key[(page_spec, device)]
+            lines = [f"<b>{'PASS' if cell['passed'] else 'FAIL'}</b>"]
+            if 'network_idle_ms' in cell:
+                lines.append(f"FCP {cell['fcp_ms']}ms · load {cell['load_ms']}ms · idle {cell['network_idle_ms']}ms")
+            lines += [html.escape(p) for p in cell['problems']]
+            if cell.get('screenshot'):
+                lines.append(f'<a href="{cell["screenshot"]}"><img src="{cell["screenshot"]}" width="160"></a>')
+            tds.append(f'<td class="{"pass" if cell["passed"] else "fail"}">{"<br>".join(lines)}</td>')
+        rows.append(f"<tr><th>{html.escape(page_spec)}</th>{''.join(tds)}</tr>")
+    header = ''.join(f"<th>{html.escape(d)}</th>" for d in devices)
+    with open(path, 'w') as f:
+        f.write(
+            "<!doctype html><meta charset=utf-8><title>Responsive matrix</title>"
+            "<style>body{font:13px sans-serif}td,th{border:1px solid #ccc;padding:6px;vertical-align:top}"
+            ".pass{background:#eaf7ea}.fail{background:#fbeaea}table{border-collapse:collapse}</style>"
+            f"<table><tr><th></th>{header}</tr>{''.join(rows)}</table>"
+        )
+
+
+async def run_matrix(base_url=BASE_URL, pages=None, devices=None, concurrency=4, budget_ms=None,
+                     screenshots=False):
+    """Run every page x device cell and return the report dict"""
+    pages = pages or DEFAULT_PAGES
+    devices = devices or DEFAULT_DEVICES
+    print("=" * 60)
+    print("FITCONNECT RESPONSIVE MATRIX")
+    print("=" * 60)
+    print(f"\n{len(pages)} page(s) x {len(devices)} device(s), {concurrency} parallel context(s)\n")
+
+    async with async_playwright() as p:
+        browser = await launch_browser_async(p)
+        options = {d: device_options(p, d) for d in devices}
+        roles = {parse_page(spec)[0] for spec in pages} - {None}
+        states = await role_storage_states(browser, base_url, roles)
+        coach_id = await first_coach_id(browser, base_url) if any('{coach}' in s for s in pages) else None
+
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        cells = await asyncio.gather(*(
+            run_cell(browser, semaphore, base_url, spec, device, options[device],
+                     states.get(parse_page(spec)[0]), coach_id, budget_ms, screenshots)
+            for spec in pages for device in devices
+        ))
+        wall = time.perf_counter() - start
+        await browser.close()
+
+    print_grid(pages, devices, cells)
+    failed = [c for c in cells if not c['passed']]
+    if failed:
+        print("\n❌ Failed cells:")
+        for c in failed:
+            print(f"  - {c['page']} @ {c['device']}: {'; '.join(c['problems'])}")
+    print(f"\nTotal: {len(cells)} | Passed: {len(cells) - len(failed)} | Failed: {len(failed)} | Wall: {wall:.1f}s")
+
+    report = {
+        'config': {'base_url': base_url, 'pages': pages, 'devices': devices,
+                   'concurrency': concurrency, 'budget_ms': budget_ms},
+        'summary': {'total': len(cells), 'passed': len(cells) - len(failed), 'failed': len(failed),
+                    'wall_s': round(wall, 2)},
+        'cells': cells,
+    }
+    results_file = os.path.join(SCREENSHOTS_DIR, 'responsive_matrix.json')
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    html_file = os.path.join(SCREENSHOTS_DIR, 'responsive_matrix.html')
+    write_html(pages, devices, cells, html_file)
+    print(f"📄 Results saved to: {results_file}")
+    print(f"📄 Grid report: {html_file}")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pages x device profiles responsive matrix')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--pages', help='Comma-separated paths, optionally role-prefixed (client:/dashboard/client)')
+    parser.add_argument('--devices', help=f"Comma-separated profiles (default: {','.join(DEFAULT_DEVICES)})")
+    parser.add_argument('--concurrency', type=int, default=4, help='Parallel browser contexts (default: 4)')
+    parser.add_argument('--budget-ms', type=int, help='Fail cells slower than this to network idle')
+    parser.add_argument('--screenshots', action='store_true', help='Save a full-page screenshot per cell')
+    args = parser.parse_args()
+    report = asyncio.run(run_matrix(
+        args.base_url,
+        args.pages.split(',') if args.pages else None,
+        [d.strip() for d in args.devices.split(',')] if args.devices else None,
+        args.concurrency, args.budget_ms, args.screenshots,
+    ))
+    sys.exit(0 if report['summary']['failed'] == 0 else 1)
@@ -0,0 +1,93 @@
+"""
+FitConnect Scenario Suite
+Runs the declarative scenarios in scenarios/ (see scripts/scenario_dsl.py for
+the step format) on one browser, reusing a logged-in context per role.
+
+Usage:
+    python test_scenarios.py
+    python test_scenarios.py scenarios/fitconnect.yaml --only "coach*"
+"""
+from playwright.sync_api import sync_playwright
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from browser_server import launch_browser
+from http_load import ApiClient, parse_json, virtual_ip
+from scenario_dsl import ScenarioError, ScenarioRunner, compile_files, referenced_variables
+
+BASE_URL = 'http://localhost:3000'
+SCENARIOS_DIR = os.path.join(os.path.dirname(__file__), 'scenarios')
+SCREENSHOTS_DIR = os.path.join(os.path.dirname(__file__), 'screenshots')
+os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+
+def resolve_variables(base_url, names):
+    """Built-in placeholder values, fetched only when a scenario uses them"""
+    variables = {}
+    if 'coach_id' in names:
+        listing = parse_json(ApiClient(base_url).get('/api/coaches?limit=1')) or {}
+        coaches = listing.get('data') or []
+        if coaches:
+            variables['coach_id'] = coaches[0]['id']
+        else:
+            print("⚠️  No coach profiles found - {coach_id} scenarios will fail")
+    return variables
+
+def run_scenarios(paths=None, base_url=BASE_URL, only=None):
+    """Compile and run scenarios; returns the list of result dicts"""
+    paths = paths or [SCENARIOS_DIR]
+    print("=" * 60)
+    print("FITCONNECT SCENARIO SUITE")
+    print("=" * 60)
+
+    variables = resolve_variables(base_url, referenced_variables(paths))
+    try:
+        scenarios, accounts = compile_files(paths, variables, only)
+    except ScenarioError as e:
+        print(f"❌ {e}")
+        return None
+    print(f"\n{len(scenarios)} scenario(s) compiled")
+
+    start = time.perf_counter()
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        runner = ScenarioRunner(browser, base_url, SCREENSHOTS_DIR, accounts, login_ip=lambda i: virtual_ip(100 + i))
+        results = []
+        for scenario in runner.run(scenarios):
+            status = "✅ PASS" if scenario['passed'] else "❌ FAIL"
+            print(f"{status}: {scenario['scenario']} [{scenario['context']}] ({scenario['elapsed_s']}s)")
+            for check in scenario['checks']:
+                if not check['passed']:
+                    print(f"    {check['check']}: {check['details']}")
+            if scenario['error']:
+                print(f"    {scenario['error']}")
+            results.append(scenario)
+        runner.close()
+        browser.close()
+    wall = time.perf_counter() - start
+
+    passed = sum(1 for r in results if r['passed'])
+    print("\n" + "=" * 60)
+    print(f"Total: {len(results)} | Passed: {passed} | Failed: {len(results) - passed} | Wall: {wall:.1f}s")
+
+    results_file = os.path.join(SCREENSHOTS_DIR, 'scenario_results.json')
+    with open(results_file, 'w') as f:
+        json.dump({
+            'summary': {'total': len(results), 'passed': passed, 'failed': len(results) - passed,
+                        'wall_s': round(wall, 2)},
+            'results': results,
+        }, f, indent=2)
+    print(f"📄 Results saved to: {results_file}")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run declarative FitConnect browser scenarios')
+    parser.add_argument('paths', nargs='*', help=f'Scenario files or directories (default: {SCENARIOS_DIR})')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--only', help='Run scenarios whose name matches this pattern (fnmatch, case-insensitive)')
+    args = parser.parse_args()
+    results = run_scenarios(args.paths or None, args.base_url, args.only)
+    sys.exit(0 if results and all(r['passed'] for r in results) else 1)
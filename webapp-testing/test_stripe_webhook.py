@@ -0,0 +1,238 @@
+"""
+FitConnect Stripe Webhook Test Suite
+Fires locally signed Stripe events at /api/stripe/webhook to check signature
+verification, processing latency and idempotency under bursts of duplicate
+and out-of-order deliveries.
+
+The server must use the same webhook secret as this suite:
+    STRIPE_WEBHOOK_SECRET=whsec_fitconnect_local npm run dev
+    python test_stripe_webhook.py --events 200 --duplicates 3 --concurrency 20
+
+Pending bookings of the demo client are confirmed through the webhook, so run
+it against a local database. With --refunds N, the first N of them get their
+charge.refunded before their payment succeeds and must end up REFUNDED (off
+by default: the current handler drops a refund for an unpaid booking).
+    python test_stripe_webhook.py --refunds 1
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'scripts'))
+from http_load import ApiClient, LatencyStats, format_summary, parse_json, run_concurrently
+from stripe_events import WEBHOOK_PATH, charge_refunded, encode_event, make_event, payment_intent
+from suite_runner import ResultLog, activate, log_result
+
+BASE_URL = 'http://localhost:3000'
+DEMO_CLIENT = 'alex@example.com'
+
+def post_event(client, event, **sign_kwargs):
+    body, headers = encode_event(event, **sign_kwargs)
+    return client.post(WEBHOOK_PATH, body=body, headers=headers)
+
+def test_signature_verification(client):
+    """Test that only correctly signed, fresh events are accepted"""
+    print("\n=== Testing Webhook Signature Verification ===")
+
+    event = make_event('customer.created', {'id': 'cus_local', 'object': 'customer'})
+
+    try:
+        response = post_event(client, event)
+        log_result("Valid signature accepted", response.status == 200, f"Status: {response.status}")
+    except Exception as e:
+        log_result("Valid signature accepted", False, str(e))
+
+    try:
+        body, headers = encode_event(event)
+        del headers['Stripe-Signature']
+        response = client.post(WEBHOOK_PATH, body=body, headers=headers)
+        log_result("Missing signature rejected", response.status == 400, f"Status: {response.status}")
+    except Exception as e:
+        log_result("Missing signature rejected", False, str(e))
+
+    try:
+        body, headers = encode_event(event)
+        response = client.post(WEBHOOK_PATH, body=body.replace('cus_local', 'cus_tampered'), headers=headers)
+        log_result("Tampered payload rejected", response.status == 400, f"Status: {response.status}")
+    except Exception as e:
+        log_result("Tampered payload rejected", False, str(e))
+
+    try:
+        response = post_event(client, event, secret='whsec_wrong_secret')
+        log_result("Wrong secret rejected", response.status == 400, f"Status: {response.status}")
+    except Exception as e:
+        log_result("Wrong secret rejected", False, str(e))
+
+    try:
+        # Stripe's default tolerance is 300 seconds
+        response = post_event(client, event, timestamp=time.time() - 600)
+        log_result("Expired timestamp rejected", response.status == 400, f"Status: {response.status}")
+    except Exception as e:
+        log_result("Expired timestamp rejected", False, str(e))
+
+def find_pending_bookings(client, limit):
+    """Return (booking_id, coach_id) for the demo client's unpaid bookings"""
+    if not client.login(DEMO_CLIENT):
+        return []
+    response = client.get(f'/api/bookings?status=PENDING_PAYMENT&limit={min(limit, 100)}')
+    data = parse_json(response) or {}
+    return [(b['id'], b['coach']['id']) for b in data.get('data', [])][:limit]
+
+def coach_sessions(client, coach_id):
+    data = parse_json(client.get(f'/api/coaches/{coach_id}')) or {}
+    return data.get('data', data).get('sessionsCompleted')
+
+def build_deliveries(bookings, events, duplicates, out_of_order, rng, refunds=0):
+    """
+    Build the deliveries for a burst.
+
+    Each payment intent gets `duplicates` deliveries of payment_intent.succeeded.
+    Intents without a real booking also get a charge.refunded, and with
+    out_of_order the burst is shuffled so refunds and duplicates can overtake
+    the original delivery - as Stripe retries can. The first `refunds` real
+    bookings are refunded too, and their refund is delivered ahead of the
+    burst, so it always arrives before the payment it refunds.
+
+    Returns:
+        (refunds to deliver first, burst deliveries); each delivery is (intent id, booking id, event)
+    """
+    early, deliveries = [], []
+    now = int(time.time())
+    for i in range(events):
+        booking_id = bookings[i][0] if i < len(bookings) else None
+        intent = payment_intent(booking_id=booking_id, amount_cents=rng.choice([2500, 5000, 7500, 12000]))
+        succeeded = make_event('payment_intent.succeeded', intent, created=now)
+        # Stripe retries reuse the event id, so duplicates are byte-identical events
+        deliveries.extend([(intent['id'], booking_id, succeeded)] * duplicates)
+        if booking_id is None or i < refunds:
+            refund = make_event('charge.refunded', charge_refunded(intent['id'], intent['amount']), created=now + 1)
+            (deliveries if booking_id is None else early).append((intent['id'], booking_id, refund))
+    if out_of_order:
+        rng.shuffle(deliveries)
+    return early, deliveries
+
+def test_burst_delivery(client, events, duplicates, concurrency, out_of_order, seed, refunds=0):
+    """Test throughput and idempotency of a burst of payment events"""
+    print("\n=== Testing Webhook Burst Delivery ===")
+    print(f"    {events} intents x {duplicates} deliveries, concurrency {concurrency}, "
+          f"{'shuffled' if out_of_order else 'in order'}, seed {seed}")
+
+    rng = random.Random(seed)
+    session = ApiClient(client.base_url)
+    bookings = find_pending_bookings(session, events)
+    if not bookings:
+        print("    No pending bookings found - events carry no bookingId (signature and dispatch path only)")
+    coach_ids = sorted({coach_id for _, coach_id in bookings})
+    sessions_before = {coach_id: coach_sessions(session, coach_id) for coach_id in coach_ids}
+
+    early, deliveries = build_deliveries(bookings, events, duplicates, out_of_order, rng, refunds)
+    refunded = {booking_id for _, booking_id, _ in early}
+    stats = LatencyStats()
+    for _intent_id, booking_id, event in early:
+        response = post_event(client, event)
+        log_result("Out of order: refund before payment acknowledged", response.status == 200,
+                   f"booking {booking_id}: status {response.status}")
+
+    def deliver(delivery):
+        _intent_id, _booking_id, event = delivery
+        response = post_event(client, event)
+        stats.add(event['type'], response.elapsed)
+        return response.status
+
+    start = time.perf_counter()
+    outcomes = run_concurrently(deliver, deliveries, concurrency)
+    wall = time.perf_counter() - start
+
+    errors = [(d, status, exc) for d, status, exc in outcomes if exc is not None or status != 200]
+    throughput = len(deliveries) / wall if wall > 0 else 0.0
+    log_result("Burst: all deliveries acknowledged", not errors,
+               f"{len(deliveries)} deliveries in {wall:.2f}s ({throughput:.1f}/s), {len(errors)} non-200")
+    for label, summary in stats.report().items():
+        print(f"    {format_summary(label, summary)}")
+
+    # Duplicates racing past the findUnique check surface as 5xx on the payment create
+    failed_intents = sorted({d[0] for d, status, exc in errors if d[2]['type'] == 'payment_intent.succeeded'})
+    log_result("Idempotency: duplicate deliveries handled", not failed_intents,
+               f"{len(failed_intents)} intent(s) failed on duplicate delivery" if failed_intents else
+               f"{duplicates} deliveries per intent")
+
+    if bookings:
+        confirmed = {}
+        data = parse_json(session.get('/api/bookings?limit=100')) or {}
+        for booking in data.get('data', []):
+            confirmed[booking['id']] = booking['status']
+        paid = [b for b, _ in bookings if b not in refunded]
+        unconfirmed = [b for b in paid if confirmed.get(b) != 'CONFIRMED']
+        log_result("Idempotency: bookings confirmed", not unconfirmed,
+                   f"{len(paid) - len(unconfirmed)}/{len(paid)} CONFIRMED")
+        for booking_id in sorted(refunded):
+            # The refund came first; the payment delivered after it must not resurrect the booking
+            log_result("Out of order: refunded booking stays REFUNDED", confirmed.get(booking_id) == 'REFUNDED',
+                       f"booking {booking_id}: {confirmed.get(booking_id)}")
+
+        # Whether a refunded session counts is not settled, so coaches with one are left out
+        refunded_coaches = {c for b, c in bookings if b in refunded}
+        expected = {coach_id: sum(1 for _, c in bookings if c == coach_id) for coach_id in coach_ids}
+        drift = []
+        for coach_id in coach_ids:
+            if coach_id in refunded_coaches:
+                continue
+            after = coach_sessions(session, coach_id)
+            if None not in (sessions_before[coach_id], after) and after - sessions_before[coach_id] != expected[coach_id]:
+                drift.append(f"{coach_id}: +{after - sessions_before[coach_id]} (expected +{expected[coach_id]})")
+        log_result("Idempotency: sessionsCompleted incremented once per booking", not drift, "; ".join(drift))
+
+    session.close()
+    return {'deliveries': len(deliveries), 'refunded_first': len(early), 'wall_s': round(wall, 3), 'throughput_per_s': round(throughput, 1),
+            'latency': stats.report()}
+
+def run_webhook_tests(base_url=BASE_URL, events=100, duplicates=3, concurrency=10, out_of_order=True, seed=42,
+                      refunds=0):
+    """Run all webhook tests"""
+    print("=" * 60)
+    print("FITCONNECT STRIPE WEBHOOK TEST SUITE")
+    print("=" * 60)
+
+    log = ResultLog('FITCONNECT STRIPE WEBHOOK TEST SUITE')
+    client = ApiClient(base_url)
+    with activate(log):
+        with log.test('test_signature_verification'):
+            test_signature_verification(client)
+        with log.test('test_burst_delivery'):
+            burst = test_burst_delivery(client, events, duplicates, concurrency, out_of_order, seed, refunds)
+    client.close()
+
+    log.print_summary('WEBHOOK TEST SUMMARY')
+
+    # Save results
+    results_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+    os.makedirs(results_dir, exist_ok=True)
+    results_file = os.path.join(results_dir, 'webhook_test_results.json')
+    with open(results_file, 'w') as f:
+        json.dump({
+            'summary': log.summary(),
+            'started': log.started,
+            'timings': log.timings,
+            'burst': burst,
+            'results': log.results
+        }, f, indent=2)
+    print(f"\n📄 Results saved to: {results_file}")
+    return log.all_passed()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stripe webhook signature, throughput and idempotency tests')
+    parser.add_argument('--base-url', default=BASE_URL, help=f'Server URL (default: {BASE_URL})')
+    parser.add_argument('--events', type=int, default=100, help='Payment intents per burst (default: 100)')
+    parser.add_argument('--duplicates', type=int, default=3, help='Deliveries per payment intent (default: 3)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent deliveries (default: 10)')
+    parser.add_argument('--in-order', action='store_true', help='Deliver events in order instead of shuffled')
+    parser.add_argument('--seed', type=int, default=42, help='Shuffle seed (default: 42)')
+    parser.add_argument('--refunds', type=int, default=0,
+                        help='Real bookings whose refund is delivered before their payment (default: 0)')
+    args = parser.parse_args()
+    ok = run_webhook_tests(args.base_url, args.events, args.duplicates, args.concurrency, not args.in_order, args.seed,
+                           args.refunds)
+    sys.exit(0 if ok else 1)